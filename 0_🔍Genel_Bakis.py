@@ -5,38 +5,17 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import seaborn as sns
-from data_handler import veriyi_yukle_ve_temizle, genel_satis_trendi_hazirla
-from analysis_engine import (rfm_skorlarini_hesapla, 
-                           musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, 
-                           clv_hesapla,
-                           market_basket_analizi_yap,
-                           genel_rapor_pdf_olustur,
-                           anomali_tespiti_yap,
-                           davranissal_anomali_tespiti_yap)
+from data_handler import genel_satis_trendi_hazirla
+from analysis_engine import genel_rapor_pdf_olustur
+from shared_data import veri_setini_getir, donem_verisini_getir
 
 st.set_page_config(page_title="Genel Bakış", layout="wide")
 
-# --- 1. VERİ YÜKLEME VE TÜM ANALİZLER ---
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    sonuclar_df = clv_df.copy()
-    if 'MusteriAdi' not in sonuclar_df.columns:
-        sonuclar_df['MusteriAdi'] = sonuclar_df.index
-    # Anomali listelerini de burada oluşturup session_state'e atalım
-    profil_anomalileri_df = anomali_tespiti_yap(sonuclar_df.copy())
-    st.session_state.profil_anomalileri = profil_anomalileri_df[profil_anomalileri_df['Anomali_Etiketi'] == -1].index.tolist()
-    davranissal_anomaliler_df = davranissal_anomali_tespiti_yap(temiz_df)
-    st.session_state.davranissal_anomaliler = davranissal_anomaliler_df['MusteriID'].tolist()
-    return temiz_df, sonuclar_df
-
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
+st.session_state.profil_anomalileri = list(veri.profil_anomalileri)
+st.session_state.davranissal_anomaliler = list(veri.davranissal_anomaliler)
+
 
 st.title("📊 Müşteri Analitiği Genel Bakış Panosu")
 
@@ -66,7 +45,8 @@ with st.expander("⚙️ Kontrol Paneli: Filtreler ve İndirme Seçenekleri", ex
         return df.to_csv(index=True).encode('utf-8-sig')
 
     # Filtreleme mantığını burada çalıştırıyoruz
-    aktif_musteriler = temiz_df[(temiz_df['Tarih'].dt.date >= secilen_baslangic_tarihi) & (temiz_df['Tarih'].dt.date <= secilen_bitis_tarihi)]['MusteriID'].unique()
+    donem_df = donem_verisini_getir((secilen_baslangic_tarihi, secilen_bitis_tarihi))
+    aktif_musteriler = donem_df['MusteriID'].unique()
     tarih_filtrelenmis_df = sonuclar_df[sonuclar_df.index.isin(aktif_musteriler)]
     if 'Tümü' in secilen_segmentler or not secilen_segmentler:
         nihai_filtrelenmis_df = tarih_filtrelenmis_df
@@ -100,10 +80,6 @@ st.header("Filtrelenmiş Segment Özeti")
 st.markdown(f"**`{secilen_baslangic_tarihi.strftime('%d-%m-%Y')}`** ve **`{secilen_bitis_tarihi.strftime('%d-%m-%Y')}`** tarihleri arasında aktif olan müşterilerin analizi")
 
 # Dönemsel KPI Hesaplaması
-donem_df = temiz_df[
-    (temiz_df['Tarih'].dt.date >= secilen_baslangic_tarihi) & 
-    (temiz_df['Tarih'].dt.date <= secilen_bitis_tarihi)
-]
 donem_df_filtrelenmis = donem_df[donem_df['MusteriID'].isin(nihai_filtrelenmis_df.index)]
 donem_cirosu = donem_df_filtrelenmis['ToplamTutar'].sum()
 donem_islem_sayisi = len(donem_df_filtrelenmis)
@@ -1,6 +1,5 @@
 # analysis_engine.py
 # SORUMLULUĞU: Tüm analitik hesaplamaları ve modellemeyi yapmak.
-import streamlit as st
 from fpdf import FPDF
 from fpdf.fonts import FontFace
 from sklearn.ensemble import IsolationForest
@@ -13,6 +12,7 @@ from itertools import permutations
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.ensemble import RandomForestClassifier
 import io
+import re
 import shap
 import pandas as pd
 import numpy as np
@@ -20,6 +20,7 @@ from datetime import timedelta
 from datetime import datetime
 from sklearn.cluster import DBSCAN
 import os
+import time
 import warnings
 from scipy.stats import ttest_ind, levene
 from prophet import Prophet
@@ -33,6 +34,15 @@ from statsmodels.tsa.seasonal import seasonal_decompose
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
+from feature_store import musteri_ozelliklerini_hesapla, musterilere_yay
+from data_handler import musteri_dilimi, SurecHavuzu
+from model_registry import egit_veya_yukle
+from shap_store import aciklayici_olustur
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.model_selection import StratifiedKFold, ParameterGrid
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import make_pipeline
 
 
 warnings.filterwarnings('ignore')
@@ -87,36 +97,54 @@ class PDF(FPDF):
         buf.close()
 
 
-def rfm_skorlarini_hesapla(dataframe):
-    analiz_tarihi = dataframe['Tarih'].max() + timedelta(days=1)
-    rfm_df = dataframe.groupby('MusteriID').agg({
-        'Tarih': lambda tarih: (analiz_tarihi - tarih.max()).days,
-        'MusteriID': lambda id: id.count(),
-        'ToplamTutar': 'sum',
-        'NetKar': 'sum'
-    }).rename(columns={'Tarih': 'Recency', 'MusteriID': 'Frequency', 
-                       'ToplamTutar': 'Monetary', 'NetKar': 'ToplamNetKar'})
+def _quintil_skorlari(degerler):
+    """
+    pd.qcut(seri.rank(method='first'), 5) ile aynı 0-4 arası dilim numaralarını döndürür.
+    Sıra numaraları kararlı argsort ile, dilim sınırları qcut'ın kullandığı yüzdeliklerle bulunur.
+    """
+    n = len(degerler)
+    sira = np.empty(n, dtype=np.float64)
+    sira[np.argsort(degerler, kind='stable')] = np.arange(1, n + 1)
+    sinirlar = np.percentile(np.arange(1, n + 1, dtype=np.float64), np.linspace(0, 1, 6) * 100)
+    # Aralıklar sağdan kapalıdır: sınıra eşit sıra alttaki dilime düşer.
+    return np.searchsorted(sinirlar[1:-1], sira, side='left')
+
+def rfm_skorlarini_hesapla(dataframe, ozellikler=None):
+    """
+    'ozellikler' verilmezse müşteri özellik tablosu 'dataframe' üzerinden hesaplanır;
+    verilirse aynı işlem tablosundan oluşturulmuş olmalıdır. Recency int64 gün sayıları,
+    skorlar sıralama tabanlı dilimlerle vektörel olarak hesaplanır.
+    """
+    if ozellikler is None:
+        ozellikler = musteri_ozelliklerini_hesapla(dataframe)
+    son_alim_ns = ozellikler['SonAlimTarihi'].to_numpy('datetime64[ns]').view(np.int64)
+    gun_ns = 86_400 * 10**9
+    analiz_tarihi_ns = (son_alim_ns.max() if len(son_alim_ns) else 0) + gun_ns
+    rfm_df = pd.DataFrame({
+        'Recency': (analiz_tarihi_ns - son_alim_ns) // gun_ns,
+        'Frequency': ozellikler['IslemSayisi'].to_numpy(np.int64),
+        'Monetary': ozellikler['ToplamTutar'].to_numpy(np.float64),
+        'ToplamNetKar': ozellikler['ToplamNetKar'].to_numpy(np.float64)
+    }, index=ozellikler.index)
     
     if rfm_df.shape[0] < 5:
         for col in ['R_Score', 'F_Score', 'M_Score', 'MPS']:
             rfm_df[col] = 0
         return rfm_df
 
-    rfm_df['R_Score'] = pd.qcut(rfm_df['Recency'].rank(method='first'), 5, labels=[5, 4, 3, 2, 1])
-    rfm_df['F_Score'] = pd.qcut(rfm_df['Frequency'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5])
-    rfm_df['M_Score'] = pd.qcut(rfm_df['Monetary'].rank(method='first'), 5, labels=[1, 2, 3, 4, 5])
-    
-    for col in ['R_Score', 'F_Score', 'M_Score']:
-        rfm_df[col] = rfm_df[col].astype(int)
+    rfm_df['R_Score'] = 5 - _quintil_skorlari(rfm_df['Recency'].to_numpy())
+    rfm_df['F_Score'] = 1 + _quintil_skorlari(rfm_df['Frequency'].to_numpy())
+    rfm_df['M_Score'] = 1 + _quintil_skorlari(rfm_df['Monetary'].to_numpy())
         
     w_r, w_f, w_m = 0.20, 0.40, 0.40
     rfm_df['MPS'] = ((w_r * rfm_df['R_Score'] + w_f * rfm_df['F_Score'] + w_m * rfm_df['M_Score']) / 5) * 100
     return rfm_df.sort_values('MPS', ascending=False)
 
+SEGMENT_SKOR_ARALIKLARI = [0, 40, 60, 80, 90, 101]
+SEGMENT_ETIKETLERI = ['Kayıp Müşteriler', 'Riskli Müşteriler', 'Sadık Müşteriler', 'Potansiyel Şampiyonlar', 'Şampiyonlar']
+
 def musterileri_segmentle(rfm_df):
-    skor_araliklari = [0, 40, 60, 80, 90, 101]
-    segment_etiketleri = ['Kayıp Müşteriler', 'Riskli Müşteriler', 'Sadık Müşteriler', 'Potansiyel Şampiyonlar', 'Şampiyonlar']
-    rfm_df['Segment'] = pd.cut(rfm_df['MPS'], bins=skor_araliklari, labels=segment_etiketleri, right=False)
+    rfm_df['Segment'] = pd.cut(rfm_df['MPS'], bins=SEGMENT_SKOR_ARALIKLARI, labels=SEGMENT_ETIKETLERI, right=False)
     return rfm_df
 
 def churn_tahmin_modeli_olustur(rfm_df, churn_limiti_gun=180):
@@ -163,7 +191,8 @@ def market_basket_analizi_yap(df, min_support=0.05, max_urun_sayisi=300):
     df = df[df['UrunKodu'].isin(top_urunler)]
 
     # Sepet -> Müşteri x Ürün matrisi
-    sepet_df = pd.crosstab(df['MusteriID'], df['UrunKodu'])
+    # Gruplama sözlük kodlu (categorical) kolonlar üzerinde, sadece gözlenen çiftlerle yapılır.
+    sepet_df = df.groupby(['MusteriID', 'UrunKodu'], observed=True).size().unstack(fill_value=0)
     sepet_df = (sepet_df > 0).astype('uint8')   # bool yerine küçük int tip → RAM tasarrufu
 
     if sepet_df.shape[0] < 10:
@@ -186,15 +215,18 @@ def market_basket_analizi_yap(df, min_support=0.05, max_urun_sayisi=300):
 
     return kurallar
 
-def kohort_analizi_yap(df, metric='retention', period='M'):
+def kohort_analizi_yap(df, metric='retention', period='M', ozellikler=None):
     """
     NİHAİ VERSİYON: Farklı metrikleri (retention, avg_spend) ve farklı periyotları (aylık, çeyreklik)
     hesaplayabilen kohort analizi fonksiyonu.
     """
+    if ozellikler is None:
+        ozellikler = musteri_ozelliklerini_hesapla(df)
     df_c = df.copy()
     # Periyot parametresini kullanarak gruplama yap
     df_c['SiparisDonemi'] = df_c['Tarih'].dt.to_period(period)
-    df_c['Kohort'] = df_c.groupby('MusteriID')['Tarih'].transform('min').dt.to_period(period)
+    df_c['Kohort'] = pd.Series(musterilere_yay(ozellikler['IlkAlimTarihi'], df_c['MusteriID']),
+                               index=df_c.index).dt.to_period(period)
     
     # İki periyot arasındaki farkı daha sağlam bir yöntemle hesapla
     df_c['Donem_Indeksi'] = df_c.apply(lambda row: (row['SiparisDonemi'] - row['Kohort']).n + 1, axis=1)
@@ -227,9 +259,25 @@ def kohort_analizi_yap(df, metric='retention', period='M'):
     heatmap_matrix.index = heatmap_matrix.index.astype(str)
     return heatmap_matrix
 
+def _prophet_modeli(tur, df, regresorler=(), ulke_tatilleri=None, **ayarlar):
+    """
+    Prophet modelini model kaydından yükler; aynı veri ve ayarlarla eğitilmiş model yoksa
+    eğitip kaydeder. Yüklenen model paylaşılır, değiştirilmemelidir.
+    """
+    def egit():
+        model = Prophet(**ayarlar)
+        for sutun in regresorler:
+            model.add_regressor(sutun)
+        if ulke_tatilleri:
+            model.add_country_holidays(country_name=ulke_tatilleri)
+        model.fit(df)
+        return model, {'egitim_ay_sayisi': len(df)}
+    hiperparametreler = {**ayarlar, 'regresorler': list(regresorler), 'ulke_tatilleri': ulke_tatilleri}
+    return egit_veya_yukle(tur, df, hiperparametreler, egit)[0]
+
 def satis_tahmini_yap(zaman_serisi_df, ay_sayisi=6):
-    model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-    model.fit(zaman_serisi_df)
+    model = _prophet_modeli('musteri_prophet', zaman_serisi_df, yearly_seasonality=True,
+                            weekly_seasonality=False, daily_seasonality=False)
     future = model.make_future_dataframe(periods=ay_sayisi, freq='ME')
     forecast = model.predict(future)
     forecast['yhat'] = np.maximum(0, forecast['yhat'])
@@ -249,14 +297,11 @@ def prophet_tahmin(df, tahmin_periyodu=6, gelecek_regresorler=None):
     GÜNCELLENMİŞ: Prophet modeli ile tahmin yapar. Artık geleceğe yönelik harici regresör 
     varsayımlarını da kabul edebilir.
     """
-    model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False, changepoint_prior_scale=0.05)
-    
-    # Modelin kullanabileceği regresörleri (varsa) ekle
+    # Modelin kullanabileceği regresörleri (varsa) ekle. Senaryo varsayımları yalnızca
+    # geleceği etkiler; aynı geçmiş için model kayıttan yüklenir.
     regresor_sutunlari = [col for col in ['musteri_sayisi', 'toplam_miktar'] if col in df.columns]
-    for sutun in regresor_sutunlari:
-        model.add_regressor(sutun)
-    
-    model.fit(df)
+    model = _prophet_modeli('prophet', df, regresorler=regresor_sutunlari, yearly_seasonality=True,
+                            weekly_seasonality=False, daily_seasonality=False, changepoint_prior_scale=0.05)
     future = model.make_future_dataframe(periods=tahmin_periyodu, freq='ME')
     
     # Gelecek için regresör değerlerini doldur
@@ -342,45 +387,115 @@ def what_if_analizi(df, senaryo_tipi, degisim_orani):
         df_kopya.loc[df_kopya.index[-3:], 'y'] *= 1.2
     return df_kopya
 
+def rfm_anlik_goruntuleri_hesapla(temiz_df, anlik_tarihler):
+    """
+    Artan sıralı her anlık tarih t için, yalnızca Tarih <= t olan işlemlerle
+    rfm_skorlarini_hesapla + musterileri_segmentle'nin vereceği segmentleri hesaplar.
+    İşlemler tarihe göre bir kez sıralanır; müşteri toplamları tarihler arasında birikerek
+    güncellendiğinden her tarih için işlem tablosu yeniden taranmaz.
+    (musteriler, segment_kodlari) döndürür: segment_kodlari[i, k], i. müşterinin k. tarihteki
+    SEGMENT_ETIKETLERI sırasıdır; o tarihte henüz alımı olmayanlar için -1'dir.
+    """
+    # Müşteri sırası groupby('MusteriID', observed=True) ile aynıdır; rank(method='first')
+    # eşitlikleri bu sıraya göre bozduğundan skorlar da aynı çıkar.
+    kodlar, musteriler = pd.factorize(temiz_df['MusteriID'], sort=True)
+    tarih_ns = temiz_df['Tarih'].to_numpy('datetime64[ns]').view(np.int64)
+    sira = np.argsort(tarih_ns, kind='stable')
+    kodlar, tarih_ns = kodlar[sira], tarih_ns[sira]
+    tutar = np.nan_to_num(temiz_df['ToplamTutar'].to_numpy(np.float64))[sira]
+
+    musteri_sayisi = len(musteriler)
+    islem_sayisi = np.zeros(musteri_sayisi, dtype=np.int64)
+    toplam_tutar = np.zeros(musteri_sayisi)
+    son_alim_ns = np.zeros(musteri_sayisi, dtype=np.int64)
+    segment_kodlari = np.full((musteri_sayisi, len(anlik_tarihler)), -1, dtype=np.int8)
+
+    gun_ns = 86_400 * 10**9
+    w_r, w_f, w_m = 0.20, 0.40, 0.40
+    anlik_ns = pd.DatetimeIndex(anlik_tarihler).to_numpy('datetime64[ns]').view(np.int64)
+    onceki_bitis = 0
+    for k, bitis in enumerate(np.searchsorted(tarih_ns, anlik_ns, side='right')):
+        yeni_kodlar = kodlar[onceki_bitis:bitis]
+        islem_sayisi += np.bincount(yeni_kodlar, minlength=musteri_sayisi)
+        toplam_tutar += np.bincount(yeni_kodlar, weights=tutar[onceki_bitis:bitis], minlength=musteri_sayisi)
+        # Dilim tarihe göre sıralı: her müşterinin son görünümü, yeni son alım tarihidir.
+        tersten_kodlar, son_konum = np.unique(yeni_kodlar[::-1], return_index=True)
+        son_alim_ns[tersten_kodlar] = tarih_ns[onceki_bitis:bitis][::-1][son_konum]
+        onceki_bitis = bitis
+
+        aktif = np.flatnonzero(islem_sayisi)
+        if len(aktif) == 0:
+            continue
+        if len(aktif) < 5:
+            # rfm_skorlarini_hesapla 5'ten az müşteride MPS'i 0 verir.
+            segment_kodlari[aktif, k] = 0
+            continue
+        analiz_tarihi_ns = tarih_ns[bitis - 1] + gun_ns
+        r_skoru = 5 - _quintil_skorlari((analiz_tarihi_ns - son_alim_ns[aktif]) // gun_ns)
+        f_skoru = 1 + _quintil_skorlari(islem_sayisi[aktif])
+        m_skoru = 1 + _quintil_skorlari(toplam_tutar[aktif])
+        mps = ((w_r * r_skoru + w_f * f_skoru + w_m * m_skoru) / 5) * 100
+        segment_kodlari[aktif, k] = np.searchsorted(SEGMENT_SKOR_ARALIKLARI[1:-1], mps, side='right')
+
+    return pd.Index(musteriler, name='MusteriID'), segment_kodlari
+
 def musteri_yolculugu_analizi_yap(temiz_df, sonuclar_df, periyot='Q'):
     """
     NİHAİ VERSİYON: Müşteri segmentlerinin zamana bağlı değişimini analiz eder.
-    Bu versiyon, YENİ, MEVCUT ve KAYIP (CHURN) müşteri akışlarını da hesaplar.
+    Her dönem başlangıcındaki segmentler rfm_anlik_goruntuleri_hesapla ile tek geçişte
+    hesaplanır. Pivot hücreleri SEGMENT_ETIKETLERI kategorilerindedir; yeni ve kayıp müşteri
+    akışları segment_gecislerini_hesapla ile bulunur.
     """
-    df_yolculuk = temiz_df.copy()
-    
-    zaman_araliklari = pd.to_datetime(df_yolculuk['Tarih'].dt.to_period(periyot).sort_values().unique().to_timestamp())
-    
-    tum_segmentler = []
-    
-    for donem_sonu in zaman_araliklari:
-        donem_verisi = df_yolculuk[df_yolculuk['Tarih'] <= donem_sonu]
-        if not donem_verisi.empty:
-            rfm_df = rfm_skorlarini_hesapla(donem_verisi)
-            if rfm_df.empty or 'MPS' not in rfm_df.columns:
-                continue
-            segmentli_df = musterileri_segmentle(rfm_df)
-            segmentli_df['Donem'] = donem_sonu.to_period(periyot)
-            tum_segmentler.append(segmentli_df[['Segment', 'Donem']].reset_index())
+    zaman_araliklari = pd.to_datetime(temiz_df['Tarih'].dt.to_period(periyot).sort_values().unique().to_timestamp())
+    musteriler, segment_kodlari = rfm_anlik_goruntuleri_hesapla(temiz_df, zaman_araliklari)
 
-    if not tum_segmentler:
+    dolu_donemler = np.flatnonzero((segment_kodlari >= 0).any(axis=0))
+    if len(dolu_donemler) == 0:
         return pd.DataFrame(), pd.DataFrame(), None, None
 
-    yolculuk_df = pd.concat(tum_segmentler)
-    
-    # CLV verisini yolculuk verisiyle birleştir
-    yolculuk_df_clv = pd.merge(yolculuk_df, sonuclar_df[['CLV_Net_Kar']], on='MusteriID', how='left')
-    
-    # Pivot'u oluştururken sadece segment bilgilerini alalım
-    yolculuk_pivot = yolculuk_df.pivot_table(index='MusteriID', columns='Donem', values='Segment', aggfunc='first')
+    yolculugu_olanlar = (segment_kodlari[:, dolu_donemler] >= 0).any(axis=1)
+    yolculuk_pivot = pd.DataFrame(
+        {zaman_araliklari[k].to_period(periyot): pd.Categorical.from_codes(segment_kodlari[yolculugu_olanlar, k], categories=SEGMENT_ETIKETLERI, ordered=True)
+         for k in dolu_donemler},
+        index=musteriler[yolculugu_olanlar]
+    )
+    yolculuk_pivot.columns.name = 'Donem'
     
     # CLV'yi pivot'a en son ekleyelim
     yolculuk_pivot = yolculuk_pivot.merge(sonuclar_df[['CLV_Net_Kar']], left_index=True, right_index=True)
     
-    # Bu fonksiyon artık sadece pivot'u döndürecek. Geçiş hesaplaması arayüzde yapılacak.
-    # Bu, yeni/kayıp müşteri mantığını daha temiz bir şekilde yönetmemizi sağlar.
+    # Bu fonksiyon artık sadece pivot'u döndürecek. Geçiş hesaplaması segment_gecislerini_hesapla'dadır.
     return yolculuk_pivot, pd.DataFrame(), None, None # Geriye dönük uyumluluk için boş df döndürüyoruz
 
+def segment_gecislerini_hesapla(yolculuk_pivot, onceki_donem, son_donem, clv_agirlikli=False):
+    """
+    İki dönem arasındaki segment geçişlerini Sankey için (Onceki_Segment, Simdiki_Segment, deger)
+    tablosu olarak döndürür. Önceki dönemde segmenti olmayanlar 'Yeni Müşteri'den gelir, son
+    dönemde olmayanlar 'Pasif / Churn'e gider. 'deger' müşteri sayısı, clv_agirlikli ise toplam CLV'dir.
+    """
+    etiket_sayisi = len(SEGMENT_ETIKETLERI)
+    onceki = pd.Categorical(yolculuk_pivot[onceki_donem], categories=SEGMENT_ETIKETLERI).codes.astype(np.int64)
+    son = pd.Categorical(yolculuk_pivot[son_donem], categories=SEGMENT_ETIKETLERI).codes.astype(np.int64)
+    gecerli = (onceki >= 0) | (son >= 0)
+    # -1 (segment yok) kodu, kaynakta 'Yeni Müşteri', hedefte 'Pasif / Churn' olan son sıraya taşınır.
+    gecis_kodu = (np.where(onceki >= 0, onceki, etiket_sayisi) * (etiket_sayisi + 1) + np.where(son >= 0, son, etiket_sayisi))[gecerli]
+
+    sayilar = np.bincount(gecis_kodu, minlength=(etiket_sayisi + 1) ** 2)
+    if clv_agirlikli:
+        clv = np.nan_to_num(yolculuk_pivot['CLV_Net_Kar'].to_numpy(np.float64))[gecerli]
+        degerler = np.bincount(gecis_kodu, weights=clv, minlength=(etiket_sayisi + 1) ** 2)
+    else:
+        degerler = sayilar
+
+    # Yalnızca en az bir müşterinin izlediği geçişler; satırlar segment sırasındadır.
+    var_olanlar = np.flatnonzero(sayilar)
+    gecisler = pd.DataFrame({
+        'Onceki_Segment': np.array(SEGMENT_ETIKETLERI + ['Yeni Müşteri'], dtype=object)[var_olanlar // (etiket_sayisi + 1)],
+        'Simdiki_Segment': np.array(SEGMENT_ETIKETLERI + ['Pasif / Churn'], dtype=object)[var_olanlar % (etiket_sayisi + 1)],
+        'deger': degerler[var_olanlar]
+    })
+    return gecisler
+
 def urun_tavsiyesi_uret(birliktelik_kurallari, musteri_urunleri_listesi):
     """
     Bir müşterinin satın aldığı ürünlere ve genel birliktelik kurallarına dayanarak
@@ -960,10 +1075,9 @@ def anomali_tespiti_yap(sonuclar_df, kontaminasyon_orani=0.05):
     
     # Modeli kuralım
     # contamination: Veri setindeki beklenen anomali oranıdır.
-    model = IsolationForest(contamination=kontaminasyon_orani, random_state=42)
-    
-    # Modeli eğitelim ve tahmin yapalım
-    model.fit(ozellikler)
+    # Modeli eğitelim (aynı veri ve oranla eğitilmişse kayıttan yükleyelim) ve tahmin yapalım
+    model, _ = egit_veya_yukle('profil_anomali', ozellikler, {'contamination': kontaminasyon_orani, 'random_state': 42},
+                               lambda: (IsolationForest(contamination=kontaminasyon_orani, random_state=42).fit(ozellikler), {}))
     
     # Sonuçları ana DataFrame'e ekleyelim
     # decision_function: Bir değerin ne kadar 'anormal' olduğunu gösteren bir skor. Negatif değerler anomaliye daha yakındır.
@@ -973,47 +1087,35 @@ def anomali_tespiti_yap(sonuclar_df, kontaminasyon_orani=0.05):
     
     return sonuclar_df.sort_values('Anomali_Skoru')
 
-def davranissal_anomali_tespiti_yap(temiz_df, hassasiyet=2.5):
+def davranissal_anomali_tespiti_yap(temiz_df, hassasiyet=2.5, ozellikler=None):
     """
     Her müşterinin kendi geçmiş satın alma sıklığını analiz eder.
     Son alım tarihini ve o tarihten bugüne geçen süreyi de sonuçlara ekler.
     """
-    islem_sayilari = temiz_df['MusteriID'].value_counts()
-    yeterli_verisi_olan_musteriler = islem_sayilari[islem_sayilari >= 5].index
-    
-    df_analiz = temiz_df[temiz_df['MusteriID'].isin(yeterli_verisi_olan_musteriler)].copy()
-    df_analiz = df_analiz.sort_values(['MusteriID', 'Tarih'])
-    
-    df_analiz['Alimlar_Arasi_Sure'] = df_analiz.groupby('MusteriID')['Tarih'].diff().dt.days
-    
-    istatistikler = df_analiz.groupby('MusteriID')['Alimlar_Arasi_Sure'].agg(['mean', 'std']).reset_index()
-    istatistikler.rename(columns={'mean': 'Ortalama_Gun', 'std': 'Std_Sapma'}, inplace=True)
-    istatistikler.fillna(0, inplace=True)
+    if ozellikler is None:
+        ozellikler = musteri_ozelliklerini_hesapla(temiz_df)
+    yeterli_verisi_olanlar = ozellikler[ozellikler['IslemSayisi'] >= 5]
 
-    son_alim_araliklari = df_analiz.groupby('MusteriID')['Alimlar_Arasi_Sure'].last().reset_index()
-    son_alim_araliklari.rename(columns={'Alimlar_Arasi_Sure': 'Son_Alim_Araligi'}, inplace=True)
-    
-    sonuclar = pd.merge(istatistikler, son_alim_araliklari, on='MusteriID')
+    sonuclar = pd.DataFrame({
+        'Ortalama_Gun': yeterli_verisi_olanlar['OrtalamaAlimAraligi'].fillna(0),
+        'Std_Sapma': yeterli_verisi_olanlar['AlimAraligiStd'].fillna(0),
+        'Son_Alim_Araligi': yeterli_verisi_olanlar['SonAlimAraligi']
+    }).reset_index()
     
     sonuclar['Anomali_Esigi_Gun'] = sonuclar['Ortalama_Gun'] + (hassasiyet * sonuclar['Std_Sapma'])
     
-    sonuclar['Anomali_Durumu'] = sonuclar.apply(
-        lambda row: "Evet" if row['Son_Alim_Araligi'] > row['Anomali_Esigi_Gun'] and row['Anomali_Esigi_Gun'] > 0 else "Hayır", 
-        axis=1
-    )
+    anomali_mi = (sonuclar['Son_Alim_Araligi'] > sonuclar['Anomali_Esigi_Gun']) & (sonuclar['Anomali_Esigi_Gun'] > 0)
+    sonuclar['Anomali_Durumu'] = np.where(anomali_mi, "Evet", "Hayır")
     
-    anomaliler_df = sonuclar[sonuclar['Anomali_Durumu'] == 'Evet']
+    anomaliler_df = sonuclar[anomali_mi].reset_index(drop=True)
     
     if anomaliler_df.empty:
         return pd.DataFrame()
 
-    son_alim_tarihleri = temiz_df.groupby('MusteriID')['Tarih'].max().reset_index()
-    son_alim_tarihleri.rename(columns={'Tarih': 'Son_Alim_Tarihi'}, inplace=True)
-    
-    anomaliler_df = pd.merge(anomaliler_df, son_alim_tarihleri, on='MusteriID')
+    anomaliler_df['Son_Alim_Tarihi'] = musterilere_yay(ozellikler['SonAlimTarihi'], anomaliler_df['MusteriID'])
 
     # Analizin yapıldığı "bugün" tarihini verideki en son tarih olarak alalım
-    analiz_gunu = temiz_df['Tarih'].max()
+    analiz_gunu = ozellikler['SonAlimTarihi'].max()
     # Son alım tarihinden bugüne geçen gün sayısını hesaplayalım
     anomaliler_df['Gecen_Sure_Gun'] = (analiz_gunu - anomaliler_df['Son_Alim_Tarihi']).dt.days
 
@@ -1059,9 +1161,9 @@ def islem_bazli_anomali_tespiti_yap(temiz_df, kontaminasyon_orani=0.01):
     # Modelin kullanacağı özellikleri seçelim
     ozellikler = df_kopya[['Miktar', 'BirimFiyat', 'ToplamTutar', 'Saat', 'Haftanin_Gunu']]
     
-    # Isolation Forest modelini kuralım
-    model = IsolationForest(contamination=kontaminasyon_orani, random_state=42)
-    model.fit(ozellikler)
+    # Isolation Forest modelini kuralım (aynı veri ve oranla eğitilmişse kayıttan yüklenir)
+    model, _ = egit_veya_yukle('islem_anomali', ozellikler, {'contamination': kontaminasyon_orani, 'random_state': 42},
+                               lambda: (IsolationForest(contamination=kontaminasyon_orani, random_state=42).fit(ozellikler), {}))
     
     # Tahminleri yapıp ana DataFrame'e ekleyelim
     df_kopya['Anomali_Skoru'] = model.decision_function(ozellikler)
@@ -1072,6 +1174,23 @@ def islem_bazli_anomali_tespiti_yap(temiz_df, kontaminasyon_orani=0.01):
     
     return anomaliler_df
 
+def _kmeans_modeli(tur, df_ozellikler, kume_sayisi):
+    """
+    Ölçeklenmiş özelliklerle eğitilmiş (scaler, kmeans) ikilisini model kaydından yükler;
+    yoksa eğitip siluet skoruyla birlikte kaydeder.
+    """
+    def egit():
+        scaler = StandardScaler()
+        ozellikler_scaled = scaler.fit_transform(df_ozellikler)
+        kmeans = KMeans(n_clusters=kume_sayisi, init='k-means++', random_state=42, n_init='auto')
+        kumeler = kmeans.fit_predict(ozellikler_scaled)
+        metrikler = {'inertia': float(kmeans.inertia_)}
+        if 1 < len(set(kumeler)) < len(kumeler):
+            metrikler['siluet_skoru'] = float(silhouette_score(ozellikler_scaled, kumeler))
+        return (scaler, kmeans), metrikler
+    hiperparametreler = {'n_clusters': kume_sayisi, 'init': 'k-means++', 'random_state': 42, 'n_init': 'auto'}
+    return egit_veya_yukle(tur, df_ozellikler, hiperparametreler, egit)[0]
+
 def anomali_gruplama_yap(anomaliler_df, kume_sayisi=3):
     """
     Tespit edilen anormal müşterileri, RFM profillerine göre K-Means ile kümelere ayırır
@@ -1083,12 +1202,10 @@ def anomali_gruplama_yap(anomaliler_df, kume_sayisi=3):
     ozellikler = anomaliler_df[['Recency', 'Frequency', 'Monetary']].copy()
     
     # K-Means mesafeye dayalı olduğu için veriyi ölçeklendirmek çok önemlidir.
-    scaler = StandardScaler()
-    ozellikler_scaled = scaler.fit_transform(ozellikler)
-    
-    # K-Means modelini kur ve çalıştır
-    kmeans = KMeans(n_clusters=kume_sayisi, init='k-means++', random_state=42, n_init='auto')
-    anomaliler_df['Anomali_Grubu_ID'] = kmeans.fit_predict(ozellikler_scaled)
+    # K-Means modelini kur ve çalıştır (aynı veriyle eğitilmişse kayıttan yükle)
+    scaler, kmeans = _kmeans_modeli('anomali_kmeans', ozellikler, kume_sayisi)
+    ozellikler_scaled = scaler.transform(ozellikler)
+    anomaliler_df['Anomali_Grubu_ID'] = kmeans.predict(ozellikler_scaled)
     
     # Kümelerin merkezlerini (ortalama profillerini) bul ve orijinal ölçeğe geri çevir
     merkezler_scaled = kmeans.cluster_centers_
@@ -1133,19 +1250,23 @@ def musteri_benzerlik_hesapla(sonuclar_df):
     
     return similarity_df
 
-def benzer_musteri_urun_onerileri(temiz_df, kaynak_musteri_id, benzer_musteri_idler):
+def benzer_musteri_urun_onerileri(temiz_df, kaynak_musteri_id, benzer_musteri_idler, ofset_indeksi=None):
     """
     Bir kaynak müşteriye en çok benzeyen müşterilerin satın aldığı, ancak kaynak
     müşterinin henüz almadığı ürünleri tespit eder ve öneri olarak listeler.
+    'ofset_indeksi' verilirse müşterilerin satırları tablo taranmadan alınır.
     """
     if not benzer_musteri_idler:
         return pd.DataFrame()
 
     # 1. Kaynak müşterinin zaten satın aldığı ürünleri bul
-    kaynak_urunler = set(temiz_df[temiz_df['MusteriID'] == kaynak_musteri_id]['UrunKodu'].unique())
-    
     # 2. Benzer müşterilerin tüm alımlarını filtrele
-    benzerlerin_alimlari = temiz_df[temiz_df['MusteriID'].isin(benzer_musteri_idler)]
+    if ofset_indeksi is not None:
+        kaynak_urunler = set(musteri_dilimi(temiz_df, ofset_indeksi, kaynak_musteri_id)['UrunKodu'].unique())
+        benzerlerin_alimlari = pd.concat([musteri_dilimi(temiz_df, ofset_indeksi, musteri_id) for musteri_id in benzer_musteri_idler])
+    else:
+        kaynak_urunler = set(temiz_df[temiz_df['MusteriID'] == kaynak_musteri_id]['UrunKodu'].unique())
+        benzerlerin_alimlari = temiz_df[temiz_df['MusteriID'].isin(benzer_musteri_idler)]
     
     # 3. Benzerlerin aldığı ama kaynak müşterinin almadığı ürünleri bul
     onerilecek_urunler = benzerlerin_alimlari[~benzerlerin_alimlari['UrunKodu'].isin(kaynak_urunler)]
@@ -1154,7 +1275,7 @@ def benzer_musteri_urun_onerileri(temiz_df, kaynak_musteri_id, benzer_musteri_id
         return pd.DataFrame()
         
     # 4. Bu öneri ürünlerini, benzer müşteriler arasındaki popülerliğine göre sırala
-    oneri_skorlari = onerilecek_urunler.groupby('UrunKodu')['MusteriID'].nunique().reset_index()
+    oneri_skorlari = onerilecek_urunler.groupby('UrunKodu', observed=True)['MusteriID'].nunique().reset_index()
     oneri_skorlari.rename(columns={'MusteriID': 'Benzer_Musteri_Sayisi'}, inplace=True)
     
     # Alım oranını hesapla
@@ -1167,11 +1288,8 @@ def kmeans_kumeleme_yap(sonuclar_df, kume_sayisi=4, ozellikler=['Recency', 'Freq
     GÜNCELLENMİŞ: Belirtilen özelliklere göre K-Means kümelemesi yapar.
     """
     df_ozellikler = sonuclar_df[ozellikler].copy()
-    scaler = StandardScaler()
-    ozellikler_scaled = scaler.fit_transform(df_ozellikler)
-    
-    kmeans = KMeans(n_clusters=kume_sayisi, init='k-means++', random_state=42, n_init='auto')
-    sonuclar_df['Kume'] = kmeans.fit_predict(ozellikler_scaled)
+    scaler, kmeans = _kmeans_modeli('kmeans', df_ozellikler, kume_sayisi)
+    sonuclar_df['Kume'] = kmeans.predict(scaler.transform(df_ozellikler))
     
     merkezler = scaler.inverse_transform(kmeans.cluster_centers_)
     merkezler_df = pd.DataFrame(merkezler, columns=ozellikler)
@@ -1225,11 +1343,14 @@ def en_iyi_kume_sayisini_bul(sonuclar_df, max_kume=10, ozellikler=['Recency', 'F
         
     return pd.DataFrame(skorlar)
 
-def donemsel_analiz_yap(temiz_df, baslangic1, bitis1, baslangic2, bitis2):
+def donemsel_analiz_yap(temiz_df, baslangic1, bitis1, baslangic2, bitis2, ozellikler=None):
     """
     Kullanıcı tarafından seçilen iki farklı zaman periyodu için temel metrikleri hesaplar ve
-    karşılaştırma için bir sonuç sözlüğü döndürür.
+    karşılaştırma için bir sonuç sözlüğü döndürür. 'temiz_df' yalnızca iki dönemin satırlarını
+    içeriyorsa, yeni müşterilerin doğru bulunması için tüm geçmişin 'ozellikler' tablosu verilmelidir.
     """
+    if ozellikler is None:
+        ozellikler = musteri_ozelliklerini_hesapla(temiz_df)
     # Veriyi periyotlara göre filtrele
     periyot1_df = temiz_df[
         (temiz_df['Tarih'].dt.date >= baslangic1) & 
@@ -1241,7 +1362,7 @@ def donemsel_analiz_yap(temiz_df, baslangic1, bitis1, baslangic2, bitis2):
     ]
 
     # Her müşterinin ilk alışveriş tarihini bul (yeni müşteri tespiti için)
-    ilk_alisveris_tarihleri = temiz_df.groupby('MusteriID')['Tarih'].min().dt.date
+    ilk_alisveris_tarihleri = ozellikler['IlkAlimTarihi'].dt.date
 
     def metrikleri_hesapla(df, baslangic, bitis):
         toplam_ciro = df['ToplamTutar'].sum()
@@ -1320,12 +1441,9 @@ def gelecek_tahmini_yap(time_series_df, tahmin_periyodu_ay=12):
     Prophet kütüphanesini kullanarak, bir zaman serisi için gelecek tahmini yapar.
     GÜNCELLENMİŞ: Negatif tahmin sonuçlarını sıfırlar.
     """
-    # Prophet modelini Türkiye tatillerini içerecek şekilde kur
-    model = Prophet(yearly_seasonality=True, weekly_seasonality=True, daily_seasonality=False)
-    model.add_country_holidays(country_name='TR')
-    
-    # Modeli eğit
-    model.fit(time_series_df)
+    # Prophet modelini Türkiye tatillerini içerecek şekilde kur ve eğit (kayıtlıysa yükle)
+    model = _prophet_modeli('tatilli_prophet', time_series_df, ulke_tatilleri='TR', yearly_seasonality=True,
+                            weekly_seasonality=True, daily_seasonality=False)
     
     # Gelecek için bir dataframe oluştur
     future = model.make_future_dataframe(periods=tahmin_periyodu_ay, freq='M')
@@ -1337,29 +1455,16 @@ def gelecek_tahmini_yap(time_series_df, tahmin_periyodu_ay=12):
 
     return model, forecast
 
-def kategori_migrasyon_analizi_yap(temiz_df):
+def kategori_migrasyon_analizi_yap(temiz_df, ozellikler=None):
     """
     Müşterilerin ilk ve ikinci satın alma kategorileri arasındaki geçişleri
     analiz eder ve bir geçiş matrisi döndürür.
     """
+    if ozellikler is None:
+        ozellikler = musteri_ozelliklerini_hesapla(temiz_df)
     # Analiz için sadece en az 2 farklı işlemi olan müşterileri al
-    islem_sayilari = temiz_df['MusteriID'].value_counts()
-    hedef_musteriler = islem_sayilari[islem_sayilari >= 2].index
-    df_analiz = temiz_df[temiz_df['MusteriID'].isin(hedef_musteriler)].copy()
-    
-    df_analiz = df_analiz.sort_values(['MusteriID', 'Tarih'])
-    
-    # Her müşterinin ilk ve ikinci alımını bul
-    ilk_alimlar = df_analiz.groupby('MusteriID').first().reset_index()
-    ikinci_alimlar = df_analiz.groupby('MusteriID').nth(1).reset_index()
-    
-    # Geçiş verisini oluştur
-    gecis_df = pd.merge(
-        ilk_alimlar[['MusteriID', 'Kategori']],
-        ikinci_alimlar[['MusteriID', 'Kategori']],
-        on='MusteriID',
-        suffixes=('_ilk', '_ikinci')
-    )
+    gecis_df = ozellikler.loc[ozellikler['IslemSayisi'] >= 2, ['IlkKategori', 'IkinciKategori']]
+    gecis_df = gecis_df.rename(columns={'IlkKategori': 'Kategori_ilk', 'IkinciKategori': 'Kategori_ikinci'})
 
     # Geçiş matrisini (crosstab) oluştur
     migrasyon_matrisi = pd.crosstab(gecis_df['Kategori_ilk'], gecis_df['Kategori_ikinci'], normalize='index')
@@ -1374,7 +1479,7 @@ def kategori_performans_analizi_yap(temiz_df):
         return pd.DataFrame()
 
     # Kategori bazında temel metrikleri hesapla
-    kategori_performans = temiz_df.groupby('Kategori').agg(
+    kategori_performans = temiz_df.groupby('Kategori', observed=True).agg(
         Toplam_Ciro=('ToplamTutar', 'sum'),
         Toplam_Net_Kar=('NetKar', 'sum'),
         Benzersiz_Musteri_Sayisi=('MusteriID', 'nunique'),
@@ -1387,7 +1492,7 @@ def kategori_performans_analizi_yap(temiz_df):
     kategori_performans['Musteri_Basina_Ciro'] = kategori_performans['Toplam_Ciro'] / kategori_performans['Benzersiz_Musteri_Sayisi']
     
     # NaN değerleri (0'a bölünme durumunda) temizle
-    kategori_performans.fillna(0, inplace=True)
+    kategori_performans.fillna({'Kar_Marji': 0, 'Musteri_Basina_Ciro': 0}, inplace=True)
     
     return kategori_performans.sort_values('Toplam_Ciro', ascending=False)
 
@@ -1505,7 +1610,7 @@ def kategori_yasam_dongusu_analizi_yap(temiz_df):
         return pd.DataFrame()
 
     # Her kategorinin, her aydaki performansını birden fazla metrikle hesapla
-    aylik_kategori_performans = temiz_df.groupby([pd.Grouper(key='Tarih', freq='M'), 'Kategori']).agg(
+    aylik_kategori_performans = temiz_df.groupby([pd.Grouper(key='Tarih', freq='M'), 'Kategori'], observed=True).agg(
         ToplamCiro=('ToplamTutar', 'sum'),
         BenzersizMusteriSayisi=('MusteriID', 'nunique'),
         NetKar=('NetKar', 'sum')
@@ -1556,7 +1661,9 @@ def kategori_sepet_birlikteligi_yap(temiz_df, min_support=0.01):
     
     # Apriori algoritması için veriyi hazırla: one-hot encoding
     # Her satır bir sepet, her sütun bir kategori. Değerler 1 (sepette var) veya 0 (yok).
-    sepet_matrisi = pd.crosstab(index=[sepetler['MusteriID'], sepetler['Tarih']], columns=sepetler['Kategori'])
+    # Sözlük kodlu kolonlarda crosstab tüm müşteri x tarih kombinasyonlarını üreteceği için
+    # sadece gözlenen sepetler üzerinden gruplanır.
+    sepet_matrisi = sepetler.groupby(['MusteriID', 'Tarih', 'Kategori'], observed=True).size().unstack(fill_value=0)
     
     # Sıkça birlikte görülen kategori setlerini bul
     sik_kullanilan_kategoriler = apriori(sepet_matrisi, min_support=min_support, use_colnames=True)
@@ -1590,7 +1697,7 @@ def urun_performans_analizi_yap(temiz_df, baslangic_tarihi=None, bitis_tarihi=No
         return pd.DataFrame()
 
     # Ürün bazında temel metrikleri hesapla
-    urun_performans = df_analiz.groupby('UrunKodu').agg(
+    urun_performans = df_analiz.groupby('UrunKodu', observed=True).agg(
         Toplam_Ciro=('ToplamTutar', 'sum'),
         Toplam_Net_Kar=('NetKar', 'sum'),
         Benzersiz_Musteri_Sayisi=('MusteriID', 'nunique'),
@@ -1602,7 +1709,7 @@ def urun_performans_analizi_yap(temiz_df, baslangic_tarihi=None, bitis_tarihi=No
     urun_performans['Kar_Marji'] = (urun_performans['Toplam_Net_Kar'] / urun_performans['Toplam_Ciro']) * 100
     
     # NaN değerleri (0'a bölünme durumunda) temizle
-    urun_performans.fillna(0, inplace=True)
+    urun_performans.fillna({'Kar_Marji': 0}, inplace=True)
     
     return urun_performans.sort_values('Toplam_Ciro', ascending=False)
 
@@ -1633,7 +1740,7 @@ def segment_icin_urun_profili(temiz_df, sonuclar_df, secilen_segment):
     segment_alimlari = temiz_df[temiz_df['MusteriID'].isin(segmente_ait_musteriler)]
     
     # Bu segmentin en çok aldığı ürünleri ciroya göre sırala
-    en_populer_urunler = segment_alimlari.groupby('UrunKodu')['ToplamTutar'].sum().nlargest(10)
+    en_populer_urunler = segment_alimlari.groupby('UrunKodu', observed=True)['ToplamTutar'].sum().nlargest(10)
     
     return en_populer_urunler
 
@@ -1707,10 +1814,94 @@ def random_forest_tahmin(df, tahmin_periyodu=6):
     
     return model, tahmin_df
 
-def churn_tahmin_modeli_olustur(rfm_df, churn_limiti_gun=180):
+# Churn model seçiminde denenen adaylar: (temel model, hiperparametre ızgarası). Lojistik
+# regresyon ölçekleyiciyle bir hat (Pipeline) olarak kurulur; parametreler hat adımıyla verilir.
+CHURN_MODEL_ADAYLARI = {
+    'RandomForest': (
+        RandomForestClassifier(random_state=42, class_weight='balanced'),
+        {'n_estimators': [100, 300], 'max_depth': [5, 10, None], 'min_samples_leaf': [1, 5]}),
+    'GradientBoosting': (
+        GradientBoostingClassifier(random_state=42),
+        {'n_estimators': [100, 200], 'max_depth': [2, 3], 'learning_rate': [0.05, 0.1]}),
+    'LogisticRegression': (
+        make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, class_weight='balanced')),
+        {'logisticregression__C': [0.1, 1.0, 10.0]}),
+}
+
+def churn_modeli_adi(model):
+    """
+    Eğitilmiş churn modelinin okunur adı (örn. 'Gradient Boosting'). Ad, modelin türüne karşılık
+    gelen CHURN_MODEL_ADAYLARI anahtarından, yani model seçimi sonuç tablosundaki addan türetilir.
+    """
+    for aday_adi, (temel_model, _) in CHURN_MODEL_ADAYLARI.items():
+        if type(model) is type(temel_model):
+            return re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', aday_adi)
+    return type(model).__name__
+
+_isci_secim_verisi = None
+
+def _secim_iscisini_hazirla(X, y, katlar):
+    # Özellik matrisi ve katlar her sürece bir kez gönderilir; işler yalnızca indis taşır.
+    global _isci_secim_verisi
+    _isci_secim_verisi = (X, y, katlar)
+
+def _aday_katini_degerlendir(aday_adi, parametreler, kat_no, veri=None):
+    X, y, katlar = veri or _isci_secim_verisi
+    egitim_satirlari, test_satirlari = katlar[kat_no]
+    model = clone(CHURN_MODEL_ADAYLARI[aday_adi][0]).set_params(**parametreler)
+    model.fit(X[egitim_satirlari], y[egitim_satirlari])
+    olasiliklar = model.predict_proba(X[test_satirlari])[:, 1]
+    return (roc_auc_score(y[test_satirlari], olasiliklar),
+            accuracy_score(y[test_satirlari], (olasiliklar >= 0.5).astype(int)))
+
+def churn_modeli_sec(X, y, kat_sayisi=5, is_parcacigi_sayisi=None):
+    """
+    CHURN_MODEL_ADAYLARI'ndaki tüm aday/parametre birleşimlerini katmanlı k-katlı çapraz
+    doğrulamayla ROC AUC'ye göre karşılaştırır. Tüm (aday, parametre, kat) işleri
+    'is_parcacigi_sayisi' (varsayılan: çekirdek sayısı) süreçli tek bir havuzda çalışır;
+    özellik matrisi bir kez diziye çevrilir ve her sürece bir kez gönderilir. (en iyi model
+    [eğitilmemiş], sonuç tablosu) döndürür; sonuç tablosu ortalama ROC AUC'ye göre sıralıdır.
+    """
+    X_dizi = np.ascontiguousarray(X.to_numpy(np.float64))
+    y_dizi = np.asarray(y, dtype=np.int64)
+    # Her katta iki sınıfın da bulunması için kat sayısı azınlık sınıfının boyutunu aşamaz.
+    kat_sayisi = max(2, min(kat_sayisi, np.bincount(y_dizi).min()))
+    katlar = list(StratifiedKFold(n_splits=kat_sayisi, shuffle=True, random_state=42).split(X_dizi, y_dizi))
+    birlesimler = [(aday_adi, parametreler) for aday_adi, (_, izgara) in CHURN_MODEL_ADAYLARI.items()
+                   for parametreler in ParameterGrid(izgara)]
+
+    isler = [(aday_adi, parametreler, kat_no) for aday_adi, parametreler in birlesimler for kat_no in range(kat_sayisi)]
+    is_parcacigi_sayisi = is_parcacigi_sayisi or os.cpu_count() or 1
+
+    baslangic = time.perf_counter()
+    if is_parcacigi_sayisi == 1:
+        skorlar = [_aday_katini_degerlendir(*is_, veri=(X_dizi, y_dizi, katlar)) for is_ in isler]
+    else:
+        # Seçim Streamlit sunucusunda da çalışabilir; işçiler 'fork' ile başlatılmaz.
+        with SurecHavuzu(max_workers=min(is_parcacigi_sayisi, len(isler)),
+                         initializer=_secim_iscisini_hazirla, initargs=(X_dizi, y_dizi, katlar)) as havuz:
+            skorlar = list(havuz.map(_aday_katini_degerlendir, *zip(*isler)))
+    skorlar = np.asarray(skorlar).reshape(len(birlesimler), kat_sayisi, 2)
+
+    sonuc_tablosu = pd.DataFrame({
+        'Model': [aday_adi for aday_adi, _ in birlesimler],
+        'Parametreler': [parametreler for _, parametreler in birlesimler],
+        'CV_ROC_AUC': skorlar[:, :, 0].mean(axis=1),
+        'CV_ROC_AUC_Std': skorlar[:, :, 0].std(axis=1),
+        'CV_Dogruluk': skorlar[:, :, 1].mean(axis=1),
+    }).sort_values('CV_ROC_AUC', ascending=False, kind='stable').reset_index(drop=True)
+    en_iyi = sonuc_tablosu.iloc[0]
+    print(f"✓ {len(birlesimler)} churn modeli adayı {kat_sayisi} katla {time.perf_counter() - baslangic:.2f} sn'de "
+          f"karşılaştırıldı. En iyi: {en_iyi['Model']} {en_iyi['Parametreler']} (ROC AUC {en_iyi['CV_ROC_AUC']:.3f})")
+    return clone(CHURN_MODEL_ADAYLARI[en_iyi['Model']][0]).set_params(**en_iyi['Parametreler']), sonuc_tablosu
+
+def churn_tahmin_modeli_olustur(rfm_df, churn_limiti_gun=180, ek_ozellikler=None, model_secimi=False, kat_sayisi=5):
     """
     GÜNCELLENMİŞ: RandomForestClassifier kullanarak daha doğru bir churn tahmin modeli oluşturur.
-    SHAP analizi için gerekli olan X, X_train, modeli ve explainer'ı döndürür.
+    SHAP analizi için gerekli olan X, X_train, modeli ve explainer'ı döndürür. 'ek_ozellikler'
+    (örn. son 30/90/180/365 günlük harcama ve işlem sayıları) müşteri indeksiyle modele eklenir.
+    'model_secimi' açıksa sabit Random Forest yerine eğitim verisinde çapraz doğrulamayla
+    seçilen aday (bkz. churn_modeli_sec) eğitilir; seçim sonucu model kaydına yazılır.
     """
     rfm_df['Churn'] = rfm_df['Recency'].apply(lambda x: 1 if x > churn_limiti_gun else 0)
     
@@ -1719,6 +1910,8 @@ def churn_tahmin_modeli_olustur(rfm_df, churn_limiti_gun=180):
         return rfm_df, None, None, None, None, 0 # X_train için None eklendi
 
     X = rfm_df[['Recency', 'Frequency', 'Monetary']]
+    if ek_ozellikler is not None:
+        X = X.join(ek_ozellikler).fillna(0)
     y = rfm_df['Churn']
     
     try:
@@ -1726,27 +1919,49 @@ def churn_tahmin_modeli_olustur(rfm_df, churn_limiti_gun=180):
     except ValueError:
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    model = RandomForestClassifier(random_state=42, n_estimators=100, max_depth=5, class_weight='balanced')
-    model.fit(X_train, y_train)
-    
-    dogruluk = accuracy_score(y_test, model.predict(X_test))
+    # Model, aynı eğitim verisi ve ayarlarla daha önce eğitildiyse model kaydından yüklenir.
+    if model_secimi:
+        hiperparametreler = {'model_secimi': True, 'kat_sayisi': kat_sayisi, 'test_size': 0.2,
+                             'churn_limiti_gun': churn_limiti_gun,
+                             'adaylar': {ad: izgara for ad, (_, izgara) in CHURN_MODEL_ADAYLARI.items()}}
+    else:
+        hiperparametreler = {'random_state': 42, 'n_estimators': 100, 'max_depth': 5, 'class_weight': 'balanced',
+                             'churn_limiti_gun': churn_limiti_gun, 'test_size': 0.2}
+    def egit():
+        metrikler = {}
+        if model_secimi:
+            # Seçim yalnızca eğitim kısmında yapılır; test kısmı son doğruluk için ayrılır.
+            model, sonuc_tablosu = churn_modeli_sec(X_train, y_train, kat_sayisi=kat_sayisi)
+            en_iyi = sonuc_tablosu.iloc[0]
+            metrikler = {'secilen_model': en_iyi['Model'], 'secilen_parametreler': en_iyi['Parametreler'],
+                         'cv_roc_auc': float(en_iyi['CV_ROC_AUC']),
+                         'aday_sonuclari': sonuc_tablosu.to_dict('records')}
+        else:
+            model = RandomForestClassifier(random_state=42, n_estimators=100, max_depth=5, class_weight='balanced')
+        model.fit(X_train, y_train)
+        metrikler.update({'dogruluk': float(accuracy_score(y_test, model.predict(X_test))),
+                          'egitim_satir_sayisi': len(X_train), 'test_satir_sayisi': len(X_test)})
+        return model, metrikler
+    model, bilgi = egit_veya_yukle('churn', (X, y), hiperparametreler, egit)
+
+    dogruluk = bilgi['metrikler']['dogruluk']
     rfm_df['Churn_Olasiligi'] = model.predict_proba(X)[:, 1]
 
-    explainer = shap.TreeExplainer(model)
+    explainer = aciklayici_olustur(model, X_train)
     
     # X_train'i de döndürerek global SHAP analizi için tutarlılık sağlıyoruz
     return rfm_df.sort_values('Churn_Olasiligi', ascending=False), model, explainer, X, X_train, dogruluk
 
-def bireysel_churn_etkenlerini_hesapla(explainer, musteri_verisi_X):
+def bireysel_churn_etkenlerini_hesapla(shap_deposu, musteri_id):
     """
-    NİHAİ VERSİYON: SHAP kütüphanesinin modern API'ını kullanarak, bir müşteriye ait
-    tüm SHAP bilgilerini içeren tam bir Explanation nesnesi döndürür.
+    NİHAİ VERSİYON: Bir müşterinin churn sınıfı SHAP açıklamasını (Explanation) önceden
+    hesaplanmış SHAP deposundan döndürür; SHAP yeniden çalıştırılmaz.
     """
-    if explainer is None:
+    if shap_deposu is None:
         return None
-        
-    # Tek bir müşteriye ait tüm SHAP bilgilerini (her iki sınıf için) bütün bir nesne olarak döndür.
-    return explainer(musteri_verisi_X)
+
+    # Müşterinin satırı depodan okunur; şelale grafiği doğrudan çizilebilir.
+    return shap_deposu.musteri_aciklamasi(musteri_id)
 
 def anomali_nedenlerini_acikla(sonuclar_df):
     """
@@ -1826,21 +2041,22 @@ def segmente_benzer_musteri_bul(sonuclar_df, kaynak_segment, top_n=10):
     
     return en_benzerler_detayli.sort_values('Benzerlik_Skoru', ascending=False)
 
-@st.cache_data
-def _musteri_urun_setlerini_getir(temiz_df):
+def _musteri_urun_setlerini_getir(temiz_df, ozellikler=None):
     
     """
-    (Yardımcı Fonksiyon) Her müşterinin satın aldığı benzersiz ürünlerin setini oluşturur.
-    Tekrar tekrar hesaplanmaması için cache'lenir.
+    (Yardımcı Fonksiyon) Her müşterinin satın aldığı benzersiz ürünlerin setini döndürür.
+    Setler müşteri özellik tablosunda bir kez oluşturulur.
     """
-    return temiz_df.groupby('MusteriID')['UrunKodu'].apply(set)
+    if ozellikler is None:
+        ozellikler = musteri_ozelliklerini_hesapla(temiz_df)
+    return ozellikler['UrunSeti']
 
-def urun_benzerligi_hesapla(temiz_df, kaynak_musteri_id):
+def urun_benzerligi_hesapla(temiz_df, kaynak_musteri_id, ozellikler=None):
     """
     Bir kaynak müşterinin ürün zevkinin diğer tüm müşterilere olan 
     Jaccard benzerliğini hesaplar.
     """
-    musteri_urun_setleri = _musteri_urun_setlerini_getir(temiz_df)
+    musteri_urun_setleri = _musteri_urun_setlerini_getir(temiz_df, ozellikler)
     
     if kaynak_musteri_id not in musteri_urun_setleri:
         return pd.Series(dtype='float64')
@@ -0,0 +1,64 @@
+# benchmarks/churn_scorer_benchmark.py
+# SORUMLULUĞU: tree_scorer'daki düz ağaç skorlayıcısını, churn modelinin sklearn
+# predict_proba yoluyla tek müşteri ve toplu skorlamada karşılaştırmak.
+#
+# Kullanım: python benchmarks/churn_scorer_benchmark.py [musteri_sayisi]
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_store import pencere_kolonlari
+from tree_scorer import agac_modelini_disa_aktar
+
+def sentetik_ozellikler_uret(musteri_sayisi, tohum=42):
+    """Churn modelinin özellik şemasında (RFM + pencereli kolonlar) rastgele müşteriler üretir."""
+    rng = np.random.default_rng(tohum)
+    kolonlar = ['Recency', 'Frequency', 'Monetary'] + pencere_kolonlari()
+    X = pd.DataFrame(rng.lognormal(3, 1.5, (musteri_sayisi, len(kolonlar))), columns=kolonlar,
+                     index=pd.Index([f"M{i:07d}" for i in range(musteri_sayisi)], name='MusteriID'))
+    y = ((X['Recency'] > 40) ^ (rng.random(musteri_sayisi) < 0.1)).astype(int)
+    return X, y
+
+def tek_satir_suresi(skorla, satir, tekrar):
+    baslangic = time.perf_counter()
+    for _ in range(tekrar):
+        skorla(satir)
+    return (time.perf_counter() - baslangic) / tekrar * 1e6
+
+def main():
+    musteri_sayisi = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    X_egitim, y_egitim = sentetik_ozellikler_uret(20_000)
+    model = RandomForestClassifier(random_state=42, n_estimators=100, max_depth=5, class_weight='balanced')
+    model.fit(X_egitim, y_egitim)
+    skorlayici = agac_modelini_disa_aktar(model)
+
+    print(f"{musteri_sayisi:,} müşterili sentetik özellik tablosu üretiliyor...")
+    X, _ = sentetik_ozellikler_uret(musteri_sayisi, tohum=7)
+
+    baslangic = time.perf_counter()
+    sklearn_skorlari = model.predict_proba(X)[:, 1]
+    sklearn_suresi = time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    duz_skorlar = skorlayici.skorla(X.to_numpy())
+    duz_sure = time.perf_counter() - baslangic
+    np.testing.assert_allclose(duz_skorlar, sklearn_skorlari, atol=1e-12)
+
+    # Sayfadaki tek müşteri senaryosu: sklearn'e tek satırlık DataFrame, düz modele dizi verilir.
+    sklearn_tek = tek_satir_suresi(lambda satir: model.predict_proba(satir)[:, 1], X.iloc[[0]], 200)
+    duz_tek = tek_satir_suresi(skorlayici.skorla, X.iloc[0].to_numpy(), 2000)
+
+    print(f"Toplu, sklearn predict_proba    : {sklearn_suresi:8.2f} sn")
+    print(f"Toplu, düz ağaç skorlayıcısı    : {duz_sure:8.2f} sn")
+    print(f"Tek müşteri, sklearn            : {sklearn_tek:8.0f} µs")
+    print(f"Tek müşteri, düz ağaç           : {duz_tek:8.0f} µs")
+    print(f"Hızlanma (tek müşteri)          : {sklearn_tek / duz_tek:8.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/clv_benchmark.py
+# SORUMLULUĞU: probabilistic_clv'deki BG/NBD ve Gamma-Gamma kestirimlerinin milyon müşterilik
+# özetlerde süresini ölçmek ve bilinen parametrelerle üretilmiş veride parametreleri geri
+# bulduğunu göstermek.
+#
+# Kullanım: python benchmarks/clv_benchmark.py [musteri_sayisi]
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from probabilistic_clv import bgnbd_uydur, gamma_gamma_uydur
+
+GERCEK_BGNBD = {'r': 0.8, 'alpha': 30.0, 'a': 2.5, 'b': 6.0}
+GERCEK_GAMMA_GAMMA = {'p': 4.0, 'q': 3.0, 'v': 50.0}
+
+def sentetik_ozetler_uret(musteri_sayisi, tohum=42):
+    """BG/NBD ve Gamma-Gamma süreçlerinden gün cinsinden müşteri özetleri üretir."""
+    rng = np.random.default_rng(tohum)
+    hiz = rng.gamma(GERCEK_BGNBD['r'], 1 / GERCEK_BGNBD['alpha'], musteri_sayisi)
+    birakma = rng.beta(GERCEK_BGNBD['a'], GERCEK_BGNBD['b'], musteri_sayisi)
+    T = rng.integers(30, 730, musteri_sayisi).astype(float)
+
+    frekans, yakinlik, zaman = np.zeros(musteri_sayisi), np.zeros(musteri_sayisi), np.zeros(musteri_sayisi)
+    aktif = np.arange(musteri_sayisi)
+    while len(aktif):
+        zaman[aktif] += rng.exponential(1 / hiz[aktif])
+        aktif = aktif[zaman[aktif] < T[aktif]]
+        frekans[aktif] += 1
+        yakinlik[aktif] = zaman[aktif]
+        aktif = aktif[rng.random(len(aktif)) >= birakma[aktif]]
+
+    # Her tekrar alımın tutarı Gamma(p, nu), nu ~ Gamma(q, v); özet, alımların ortalamasıdır.
+    nu = rng.gamma(GERCEK_GAMMA_GAMMA['q'], 1 / GERCEK_GAMMA_GAMMA['v'], musteri_sayisi)
+    toplam = rng.gamma(GERCEK_GAMMA_GAMMA['p'] * np.maximum(frekans, 1), 1 / nu)
+    return pd.DataFrame({
+        'frekans': frekans,
+        'yakinlik': np.floor(yakinlik),
+        'T': T,
+        'ortalama_tutar': np.where(frekans > 0, toplam / np.maximum(frekans, 1), 0.0),
+    })
+
+def main():
+    musteri_sayisi = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{musteri_sayisi:,} müşterilik sentetik özet üretiliyor...")
+    ozet = sentetik_ozetler_uret(musteri_sayisi)
+
+    baslangic = time.perf_counter()
+    bgnbd, metrikler = bgnbd_uydur(ozet)
+    bgnbd_suresi = time.perf_counter() - baslangic
+    baslangic = time.perf_counter()
+    gamma_gamma, gg_metrikler = gamma_gamma_uydur(ozet)
+    gg_suresi = time.perf_counter() - baslangic
+    baslangic = time.perf_counter()
+    bgnbd.beklenen_alim_sayisi(ozet, 365) * gamma_gamma.beklenen_ortalama_tutar(ozet)
+    tahmin_suresi = time.perf_counter() - baslangic
+
+    print(f"BG/NBD kestirimi         : {bgnbd_suresi:8.2f} sn ({metrikler['iterasyon']} iterasyon)")
+    print(f"Gamma-Gamma kestirimi    : {gg_suresi:8.2f} sn ({gg_metrikler['iterasyon']} iterasyon)")
+    print(f"365 günlük CLV tahmini   : {tahmin_suresi:8.2f} sn")
+    for ad, gercek in (('BG/NBD', GERCEK_BGNBD), ('Gamma-Gamma', GERCEK_GAMMA_GAMMA)):
+        model = bgnbd if ad == 'BG/NBD' else gamma_gamma
+        print(f"{ad:12} " + ", ".join(f"{p}={getattr(model, p):.3f} (gerçek {d})" for p, d in gercek.items()))
+
+if __name__ == '__main__':
+    main()
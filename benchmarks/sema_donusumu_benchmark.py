@@ -0,0 +1,80 @@
+# benchmarks/sema_donusumu_benchmark.py
+# SORUMLULUĞU: data_handler'daki şema tabanlı Arrow dönüşümünü, eski
+# astype(str).str.replace + pd.to_numeric / pd.to_datetime yoluyla karşılaştırmak.
+#
+# Kullanım: python benchmarks/sema_donusumu_benchmark.py [satir_sayisi]
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_handler import _semaya_gore_donustur
+
+SAYISAL_KOLONLAR = ['birimfiyat', 'miktar', 'maliyet']
+
+def sentetik_dosya_uret(dosya_yolu, satir_sayisi, tohum=42):
+    """Ondalık virgüllü sayılar ve metin tarihler içeren ';' ayırıcılı bir CSV dosyası üretir."""
+    rng = np.random.default_rng(tohum)
+    baslangic = np.datetime64('2011-01-01T00:00:00', 's')
+    tarihler = baslangic + rng.integers(0, 10 * 365 * 86400, satir_sayisi).astype('timedelta64[s]')
+
+    def virgullu_metin(degerler):
+        return pc.replace_substring(pc.cast(pa.array(np.round(degerler, 2)), pa.string()), '.', ',')
+
+    tablo = pa.table({
+        'musteriid': pc.cast(pa.array(rng.integers(0, 50_000, satir_sayisi)), pa.string()),
+        'tarih': pc.cast(pa.array(tarihler), pa.string()),
+        'miktar': virgullu_metin(rng.integers(1, 20, satir_sayisi).astype(float)),
+        'birimfiyat': virgullu_metin(rng.uniform(1, 5000, satir_sayisi)),
+        'maliyet': virgullu_metin(rng.uniform(1, 4000, satir_sayisi))
+    })
+    pa_csv.write_csv(tablo, dosya_yolu, write_options=pa_csv.WriteOptions(delimiter=';'))
+
+def eski_yol(df):
+    """data_handler'ın önceki dönüşüm mantığı."""
+    for kolon in SAYISAL_KOLONLAR:
+        df[kolon] = pd.to_numeric(df[kolon].astype(str).str.replace(',', '.', regex=False), errors='coerce')
+    df['tarih'] = pd.to_datetime(df['tarih'], errors='coerce')
+    return df
+
+def main():
+    satir_sayisi = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+    with tempfile.TemporaryDirectory() as klasor:
+        dosya_yolu = os.path.join(klasor, 'sentetik.csv')
+        print(f"{satir_sayisi:,} satırlık sentetik dosya üretiliyor...")
+        sentetik_dosya_uret(dosya_yolu, satir_sayisi)
+
+        tablo = pa_csv.read_csv(
+            dosya_yolu,
+            parse_options=pa_csv.ParseOptions(delimiter=';'),
+            convert_options=pa_csv.ConvertOptions(column_types={
+                k: pa.string() for k in ['musteriid', 'tarih', 'miktar', 'birimfiyat', 'maliyet']
+            })
+        )
+
+    df = tablo.to_pandas()
+    baslangic = time.perf_counter()
+    eski_sonuc = eski_yol(df)
+    eski_sure = time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    yeni_sonuc = _semaya_gore_donustur(tablo).to_pandas(coerce_temporal_nanoseconds=True)
+    yeni_sure = time.perf_counter() - baslangic
+
+    for kolon in SAYISAL_KOLONLAR + ['tarih']:
+        pd.testing.assert_series_equal(eski_sonuc[kolon], yeni_sonuc[kolon], check_dtype=False)
+
+    print(f"Eski yol (pandas)     : {eski_sure:8.2f} sn")
+    print(f"Yeni yol (Arrow şema) : {yeni_sure:8.2f} sn")
+    print(f"Hızlanma              : {eski_sure / yeni_sure:8.1f}x")
+
+if __name__ == '__main__':
+    main()
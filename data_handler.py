@@ -1,87 +1,756 @@
 # data_handler.py
 # SORUMLULUĞU: Veriyi okumak, temel temizlik ve formatlama işlemlerini yapmak.
 
+import os
+import io
+import sys
+import types
+import threading
+import glob
+import time
+import shutil
+import re
+import csv
+import json
+import hashlib
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
+import openpyxl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+import pyarrow.dataset as ds
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
-def veriyi_yukle_ve_temizle(dosya_yolu, varsayilan_kar_marji=0.25):
+# Klasör veya glob kaynaklarında okunan veri dosyası uzantıları.
+DESTEKLENEN_UZANTILAR = ('.xlsx', '.csv', '.json', '.jsonl')
+
+# Sayfaların ve ön hesaplama komutunun varsayılan satış verisi kaynağı.
+VERI_DOSYASI = 'satis_verileri_guncellenmis.json'
+
+# Temizlenmiş işlem tablosunun Parquet önbelleğinin tutulduğu klasör.
+ONBELLEK_DIZINI = os.environ.get('VERI_ONBELLEK_DIZINI', '.veri_onbellegi')
+
+# Artımlı olarak beslenen birikimli veri deposunun klasörü.
+DEPO_DIZINI = os.environ.get('VERI_DEPO_DIZINI', '.veri_deposu')
+
+# Kaynak dosyalardaki olası kolon adlarının standart (küçük harfli) karşılıkları.
+KOLON_ESLESTIRME = {
+    'musteriid': ['musteriid', 'müşteri id', 'customer id'],
+    'urunkodu': ['urunkodu', 'ürün kodu', 'stockcode', 'product id'],
+    'tarih': ['tarih', 'siparis tarihi', 'date', 'invoicedate'],
+    'miktar': ['miktar', 'quantity'],
+    'birimfiyat': ['birimfiyat', 'fiyat', 'price', 'unitprice'],
+    'maliyet': ['maliyet', 'purchase cost', 'cost', 'purchasecost'],
+    'kategori': ['kategori', 'category']
+}
+
+# Standart kolonların hedef tipleri. Dönüşüm Arrow compute çekirdekleriyle,
+# satır satır Python çağrısı yapılmadan uygulanır.
+VERI_SEMASI = {
+    'musteriid': pa.string(),
+    'urunkodu': pa.string(),
+    'kategori': pa.string(),
+    'tarih': pa.timestamp('ns'),
+    'miktar': pa.float64(),
+    'birimfiyat': pa.float64(),
+    'maliyet': pa.float64()
+}
+ONDALIK_AYIRICI = ','                 # Kaynakta ondalık işareti olarak kabul edilen karakter
+TARIH_FORMATI = '%Y-%m-%d %H:%M:%S'   # Metin tarihlerin beklenen biçimi
+_SAYI_DESENI = r'^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$'
+
+# Temiz tabloda sözlük kodlu (categorical) tutulan kolonlar.
+SOZLUK_KOLONLARI = ['MusteriID', 'UrunKodu', 'Kategori']
+
+# Temiz tablonun yapısı değiştiğinde eski önbellek dosyalarının geçersiz sayılması için artırılır.
+_ONBELLEK_SURUMU = 3
+
+def kaynak_dosyalarini_listele(kaynak):
+    """
+    Kaynak bir klasörse içindeki desteklenen veri dosyalarını, bir glob deseniyse
+    (örn. 'exports/*.json') eşleşen dosyaları sıralı olarak döndürür. Tek bir dosya
+    verilmişse yalnızca onu içeren bir liste döner.
+    """
+    if os.path.isfile(kaynak):
+        return [kaynak]
+    if os.path.isdir(kaynak):
+        adaylar = [os.path.join(kaynak, ad) for ad in os.listdir(kaynak)]
+    else:
+        adaylar = glob.glob(kaynak)
+    return sorted(
+        yol for yol in adaylar
+        if os.path.isfile(yol) and os.path.splitext(yol)[1].lower() in DESTEKLENEN_UZANTILAR
+    )
+
+def _dosya_parmak_izi(dosya_yolu, blok_boyutu=1 << 20):
+    """
+    Kaynak dosyanın boyutunu, değişiklik zamanını ve içerik özetini (hash) döndürür.
+    Klasör veya glob kaynakları için her dosyanın parmak izi ayrı ayrı listelenir.
+    """
+    dosyalar = kaynak_dosyalarini_listele(dosya_yolu)
+    if dosyalar != [dosya_yolu]:
+        return {'dosyalar': [[os.path.basename(yol), _dosya_parmak_izi(yol, blok_boyutu)] for yol in dosyalar]}
+    durum = os.stat(dosya_yolu)
+    ozet = hashlib.blake2b(digest_size=16)
+    with open(dosya_yolu, 'rb') as f:
+        for blok in iter(lambda: f.read(blok_boyutu), b''):
+            ozet.update(blok)
+    return {
+        'boyut': durum.st_size,
+        'mtime_ns': durum.st_mtime_ns,
+        'icerik_ozeti': ozet.hexdigest()
+    }
+
+def _onbellek_yolu(dosya_yolu, parmak_izi, varsayilan_kar_marji):
+    """Parmak izi ve kar marjından türetilen anahtarla önbellek dosyasının yolunu oluşturur."""
+    anahtar_verisi = json.dumps(
+        {**parmak_izi, 'kar_marji': varsayilan_kar_marji, 'surum': _ONBELLEK_SURUMU}, sort_keys=True
+    )
+    anahtar = hashlib.blake2b(anahtar_verisi.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(ONBELLEK_DIZINI, f"{_kaynak_adi(dosya_yolu)}-{anahtar}.parquet")
+
+def _kaynak_adi(dosya_yolu):
+    """Önbellek ve depo adlarında kullanılan kaynak adı (uzantısız dosya veya klasör adı)."""
+    # Klasörlerde sondaki '/' atılır; glob desenlerindeki joker karakterler dosya adına girmez.
+    dosya_adi = os.path.splitext(os.path.basename(os.path.normpath(dosya_yolu)))[0]
+    return re.sub(r'[*?\[\]]', '', dosya_adi) or 'coklu'
+
+def _onbellege_yaz(df, onbellek_yolu):
+    """
+    Temiz tabloyu Parquet olarak atomik biçimde yazar ve aynı kaynağa ait eski
+    önbellek dosyalarını siler. Önbellek en iyi çaba ile tutulur; yazma hatası
+    analizi durdurmaz.
+    """
+    klasor = os.path.dirname(onbellek_yolu)
+    os.makedirs(klasor, exist_ok=True)
+    gecici_yol = onbellek_yolu + '.tmp'
+    try:
+        df.to_parquet(gecici_yol, engine='pyarrow')
+        os.replace(gecici_yol, onbellek_yolu)
+    except Exception as e:
+        if os.path.exists(gecici_yol):
+            os.remove(gecici_yol)
+        print(f"UYARI: Temiz veri önbelleğe yazılamadı. Hata: {e}")
+        return
+    _eski_onbellekleri_sil(onbellek_yolu)
+
+# '<kaynak>-<anahtar>[.<ek>...]'; anahtar 16 haneli özettir. Ekler de '-' içerebilir
+# (örn. '.clv-<iz>.arrow'), bu yüzden ad son '-' yerine anahtarın konumundan ayrılır.
+_ONBELLEK_ADI = re.compile(r'^(.*)-([0-9a-f]{16})(?:\..*)?$')
+
+def _onbellek_adini_ayristir(dosya_adi):
+    """Önbellek dosyası adını (kaynak, anahtar) ikilisine ayırır; önbellek adı değilse None."""
+    eslesme = _ONBELLEK_ADI.match(dosya_adi)
+    return eslesme.groups() if eslesme else None
+
+def _eski_onbellekleri_sil(onbellek_yolu):
+    """
+    Aynı kaynak dosyaya ait, geçerli anahtar dışındaki önbellek dosyalarını (.parquet, .arrow
+    ve .bolumler klasörleri) siler. Başka bir süreç tarafından hâlâ eşlenmiş olan ve silinemeyen dosyalar atlanır.
+    """
+    klasor = os.path.dirname(onbellek_yolu)
+    kaynak_adi, gecerli_anahtar = _onbellek_adini_ayristir(os.path.basename(onbellek_yolu))
+    for eski_dosya in os.listdir(klasor):
+        # Kaynak adı birebir eşleşmelidir; 'satis' kaynağı 'satis-2024' önbelleğine dokunmaz.
+        ayrik = _onbellek_adini_ayristir(eski_dosya)
+        if ayrik is None or ayrik[0] != kaynak_adi or ayrik[1] == gecerli_anahtar:
+            continue
+        eski_yol = os.path.join(klasor, eski_dosya)
+        if eski_dosya.endswith('.bolumler') and os.path.isdir(eski_yol):
+            shutil.rmtree(eski_yol, ignore_errors=True)
+        elif eski_dosya.endswith('.parquet') or eski_dosya.endswith('.arrow'):
+            try:
+                os.remove(eski_yol)
+            except OSError:
+                pass
+
+def ipc_yolu(dosya_yolu, ad, varsayilan_kar_marji=0.25):
+    """
+    Kaynak dosyadan türetilen bir tablonun (örn. 'temiz', 'sonuclar') Arrow IPC dosyasının
+    yolunu döndürür. Anahtar, Parquet önbelleğiyle aynı parmak izinden türetilir.
+    """
+    onbellek_yolu = _onbellek_yolu(dosya_yolu, _dosya_parmak_izi(dosya_yolu), varsayilan_kar_marji)
+    return f"{os.path.splitext(onbellek_yolu)[0]}.{ad}.arrow"
+
+@contextlib.contextmanager
+def dosya_kilidi(yol):
+    """Süreçler (ve iş parçacıkları) arası özel kilit; kilit dosyası yoksa oluşturulur."""
+    os.makedirs(os.path.dirname(yol) or '.', exist_ok=True)
+    with open(yol, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK yaklaşık 10 sn denedikten sonra vazgeçer; kilit alınana dek beklenir.
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def ipc_deposuna_yaz(df, yol):
+    """
+    DataFrame'i (veya Arrow tablosunu) sıkıştırılmamış Arrow IPC (Feather v2) dosyası olarak atomik biçimde yazar.
+    Sıkıştırma kapalıdır; aksi halde dosya belleğe eşlenemez, okunurken açılması gerekir.
+    """
+    os.makedirs(os.path.dirname(yol) or '.', exist_ok=True)
+    # Aynı anda çalışan birden fazla süreç aynı dosyayı üretebilir; geçici adlar çakışmasın.
+    gecici_yol = f"{yol}.{os.getpid()}.tmp"
+    try:
+        # Tablo tek parça (tek kayıt grubu) yazılır; parçalı kolonlar pandas'a aktarılırken
+        # birleştirilmek zorunda kalır ve bu da eşlemenin kazandırdığı kopyasızlığı bozar.
+        feather.write_feather(df, gecici_yol, compression='uncompressed', chunksize=max(len(df), 1))
+        os.replace(gecici_yol, yol)
+    finally:
+        if os.path.exists(gecici_yol):
+            os.remove(gecici_yol)
+    _eski_onbellekleri_sil(yol)
+
+def ipc_deposunu_esle(yol):
+    """
+    Arrow IPC dosyasını belleğe eşleyerek (memory-map) DataFrame olarak açar. Sayısal ve
+    tarih kolonları kopyalanmaz; aynı dosyayı açan tüm süreçler işletim sisteminin sayfa
+    önbelleğindeki tek kopyayı paylaşır. Dönen tablo salt okunurdur.
+    """
+    tablo = feather.read_table(yol, memory_map=True)
+    # split_blocks, kolonların tek bir 2 boyutlu blokta birleştirilip kopyalanmasını önler.
+    return tablo.to_pandas(split_blocks=True)
+
+# --- MÜŞTERİ SIRALI DÜZEN ---
+# Belleğe eşlenen temiz tabloda her müşterinin işlemleri bitişik satırlardadır. Müşteri
+# kodundan satır aralığına giden ofset dizisiyle (CSR düzeni) tek müşterinin geçmişi,
+# tüm tabloyu taramadan ve kopyalamadan bir dilim olarak alınır.
+
+def _musteriye_gore_sirala(df):
+    return df.sort_values(['MusteriID', 'Tarih'], kind='stable', ignore_index=True)
+
+def _depoyu_musteriye_gore_sirala(depo_yolu):
+    """
+    Akış modunun Parquet deposunu pandas'a aktarmadan, Arrow tablosu olarak müşteri sıralı
+    düzene getirir. Sözlükler birleştirilir ve satırlar kategori koduna, ardından Tarih'e göre
+    sıralanır; sonuç _musteriye_gore_sirala ile aynı sıradadır.
+    """
+    tablo = pq.read_table(depo_yolu).unify_dictionaries().combine_chunks()
+    musteri = tablo.column('MusteriID')
+    kodlar = musteri.chunk(0).indices if musteri.num_chunks else pa.array([], pa.int32())
+    sira = pc.sort_indices(pa.table({'kod': kodlar, 'Tarih': tablo.column('Tarih')}),
+                           sort_keys=[('kod', 'ascending'), ('Tarih', 'ascending')])
+    return tablo.take(sira)
+
+@dataclass(frozen=True)
+class MusteriOfsetIndeksi:
+    """Kategori kodu k olan müşterinin satırları ofsetler[k]:ofsetler[k + 1] aralığındadır."""
+    kategoriler: pd.Index
+    ofsetler: np.ndarray
+
+    def aralik(self, musteri_id):
+        """Müşterinin (baslangic, bitis) satır aralığı; tabloda olmayan müşteri için boş aralık."""
+        try:
+            kod = self.kategoriler.get_loc(musteri_id)
+        except KeyError:
+            return 0, 0
+        return int(self.ofsetler[kod]), int(self.ofsetler[kod + 1])
+
+def musteri_ofset_indeksi_olustur(df):
+    """
+    Müşteri sıralı temiz tablonun ofset indeksini oluşturur. MusteriID categorical olmalı ve
+    satırlar kategori koduna göre sıralı olmalıdır; değilse ValueError verilir.
+    """
+    if not isinstance(df['MusteriID'].dtype, pd.CategoricalDtype):
+        raise ValueError("Ofset indeksi için 'MusteriID' kolonu categorical olmalıdır.")
+    kodlar = df['MusteriID'].cat.codes.to_numpy()
+    if len(kodlar) and (kodlar.min() < 0 or np.any(kodlar[1:] < kodlar[:-1])):
+        raise ValueError("Ofset indeksi için tablo müşteriye göre sıralı olmalıdır (bkz. bellek_eslemeli).")
+    kategoriler = df['MusteriID'].cat.categories
+    return MusteriOfsetIndeksi(kategoriler, np.searchsorted(kodlar, np.arange(len(kategoriler) + 1)))
+
+def musteri_dilimi(df, indeks, musteri_id):
+    """Müşterinin işlemlerini tarih sırasıyla, tablo taranmadan ve kopyalanmadan döndürür."""
+    baslangic, bitis = indeks.aralik(musteri_id)
+    return df.iloc[baslangic:bitis]
+
+# --- YIL/AY BÖLÜMLÜ DEPO ---
+# Temiz tablo Yil=YYYY/Ay=M klasörlerine bölünerek (hive düzeni) saklanır. Tarih aralığı
+# sorguları yalnızca aralıkla kesişen ay klasörlerini okur; 10 yıllık geçmişte tek aylık
+# bir sorgu tüm tabloya değil, bir iki dosyaya dokunur.
+_BOLUM_SEMASI = ds.partitioning(pa.schema([('Yil', pa.int16()), ('Ay', pa.int8())]), flavor='hive')
+
+def bolumlu_depo_yolu(dosya_yolu, varsayilan_kar_marji=0.25):
+    """Kaynak dosyanın Yil/Ay bölümlü deposunun klasör yolunu döndürür."""
+    onbellek_yolu = _onbellek_yolu(dosya_yolu, _dosya_parmak_izi(dosya_yolu), varsayilan_kar_marji)
+    return f"{os.path.splitext(onbellek_yolu)[0]}.bolumler"
+
+def bolumlu_depoya_yaz(df, depo_dizini):
+    """Temiz tabloyu Tarih kolonunun yılı ve ayına göre bölümlenmiş Parquet dosyalarına yazar."""
+    tablo = pa.Table.from_pandas(df, preserve_index=False)
+    tarih = tablo.column('Tarih')
+    tablo = tablo.append_column('Yil', pc.year(tarih).cast(pa.int16()))
+    tablo = tablo.append_column('Ay', pc.month(tarih).cast(pa.int8()))
+
+    gecici_dizin = f"{depo_dizini}.{os.getpid()}.tmp"
+    shutil.rmtree(gecici_dizin, ignore_errors=True)
+    try:
+        ds.write_dataset(tablo, gecici_dizin, format='parquet', partitioning=_BOLUM_SEMASI,
+                         basename_template='parca-{i}.parquet')
+        os.replace(gecici_dizin, depo_dizini)
+    except OSError:
+        # Başka bir süreç aynı depoyu daha önce tamamladıysa onunki kullanılır.
+        if not os.path.isdir(depo_dizini):
+            raise
+    finally:
+        shutil.rmtree(gecici_dizin, ignore_errors=True)
+    _eski_onbellekleri_sil(depo_dizini)
+
+def _ay_araligi_filtresi(baslangic, bitis):
+    """[baslangic, bitis] gün aralığı için bölüm (Yil, Ay) ve satır (Tarih) filtresini kurar."""
+    baslangic = pd.Timestamp(baslangic).normalize()
+    bitis = pd.Timestamp(bitis).normalize()
+    yil, ay = ds.field('Yil'), ds.field('Ay')
+    bolum_filtresi = (
+        ((yil > baslangic.year) | ((yil == baslangic.year) & (ay >= baslangic.month))) &
+        ((yil < bitis.year) | ((yil == bitis.year) & (ay <= bitis.month)))
+    )
+    # Bitiş günü dahildir; .dt.date <= bitis karşılaştırmasıyla aynı sonucu verir.
+    satir_filtresi = (
+        (ds.field('Tarih') >= pa.scalar(baslangic.to_pydatetime(), pa.timestamp('ns'))) &
+        (ds.field('Tarih') < pa.scalar((bitis + pd.Timedelta(days=1)).to_pydatetime(), pa.timestamp('ns')))
+    )
+    return bolum_filtresi & satir_filtresi
+
+def tarih_araliklarini_oku(depo_dizini, araliklar, kolonlar=None):
+    """
+    Bölümlü depodan yalnızca verilen (baslangic, bitis) aralıklarıyla kesişen ay
+    bölümlerini okur ve aralıklara düşen satırları tek bir DataFrame olarak döndürür.
+    """
+    veri_seti = ds.dataset(depo_dizini, format='parquet', partitioning=_BOLUM_SEMASI)
+    filtre = None
+    for baslangic, bitis in araliklar:
+        aralik_filtresi = _ay_araligi_filtresi(baslangic, bitis)
+        filtre = aralik_filtresi if filtre is None else filtre | aralik_filtresi
+    if kolonlar is None:
+        kolonlar = [ad for ad in veri_seti.schema.names if ad not in ('Yil', 'Ay')]
+    return veri_seti.to_table(columns=kolonlar, filter=filtre).to_pandas()
+
+def veriyi_yukle_ve_temizle(dosya_yolu, varsayilan_kar_marji=0.25, onbellek_kullan=True,
+                            akis_modu=False, bellek_limiti_mb=512, bellek_eslemeli=False,
+                            is_parcacigi_sayisi=None):
     """
     NİHAİ VERSİYON: Dosyadaki kolon adlarına göre kendini ayarlar. 'Maliyet' kolonu
     yoksa hata vermek yerine, varsayılan kar marjı ile çalışır.
     .json desteği en sağlam haliyle güncellendi.
+
+    Temizlenmiş tablo, kaynak dosyanın boyutu, değişiklik zamanı, içerik özeti ve
+    'varsayilan_kar_marji' ile anahtarlanan bir Parquet önbelleğinde saklanır.
+    Bunlardan biri değişmediği sürece dosya yeniden okunup temizlenmez.
+
+    'akis_modu' açıkken dosya belleğe bütün halinde alınmaz; 'bellek_limiti_mb' ile
+    sınırlı parçalar halinde temizlenip Parquet deposuna yazılır (bkz. veriyi_akista_temizle).
+    Bu modda DataFrame yerine depo üzerinde tembel bir pyarrow.dataset.Dataset döner; çağıran
+    taraf tabloyu to_batches() ile parça parça okur. 'bellek_eslemeli' ile birlikte
+    verilirse depo pandas'a aktarılmadan doğrudan eşlenecek IPC dosyasına yazılır.
+
+    'bellek_eslemeli' açıkken temiz tablo bir kez Arrow IPC dosyasına yazılır ve her
+    süreçte belleğe eşlenerek açılır; aynı sunucudaki birden fazla Streamlit süreci
+    tabloyu kendi belleğine kopyalamadan paylaşır. Bu dosyada satırlar (MusteriID, Tarih)
+    sırasındadır; tek müşterinin geçmişi musteri_ofset_indeksi_olustur ile dilim olarak alınır.
+
+    'dosya_yolu' bir klasör veya glob deseni (örn. 'exports/*.json') de olabilir; dosyalar
+    'is_parcacigi_sayisi' kadar süreçte (varsayılan: çekirdek sayısı) paralel işlenir.
     """
-    print(f"'{dosya_yolu}' yükleniyor...")
-    
-    if dosya_yolu.endswith('.xlsx'):
-        df = pd.read_excel(dosya_yolu)
-    elif dosya_yolu.endswith('.csv'):
+    if bellek_eslemeli:
+        ipc_dosyasi = ipc_yolu(dosya_yolu, 'temiz', varsayilan_kar_marji)
+        if not os.path.exists(ipc_dosyasi) and akis_modu:
+            depo_yolu = veriyi_akista_temizle(dosya_yolu, varsayilan_kar_marji, bellek_limiti_mb)
+            ipc_deposuna_yaz(_depoyu_musteriye_gore_sirala(depo_yolu), ipc_dosyasi)
+        elif not os.path.exists(ipc_dosyasi):
+            df = veriyi_yukle_ve_temizle(dosya_yolu, varsayilan_kar_marji, onbellek_kullan,
+                                         is_parcacigi_sayisi=is_parcacigi_sayisi)
+            ipc_deposuna_yaz(_musteriye_gore_sirala(df), ipc_dosyasi)
+            del df
+        print(f"✓ '{dosya_yolu}' için temiz veri belleğe eşlendi.")
+        return ipc_deposunu_esle(ipc_dosyasi)
+
+    if akis_modu:
+        return ds.dataset(veriyi_akista_temizle(dosya_yolu, varsayilan_kar_marji, bellek_limiti_mb), format='parquet')
+
+    if not onbellek_kullan:
+        return _dosyayi_oku_ve_temizle(dosya_yolu, varsayilan_kar_marji, is_parcacigi_sayisi)
+
+    onbellek_yolu = _onbellek_yolu(dosya_yolu, _dosya_parmak_izi(dosya_yolu), varsayilan_kar_marji)
+    if os.path.exists(onbellek_yolu):
+        print(f"✓ '{dosya_yolu}' için temiz veri önbellekten yüklendi.")
+        return pd.read_parquet(onbellek_yolu, engine='pyarrow')
+
+    df = _dosyayi_oku_ve_temizle(dosya_yolu, varsayilan_kar_marji, is_parcacigi_sayisi)
+    _onbellege_yaz(df, onbellek_yolu)
+    return df
+
+def _dosya_formatini_tespit_et(dosya_yolu, ornek_boyutu=64 * 1024):
+    """
+    Dosyanın ilk birkaç KB'ını okuyarak formatını tespit eder. Dosya yalnızca bir kez,
+    doğru okuyucuyla ayrıştırılsın diye 'xlsx', 'json_array', 'json_lines' veya 'csv'
+    formatından birini ve okuyucu ayarlarını döndürür.
+    """
+    with open(dosya_yolu, 'rb') as f:
+        ornek = f.read(ornek_boyutu)
+
+    # .xlsx dosyaları bir ZIP arşividir.
+    if ornek.startswith(b'PK\x03\x04'):
+        return 'xlsx', {}
+
+    metin = ornek.decode('utf-8', errors='ignore').lstrip('\ufeff \t\r\n')
+    if not metin:
+        raise ValueError(f"'{dosya_yolu}' dosyası boş.")
+
+    if metin[0] == '[':
+        return 'json_array', {}
+    if metin[0] == '{':
+        return 'json_lines', {}
+
+    # Geriye kalan metin dosyaları için CSV lehçesini (ayırıcı, ondalık işareti) bul.
+    # Örneğin son satırı yarım kalabileceği için sadece tam satırlar kullanılır.
+    tam_satirlar = metin[:metin.rfind('\n')] if '\n' in metin else metin
+    try:
+        lehce = csv.Sniffer().sniff(tam_satirlar, delimiters=';,\t|')
+    except csv.Error:
+        raise ValueError("Desteklenmeyen dosya formatı. Lütfen .xlsx, .csv veya .json kullanın.")
+
+    ayirici = lehce.delimiter
+    baslik = next(csv.reader([tam_satirlar.splitlines()[0]], delimiter=ayirici))
+    ondalik = ',' if ayirici != ',' and re.search(r'\d,\d', tam_satirlar) else '.'
+    return 'csv', {'ayirici': ayirici, 'ondalik': ondalik, 'baslik': [k.strip() for k in baslik]}
+
+def _tabloya_cevir(df):
+    """
+    pandas ile okunmuş bir DataFrame'i Arrow tablosuna çevirir. Arrow'un kabul etmediği
+    karışık tipli (örn. sayı ve metin içeren) kolonlar metne çevrilerek aktarılır.
+    """
+    diziler = {}
+    for kolon in df.columns:
+        seri = df[kolon]
         try:
-            df = pd.read_csv(dosya_yolu, sep=';', decimal=',')
-        except Exception:
-            df = pd.read_csv(dosya_yolu, sep=',', decimal='.')
-            
-    # --- YENİ ve SAĞLAM JSON OKUMA MANTIĞI ---
-    elif dosya_yolu.endswith('.json'):
+            diziler[str(kolon)] = pa.array(seri, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            diziler[str(kolon)] = pa.array(seri.where(seri.isna(), seri.astype(str)), from_pandas=True)
+    return pa.table(diziler)
+
+def _csv_okuma_ayarlari(ayarlar):
+    """Tespit edilen CSV lehçesi için Arrow okuyucu ayarlarını hazırlar."""
+    return {
+        'parse_options': pa_csv.ParseOptions(delimiter=ayarlar['ayirici']),
+        'convert_options': pa_csv.ConvertOptions(
+            column_types={kolon: pa.string() for kolon in ayarlar['baslik']},
+            strings_can_be_null=True
+        )
+    }
+
+def _degerleri_diziye_cevir(degerler):
+    """
+    Python değerlerinden Arrow dizisi oluşturur. Arrow'un kabul etmediği karışık tipli
+    (örn. sayı ve metin içeren) değerler, pandas yolundaki gibi metne çevrilir.
+    """
+    try:
+        return pa.array(degerler)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if deger is None else str(deger) for deger in degerler], pa.string())
+
+def _xlsx_parcalari(dosya_yolu, parca_satir_sayisi):
+    """
+    .xlsx dosyasının ilk sayfasını openpyxl'in read_only modunda satır satır okur ve
+    'parca_satir_sayisi' satırlık Arrow tabloları üretir. Çalışma kitabının tamamı hiçbir
+    zaman bellekte nesne modeli olarak kurulmaz.
+    """
+    kitap = openpyxl.load_workbook(dosya_yolu, read_only=True, data_only=True)
+    try:
+        satirlar = kitap.worksheets[0].iter_rows(values_only=True)
+        baslik = next(satirlar, None)
+        if baslik is None:
+            return
+        # Boş ve tekrar eden başlıklar pd.read_excel ile aynı biçimde adlandırılır.
+        adlar, gorulen = [], {}
+        for i, ad in enumerate(baslik):
+            ad = f"Unnamed: {i}" if ad is None else str(ad)
+            if ad in gorulen:
+                gorulen[ad] += 1
+                ad = f"{ad}.{gorulen[ad]}"
+            else:
+                gorulen[ad] = 0
+            adlar.append(ad)
+
+        def tabloya_cevir(tampon):
+            return pa.table({
+                ad: _degerleri_diziye_cevir([satir[i] if i < len(satir) else None for satir in tampon])
+                for i, ad in enumerate(adlar)
+            })
+
+        tampon = []
+        for satir in satirlar:
+            if all(deger is None for deger in satir):
+                continue
+            tampon.append(satir)
+            if len(tampon) >= parca_satir_sayisi:
+                yield tabloya_cevir(tampon)
+                tampon = []
+        if tampon:
+            yield tabloya_cevir(tampon)
+    finally:
+        kitap.close()
+
+def _parcalari_birlestir(tablolar):
+    """
+    Parça parça okunmuş tabloları birleştirir. Bir kolonun tipi parçadan parçaya değişiyorsa
+    (örn. bir parçada tamsayı, diğerinde metin) kolon tüm parçalarda metne çevrilir.
+    """
+    tipler = {}
+    for tablo in tablolar:
+        for alan in tablo.schema:
+            if not pa.types.is_null(alan.type):
+                tipler.setdefault(alan.name, set()).add(alan.type)
+    karisik_kolonlar = set()
+    for ad, kolon_tipleri in tipler.items():
+        if len(kolon_tipleri) > 1 and not all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in kolon_tipleri):
+            karisik_kolonlar.add(ad)
+
+    duzeltilmis = []
+    for tablo in tablolar:
+        for ad in karisik_kolonlar & set(tablo.column_names):
+            indeks = tablo.column_names.index(ad)
+            degerler = tablo.column(indeks).to_pylist()
+            tablo = tablo.set_column(indeks, ad, _degerleri_diziye_cevir(
+                [None if deger is None else str(deger) for deger in degerler]))
+        duzeltilmis.append(tablo)
+    return pa.concat_tables(duzeltilmis, promote_options='permissive')
+
+# Excel satırları Python nesneleri olarak tamponlandığından parça boyutu satır sayısıyla belirlenir.
+_XLSX_PARCA_SATIR_SAYISI = 50_000
+
+def _dosyayi_oku(dosya_yolu):
+    """
+    Dosyayı, tespit edilen formata uygun tek bir okuyucuyla bir kez ayrıştırır ve
+    (Arrow tablosu, kaynaktaki ondalık işareti) ikilisini döndürür.
+    JSON Lines ve CSV için Arrow'un vektörel okuyucuları kullanılır.
+    """
+    dosya_formati, ayarlar = _dosya_formatini_tespit_et(dosya_yolu)
+
+    if dosya_formati == 'xlsx':
+        parcalar = list(_xlsx_parcalari(dosya_yolu, _XLSX_PARCA_SATIR_SAYISI))
+        if not parcalar:
+            raise ValueError(f"'{dosya_yolu}' dosyasında okunacak satır bulunamadı.")
+        print("✓ Excel dosyası salt okunur modda başarıyla okundu.")
+        return _parcalari_birlestir(parcalar), ONDALIK_AYIRICI
+
+    if dosya_formati == 'csv':
+        # Tüm kolonlar metin olarak okunur; sayı ve tarih dönüşümleri temizlik adımında
+        # yapılır. Böylece tip tahmini hatası nedeniyle dosyanın yeniden okunması gerekmez.
+        tablo = pa_csv.read_csv(dosya_yolu, **_csv_okuma_ayarlari(ayarlar))
+        print(f"✓ CSV dosyası ('{ayarlar['ayirici']}' ayırıcı ile) başarıyla okundu.")
+        return tablo, ayarlar['ondalik']
+
+    if dosya_formati == 'json_lines':
         try:
-            # 1. Önce, her satırın tek bir JSON olduğu "JSON Lines" formatını dene.
-            # "Trailing data" hatasının en yaygın sebebi budur.
-            df = pd.read_json(
-                dosya_yolu, 
-                orient='records', 
-                lines=True, 
-                convert_dates=['Tarih', 'tarih', 'Date', 'invoicedate']
-            )
+            tablo = pa_json.read_json(dosya_yolu)
             print("✓ JSON dosyası 'JSON Lines' formatında başarıyla okundu.")
-        except ValueError:
-            # 2. Eğer "JSON Lines" başarısız olursa, standart formatı (tek bir büyük liste) dene.
-            print("UYARI: JSON Lines formatı okunamadı, standart JSON formatı deneniyor...")
+            return tablo, ONDALIK_AYIRICI
+        except pa.ArrowInvalid as e:
+            # Arrow, satırlar arasında tipi değişen alanları (örn. sayı/metin karışık) kabul etmez.
+            print(f"UYARI: JSON Lines dosyası Arrow ile okunamadı ({e}), pandas okuyucusu kullanılıyor...")
+            df = pd.read_json(dosya_yolu, orient='records', lines=True, dtype=False, convert_dates=False)
+            return _tabloya_cevir(df), ONDALIK_AYIRICI
+
+    try:
+        df = pd.read_json(dosya_yolu, orient='records', dtype=False, convert_dates=False)
+    except ValueError as e:
+        raise ValueError(
+            "JSON dosyası okunamadı. Lütfen dosyanın yapısını kontrol edin. "
+            "Dosya ya tek bir büyük liste '[{...}, {...}]' şeklinde olmalı, "
+            "ya da her satırda tek bir JSON nesnesi '{...}' içermelidir (JSON Lines). "
+            f"Orijinal Hata: {e}"
+        )
+    print("✓ JSON dosyası standart formatta başarıyla okundu.")
+    return _tabloya_cevir(df), ONDALIK_AYIRICI
+
+def _kolonlari_standartlastir(tablo):
+    """Kolon adlarını küçük harfe çevirir ve KOLON_ESLESTIRME'ye göre standart adlara dönüştürür."""
+    adlar = [str(ad).strip().lower() for ad in tablo.column_names]
+    for standart_ad, potansiyel_adlar in KOLON_ESLESTIRME.items():
+        for ad in potansiyel_adlar:
+            if ad in adlar:
+                adlar[adlar.index(ad)] = standart_ad
+                break
+    return tablo.rename_columns(adlar)
+
+def _sayiya_cevir(dizi, ondalik=ONDALIK_AYIRICI):
+    """Bir Arrow dizisini float64'e çevirir; sayı olarak okunamayan değerler boş (null) olur."""
+    if pa.types.is_integer(dizi.type) or pa.types.is_floating(dizi.type) or pa.types.is_null(dizi.type):
+        return pc.cast(dizi, pa.float64())
+    if not pa.types.is_string(dizi.type):
+        dizi = pc.cast(dizi, pa.string())
+    metin = pc.utf8_trim_whitespace(dizi)
+    if ondalik != '.':
+        metin = pc.replace_substring(metin, ondalik, '.')
+    gecerli = pc.match_substring_regex(metin, _SAYI_DESENI)
+    metin = pc.if_else(gecerli, metin, pa.scalar(None, pa.string()))
+    return pc.cast(metin, pa.float64())
+
+def _tarihe_cevir(dizi, tarih_formati=TARIH_FORMATI):
+    """
+    Bir Arrow dizisini timestamp[ns] tipine çevirir. Metin değerler önce açık 'tarih_formati'
+    ile ayrıştırılır; bu biçime uymayan az sayıdaki değer için pandas'ın tarih tahminine düşülür.
+    """
+    if pa.types.is_timestamp(dizi.type) or pa.types.is_date(dizi.type):
+        if pa.types.is_timestamp(dizi.type) and dizi.type.tz is not None:
+            dizi = pc.cast(dizi, pa.timestamp(dizi.type.unit))
+        return pc.cast(dizi, pa.timestamp('ns'))
+    if not pa.types.is_string(dizi.type):
+        dizi = pc.cast(dizi, pa.string())
+
+    metin = pc.utf8_trim_whitespace(dizi)
+    tarihler = pc.strptime(metin, format=tarih_formati, unit='ns', error_is_null=True)
+    uymayanlar = pc.and_(pc.is_null(tarihler), pc.is_valid(metin))
+    if pc.any(uymayanlar).as_py():
+        if isinstance(tarihler, pa.ChunkedArray):
+            tarihler, uymayanlar = tarihler.combine_chunks(), uymayanlar.combine_chunks()
+        ek_tarihler = pd.to_datetime(pc.filter(metin, uymayanlar).to_pandas(), errors='coerce')
+        tarihler = pc.replace_with_mask(
+            tarihler, uymayanlar, pa.array(ek_tarihler, type=pa.timestamp('ns'), from_pandas=True)
+        )
+    return tarihler
+
+def _semaya_gore_donustur(tablo, ondalik=ONDALIK_AYIRICI, tarih_formati=TARIH_FORMATI):
+    """Standart adlı kolonları VERI_SEMASI'ndaki tiplere Arrow compute çekirdekleriyle dönüştürür."""
+    for kolon, hedef_tip in VERI_SEMASI.items():
+        if kolon not in tablo.column_names:
+            continue
+        indeks = tablo.column_names.index(kolon)
+        dizi = tablo.column(indeks)
+        if pa.types.is_timestamp(hedef_tip):
+            yeni_dizi = _tarihe_cevir(dizi, tarih_formati)
+        elif pa.types.is_floating(hedef_tip):
+            yeni_dizi = _sayiya_cevir(dizi, ondalik)
+        else:
+            yeni_dizi = pc.cast(dizi, hedef_tip)
+        tablo = tablo.set_column(indeks, kolon, yeni_dizi)
+    return tablo
+
+def _dosyayi_temiz_tabloya_cevir(dosya_yolu, varsayilan_kar_marji):
+    """
+    Süreç havuzundaki işçide çalışır: tek bir dosyayı okuyup temizler ve süreçler arasında
+    ucuza taşınabilen bir Arrow tablosu ile geçen süreyi döndürür.
+    """
+    baslangic = time.perf_counter()
+    tablo, ondalik = _dosyayi_oku(dosya_yolu)
+    tablo = pa.Table.from_pandas(_tabloyu_temizle(tablo, varsayilan_kar_marji, ondalik, ayrintili=False),
+                                 preserve_index=False)
+    return _depo_semasina_uydur(tablo, _depo_semasi(tablo.schema)), time.perf_counter() - baslangic
+
+def surec_baglami():
+    """
+    Süreç havuzlarının başlatma bağlamı. Streamlit sunucusu çok iş parçacıklıdır; 'fork' ile
+    kopyalanan çocuk, diğer iş parçacıklarının tuttuğu kilitler (Tornado, logging, cmdstanpy)
+    yüzünden kilitlenebilir. Çocuklar bu yüzden temiz bir süreçten başlatılır: 'forkserver',
+    yoksa (Windows) 'spawn'.
+    """
+    yontem = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(yontem)
+
+# İşçiler başlatılırken ana modülün yerine konan boş modül ve bu değişimi koruyan kilit.
+_BOS_ANA_MODUL = types.ModuleType('__main__')
+_ANA_MODUL_KILIDI = threading.Lock()
+
+class SurecHavuzu(ProcessPoolExecutor):
+    """
+    İşçileri surec_baglami() ile başlatan ProcessPoolExecutor. Yeni süreçler multiprocessing'in
+    ana modül hazırlığında sys.modules['__main__'] dosyasını yeniden çalıştırır; Streamlit'te
+    bu, sayfa betiğidir ve işçide sayfanın analizleri yeniden başlar. İşçiler submit() içinde
+    başlatıldığından ana modül yalnızca o sırada boş bir modülle değiştirilir. Havuza yalnızca
+    modül düzeyindeki (ana modülde tanımlı olmayan) fonksiyonlar gönderilmelidir.
+    """
+
+    def __init__(self, max_workers=None, **ayarlar):
+        super().__init__(max_workers=max_workers, mp_context=surec_baglami(), **ayarlar)
+
+    def submit(self, *args, **kwargs):
+        with _ANA_MODUL_KILIDI:
+            ana_modul = sys.modules['__main__']
+            sys.modules['__main__'] = _BOS_ANA_MODUL
             try:
-                df = pd.read_json(
-                    dosya_yolu, 
-                    orient='records', 
-                    convert_dates=['Tarih', 'tarih', 'Date', 'invoicedate']
-                )
-                print("✓ JSON dosyası standart formatta başarıyla okundu.")
+                return super().submit(*args, **kwargs)
+            finally:
+                sys.modules['__main__'] = ana_modul
+
+def _coklu_dosyayi_oku_ve_temizle(dosyalar, varsayilan_kar_marji=0.25, is_parcacigi_sayisi=None):
+    """
+    Birden fazla dosyayı bir süreç havuzunda paralel olarak okuyup temizler. Dosyalar
+    arasında eksik kolonlar boş değerlerle doldurularak tablolar tek tabloda birleştirilir.
+    """
+    print(f"{len(dosyalar)} dosya paralel olarak yükleniyor...")
+    baslangic = time.perf_counter()
+    with SurecHavuzu(max_workers=is_parcacigi_sayisi) as havuz:
+        isler = [havuz.submit(_dosyayi_temiz_tabloya_cevir, yol, varsayilan_kar_marji) for yol in dosyalar]
+        tablolar = []
+        for yol, is_ in zip(dosyalar, isler):
+            try:
+                tablo, sure = is_.result()
             except Exception as e:
-                # 3. Eğer ikisi de başarısız olursa, kullanıcıya bilgilendirici bir hata göster.
-                raise ValueError(
-                    "JSON dosyası okunamadı. Lütfen dosyanın yapısını kontrol edin. "
-                    "Dosya ya tek bir büyük liste '[{...}, {...}]' şeklinde olmalı, "
-                    "ya da her satırda tek bir JSON nesnesi '{...}' içermelidir (JSON Lines). "
-                    f"Orijinal Hata: {e}"
-                )
-    # --- GÜNCELLEME SONU ---
-        
-    else:
-        raise ValueError("Desteklenmeyen dosya formatı. Lütfen .xlsx, .csv veya .json kullanın.")
+                raise ValueError(f"'{yol}' dosyası işlenemedi. Orijinal Hata: {e}") from e
+            print(f"  ✓ {os.path.basename(yol)}: {tablo.num_rows} satır, {sure:.2f} sn")
+            tablolar.append(tablo)
+
+    df = pa.concat_tables(tablolar, promote_options='default').to_pandas()
+    print(f"✓ {len(dosyalar)} dosya {time.perf_counter() - baslangic:.2f} sn'de yüklendi ve temizlendi ({len(df)} satır).")
+    return df
+
+def _dosyayi_oku_ve_temizle(dosya_yolu, varsayilan_kar_marji=0.25, is_parcacigi_sayisi=None):
+    """
+    Kaynak dosyayı okur ve temizlenmiş işlem tablosunu üretir (önbelleksiz yol).
+    Kaynak bir klasör veya glob deseniyse dosyalar paralel olarak işlenir.
+    """
+    dosyalar = kaynak_dosyalarini_listele(dosya_yolu)
+    if not dosyalar:
+        raise FileNotFoundError(f"'{dosya_yolu}' içinde okunacak veri dosyası bulunamadı.")
+    if dosyalar != [dosya_yolu]:
+        return _coklu_dosyayi_oku_ve_temizle(dosyalar, varsayilan_kar_marji, is_parcacigi_sayisi)
 
+    print(f"'{dosya_yolu}' yükleniyor...")
+    tablo, ondalik = _dosyayi_oku(dosya_yolu)
     print("Veri başarıyla yüklendi. Temizleme işlemleri başlıyor...")
-    
-    df.columns = df.columns.str.strip().str.lower()
-    
-    kolon_map = {
-        'musteriid': ['musteriid', 'müşteri id', 'customer id'],
-        'urunkodu': ['urunkodu', 'ürün kodu', 'stockcode', 'product id'],
-        'tarih': ['tarih', 'siparis tarihi', 'date', 'invoicedate'],
-        'miktar': ['miktar', 'quantity'],
-        'birimfiyat': ['birimfiyat', 'fiyat', 'price', 'unitprice'],
-        'maliyet': ['maliyet', 'purchase cost', 'cost', 'purchasecost'],
-        'kategori': ['kategori', 'category'] 
-    }
-    
-    for standart_ad, potansiyel_adlar in kolon_map.items():
-        for ad in potansiyel_adlar:
-            if ad in df.columns:
-                df.rename(columns={ad: standart_ad}, inplace=True)
-                break
-    
-    sayisal_kolonlar = ['birimfiyat', 'miktar', 'maliyet']
-    for kolon in sayisal_kolonlar:
-        if kolon in df.columns:
-            df[kolon] = pd.to_numeric(df[kolon].astype(str).str.replace(',', '.', regex=False), errors='coerce')
+    df = _tabloyu_temizle(tablo, varsayilan_kar_marji, ondalik)
+    print("Veri temizleme tamamlandı.")
+    return df
 
-    if 'tarih' in df.columns:
-        df['tarih'] = pd.to_datetime(df['tarih'], errors='coerce')
+def _tabloyu_temizle(tablo, varsayilan_kar_marji=0.25, ondalik=ONDALIK_AYIRICI, ayrintili=True, kolon_adlari=None):
+    """
+    Ham Arrow tablosuna kolon eşleştirmesini, şema dönüşümünü, filtreleri ve NetKar
+    kuralını uygular. Akış modunda her parça için ayrı ayrı çağrılır; 'kolon_adlari'
+    verilirse parçada hiç görünmeyen standart kolonlar boş olarak eklenir.
+    """
+    tablo = _kolonlari_standartlastir(tablo)
+    for kolon in kolon_adlari or []:
+        if kolon not in tablo.column_names:
+            tablo = tablo.append_column(kolon, pa.nulls(tablo.num_rows, pa.string()))
+    tablo = _semaya_gore_donustur(tablo, ondalik=ondalik)
+    df = tablo.to_pandas(coerce_temporal_nanoseconds=True)
 
     gerekli_kolonlar_temel = ['musteriid', 'tarih', 'miktar', 'birimfiyat', 'urunkodu']
     df.dropna(subset=gerekli_kolonlar_temel, inplace=True)
@@ -112,12 +781,14 @@ def veriyi_yukle_ve_temizle(dosya_yolu, varsayilan_kar_marji=0.25):
         # np.where ile koşulu uygula: maske doğruysa kar_marjli, değilse maliyet_bazli değeri ata
         df['netkar'] = np.where(maske_ozel_urun, kar_marjli, maliyet_bazli)
         
-        print(f"✓ 'NetKar' kolonu, '{ozel_urun_adi}' için özel kural uygulanarak hesaplandı.")
+        if ayrintili:
+            print(f"✓ 'NetKar' kolonu, '{ozel_urun_adi}' için özel kural uygulanarak hesaplandı.")
 
     else:
         # Maliyet sütunu hiç yoksa, tüm ürünlere kar marjı uygula
         df['netkar'] = df['toplamtutar'] * varsayilan_kar_marji
-        print(f"UYARI: Dosyada 'Maliyet' kolonu bulunamadı. 'NetKar' kolonu, %{varsayilan_kar_marji*100} varsayılan kar marjı ile hesaplandı.")
+        if ayrintili:
+            print(f"UYARI: Dosyada 'Maliyet' kolonu bulunamadı. 'NetKar' kolonu, %{varsayilan_kar_marji*100} varsayılan kar marjı ile hesaplandı.")
     # --- GÜNCELLEME SONU ---
     final_rename_map = {
         'musteriid': 'MusteriID', 'musteriadi': 'MusteriAdi', 'urunkodu': 'UrunKodu', 
@@ -127,12 +798,381 @@ def veriyi_yukle_ve_temizle(dosya_yolu, varsayilan_kar_marji=0.25):
     }
     df.rename(columns={k: v for k, v in final_rename_map.items() if k in df.columns}, inplace=True)
 
-    print("Veri temizleme tamamlandı.")
+    # Uzun müşteri/ürün/kategori adları, tek bir ortak sözlüğe işaret eden tamsayı kodlarla
+    # (pandas categorical) saklanır. groupby/isin/merge işlemleri metin yerine kodlar üzerinde çalışır.
+    for kolon in SOZLUK_KOLONLARI:
+        if kolon in df.columns:
+            df[kolon] = df[kolon].astype('category')
+    return df
+
+# --- PARÇALI (AKIŞ) OKUMA ---
+# Belleğe sığmayan büyük dışa aktarımlar için JSON Lines ve CSV dosyaları sabit boyutlu
+# parçalar halinde okunur, her parça ayrı ayrı temizlenir ve doğrudan Parquet deposuna
+# yazılır. Ham baytlar Arrow'a, ardından pandas'a çevrilirken birkaç kopya oluştuğundan
+# parça boyutu bellek sınırının bu katsayıya bölünmesiyle bulunur.
+_BELLEK_GENISLEME_KATSAYISI = 8
+
+def _parca_boyutu(bellek_limiti_mb):
+    """Bellek sınırına göre tek seferde okunacak ham bayt sayısını hesaplar (en az 1 MB)."""
+    return max(int(bellek_limiti_mb * 1024 * 1024 / _BELLEK_GENISLEME_KATSAYISI), 1 << 20)
+
+def _json_satirlarini_ayristir(veri):
+    """Bir bayt bloğundaki JSON satırlarını Arrow tablosuna çevirir."""
+    try:
+        return pa_json.read_json(io.BytesIO(veri))
+    except pa.ArrowInvalid:
+        df = pd.read_json(io.BytesIO(veri), orient='records', lines=True, dtype=False, convert_dates=False)
+        return _tabloya_cevir(df)
+
+def _json_satir_parcalari(dosya_yolu, parca_boyutu):
+    """JSON Lines dosyasını satır sınırlarından bölünmüş parçalar halinde okur."""
+    artik = b''
+    with open(dosya_yolu, 'rb') as f:
+        while True:
+            blok = f.read(parca_boyutu)
+            if not blok:
+                break
+            blok = artik + blok
+            son_satir_sonu = blok.rfind(b'\n')
+            if son_satir_sonu == -1:
+                artik = blok
+                continue
+            artik = blok[son_satir_sonu + 1:]
+            if blok[:son_satir_sonu].strip():
+                yield _json_satirlarini_ayristir(blok[:son_satir_sonu + 1])
+    if artik.strip():
+        yield _json_satirlarini_ayristir(artik)
+
+def _csv_parcalari(dosya_yolu, ayarlar, parca_boyutu):
+    """CSV dosyasını Arrow'un akış okuyucusuyla parça parça okur."""
+    okuyucu = pa_csv.open_csv(
+        dosya_yolu,
+        read_options=pa_csv.ReadOptions(block_size=parca_boyutu),
+        **_csv_okuma_ayarlari(ayarlar)
+    )
+    for parti in okuyucu:
+        yield pa.Table.from_batches([parti])
+
+def _depo_semasi(sema):
+    """
+    İlk parçanın şemasından depo şemasını türetir. Sözlük kolonlarının kod genişliği
+    parçadan parçaya değişebildiği için hepsi int32 kodlu sözlüğe sabitlenir.
+    """
+    alanlar = []
+    for alan in sema:
+        if pa.types.is_dictionary(alan.type):
+            alan = alan.with_type(pa.dictionary(pa.int32(), pa.string()))
+        elif pa.types.is_null(alan.type):
+            alan = alan.with_type(pa.string())
+        alanlar.append(alan)
+    return pa.schema(alanlar, metadata=sema.metadata)
+
+def _depo_semasina_uydur(tablo, sema):
+    """Bir parçayı depo şemasına getirir: eksik kolonları boş ekler, fazlalarını atar."""
+    diziler = []
+    for alan in sema:
+        if alan.name in tablo.column_names:
+            diziler.append(tablo.column(alan.name).cast(alan.type))
+        else:
+            diziler.append(pa.nulls(tablo.num_rows, alan.type))
+    return pa.Table.from_arrays(diziler, schema=sema)
+
+def _parcalari_depoya_yaz(parcalar, depo_yolu):
+    """
+    Temizlenmiş DataFrame parçalarını tek bir Parquet dosyasına satır grubu olarak ekler.
+    Dosya önce geçici adla yazılır; yarıda kalan bir yazım geçerli depo gibi görünmez.
+    """
+    os.makedirs(os.path.dirname(depo_yolu) or '.', exist_ok=True)
+    gecici_yol = depo_yolu + '.tmp'
+    yazici = None
+    satir_sayisi = 0
+    try:
+        for df in parcalar:
+            tablo = pa.Table.from_pandas(df, preserve_index=False)
+            if yazici is None:
+                sema = _depo_semasi(tablo.schema)
+                yazici = pq.ParquetWriter(gecici_yol, sema)
+            yazici.write_table(_depo_semasina_uydur(tablo, sema))
+            satir_sayisi += len(df)
+        if yazici is None:
+            raise ValueError("Dosyadan okunacak satır bulunamadı.")
+        yazici.close()
+        os.replace(gecici_yol, depo_yolu)
+    except BaseException:
+        if yazici is not None:
+            yazici.close()
+        if os.path.exists(gecici_yol):
+            os.remove(gecici_yol)
+        raise
+    return satir_sayisi
+
+def _dosyanin_temiz_parcalari(dosya_yolu, varsayilan_kar_marji, parca_boyutu):
+    """
+    Tek bir dosyayı parça parça okuyup temizlenmiş DataFrame parçaları üretir.
+    Parçalanamayan JSON dizisi dosyaları tek parça olarak üretilir.
+    """
+    dosya_formati, ayarlar = _dosya_formatini_tespit_et(dosya_yolu)
+    if dosya_formati == 'csv':
+        ham_parcalar, ondalik = _csv_parcalari(dosya_yolu, ayarlar, parca_boyutu), ayarlar['ondalik']
+    elif dosya_formati == 'json_lines':
+        ham_parcalar, ondalik = _json_satir_parcalari(dosya_yolu, parca_boyutu), ONDALIK_AYIRICI
+    elif dosya_formati == 'xlsx':
+        # Bir Excel satırı Python nesneleriyle yaklaşık 1 KB yer kaplar.
+        ham_parcalar, ondalik = _xlsx_parcalari(dosya_yolu, max(parca_boyutu // 1024, 1000)), ONDALIK_AYIRICI
+    else:
+        print(f"UYARI: '{dosya_formati}' formatı parça parça okunamıyor, '{dosya_yolu}' tek seferde yükleniyor...")
+        yield _dosyayi_oku_ve_temizle(dosya_yolu, varsayilan_kar_marji)
+        return
+
+    # JSON Lines'ta bir parçada hiç geçmeyen alanlar (örn. 'maliyet') olabilir; kolon
+    # kümesi ilk parçadan alınır ki NetKar kuralı tüm parçalarda aynı işlesin.
+    kolon_adlari = None
+    for ham_tablo in ham_parcalar:
+        if kolon_adlari is None:
+            kolon_adlari = _kolonlari_standartlastir(ham_tablo).column_names
+        yield _tabloyu_temizle(ham_tablo, varsayilan_kar_marji, ondalik,
+                               ayrintili=False, kolon_adlari=kolon_adlari)
+
+def veriyi_akista_temizle(dosya_yolu, varsayilan_kar_marji=0.25, bellek_limiti_mb=512):
+    """
+    Dosyayı 'bellek_limiti_mb' sınırına göre boyutlandırılmış parçalar halinde okur,
+    her parçaya aynı kolon eşleştirmesini, filtreleri ve NetKar kuralını uygular ve
+    sonucu doğrudan Parquet deposuna yazar. Deponun yolunu döndürür.
+
+    JSON Lines, CSV ve xlsx parça parça okunur; JSON dizisi dosyaları tek seferde yüklenir.
+    Klasör veya glob kaynaklarında dosyalar sırayla aynı depoya yazılır.
+    """
+    depo_yolu = _onbellek_yolu(dosya_yolu, _dosya_parmak_izi(dosya_yolu), varsayilan_kar_marji)
+    if os.path.exists(depo_yolu):
+        print(f"✓ '{dosya_yolu}' için temiz veri deposu güncel.")
+        return depo_yolu
+
+    parca_boyutu = _parca_boyutu(bellek_limiti_mb)
+    def temiz_parcalar():
+        for kaynak_dosya in kaynak_dosyalarini_listele(dosya_yolu):
+            yield from _dosyanin_temiz_parcalari(kaynak_dosya, varsayilan_kar_marji, parca_boyutu)
+
+    print(f"'{dosya_yolu}' parça parça işleniyor (parça boyutu: {parca_boyutu // (1024 * 1024)} MB)...")
+    satir_sayisi = _parcalari_depoya_yaz(temiz_parcalar(), depo_yolu)
+    _eski_onbellekleri_sil(depo_yolu)
+    print(f"✓ {satir_sayisi} temiz satır '{depo_yolu}' deposuna yazıldı.")
+    return depo_yolu
+
+# --- ARTIMLI (BİRİKİMLİ) DEPO ---
+# Günlük yenilemelerde tüm geçmişi yeniden temizlemek yerine yalnızca yeni kayıtlar
+# depoya eklenir. Depo klasöründe her ekleme ayrı bir Parquet parçası (delta) olarak
+# durur; 'meta.json' filigranı (depodaki en büyük Tarih), işlenen kaynak dosyaları ve
+# parça listesini tutar.
+_DEPO_META_DOSYASI = 'meta.json'
+
+def _depo_metasini_oku(depo_dizini):
+    """Depo meta bilgisini okur; depo henüz yoksa boş bir meta döndürür."""
+    meta_yolu = os.path.join(depo_dizini, _DEPO_META_DOSYASI)
+    if not os.path.exists(meta_yolu):
+        return {'filigran': None, 'kar_marji': None, 'kolonlar': None, 'dosyalar': {}, 'parcalar': []}
+    with open(meta_yolu, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _depo_metasini_yaz(depo_dizini, meta):
+    """Meta bilgisini atomik olarak yazar; yarıda kalan bir ekleme depoyu bozmaz."""
+    meta_yolu = os.path.join(depo_dizini, _DEPO_META_DOSYASI)
+    with open(meta_yolu + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_yolu + '.tmp', meta_yolu)
+
+def _onek_ozeti(dosya_yolu, bayt_sayisi, blok_boyutu=1 << 20):
+    """Dosyanın ilk 'bayt_sayisi' baytının özetini hesaplar."""
+    ozet = hashlib.blake2b(digest_size=16)
+    with open(dosya_yolu, 'rb') as f:
+        kalan = bayt_sayisi
+        while kalan > 0:
+            blok = f.read(min(blok_boyutu, kalan))
+            if not blok:
+                break
+            ozet.update(blok)
+            kalan -= len(blok)
+    return ozet.hexdigest()
+
+def _ozetler(dosya_yolu, onek_bayti, bayt_sayisi, blok_boyutu=1 << 20):
+    """
+    Dosyanın ilk 'onek_bayti' baytının ve ilk 'bayt_sayisi' baytının özetini tek okumada
+    hesaplar. Dosya 'onek_bayti'ndan kısaysa önek özeti None olur.
+    """
+    ozet = hashlib.blake2b(digest_size=16)
+    onek_ozeti = None
+    with open(dosya_yolu, 'rb') as f:
+        okunan = 0
+        while True:
+            if onek_ozeti is None and okunan == onek_bayti:
+                onek_ozeti = ozet.copy().hexdigest()
+            sinir = onek_bayti if onek_ozeti is None else bayt_sayisi
+            blok = f.read(min(blok_boyutu, sinir - okunan))
+            if not blok:
+                break
+            ozet.update(blok)
+            okunan += len(blok)
+    return onek_ozeti, ozet.hexdigest()
+
+def _dosya_kuyrugunu_temizle(dosya_yolu, baslangic, varsayilan_kar_marji, kolon_adlari):
+    """
+    Sonuna ekleme yapılmış bir JSON Lines/CSV dosyasının yalnızca 'baslangic' baytından
+    sonraki kısmını okuyup temizler. Diğer formatlar için None döndürür.
+    """
+    dosya_formati, ayarlar = _dosya_formatini_tespit_et(dosya_yolu)
+    if dosya_formati not in ('csv', 'json_lines'):
+        return None
+    with open(dosya_yolu, 'rb') as f:
+        baslik_satiri = f.readline()
+        f.seek(baslangic)
+        kuyruk = f.read()
+    if not kuyruk.strip():
+        return None
+
+    if dosya_formati == 'csv':
+        tablo = pa_csv.read_csv(io.BytesIO(baslik_satiri + kuyruk), **_csv_okuma_ayarlari(ayarlar))
+        ondalik = ayarlar['ondalik']
+    else:
+        tablo = _json_satirlarini_ayristir(kuyruk)
+        ondalik = ONDALIK_AYIRICI
+    return _tabloyu_temizle(tablo, varsayilan_kar_marji, ondalik, ayrintili=False, kolon_adlari=kolon_adlari)
+
+def _bos_depo_tablosu(depo_dizini, meta):
+    """Depodaki kolon ve tiplerle boş bir DataFrame döndürür."""
+    if not meta['parcalar']:
+        return pd.DataFrame()
+    sema = pq.read_schema(os.path.join(depo_dizini, meta['parcalar'][0]['dosya']))
+    return sema.empty_table().to_pandas()
+
+def _yeni_kayitlari_temizle(dosya_yolu, meta, varsayilan_kar_marji):
+    """
+    Tek bir kaynak dosyadan depoya henüz girmemiş kayıtları temizlenmiş olarak döndürür.
+    Dosya yalnızca sonuna eklenerek büyümüşse sadece yeni kısmı okunur ve tamamı alınır; aksi
+    halde dosya baştan temizlenir ve filigrandan (depodaki en büyük Tarih) yeni satırlar alınır.
+    """
+    onceki = meta['dosyalar'].get(os.path.abspath(dosya_yolu))
+    durum = os.stat(dosya_yolu)
+    boyut = durum.st_size
+    # Boyutu ve değişiklik zamanı aynı kalan dosya okunmaz.
+    if onceki and onceki['bayt'] == boyut and onceki.get('mtime_ns') == durum.st_mtime_ns:
+        return None
+    onek_ozeti, ozet = _ozetler(dosya_yolu, onceki['bayt'] if onceki else 0, boyut)
+    kayit = {'bayt': boyut, 'mtime_ns': durum.st_mtime_ns, 'ozet': ozet}
+    if onceki and onceki['bayt'] == boyut and ozet == onceki['ozet']:
+        meta['dosyalar'][os.path.abspath(dosya_yolu)] = kayit
+        return None
+
+    df = None
+    if onceki and boyut > onceki['bayt'] and onek_ozeti == onceki['ozet']:
+        # Ofsetten sonraki satırların hepsi yenidir; filigranla aynı saniyedeki fatura satırları
+        # veya geriye tarihli kayıtlar da alınır.
+        kolon_adlari = [k.lower() for k in meta['kolonlar'] or []]
+        df = _dosya_kuyrugunu_temizle(dosya_yolu, onceki['bayt'], varsayilan_kar_marji, kolon_adlari)
+    if df is None:
+        df = _dosyayi_oku_ve_temizle(dosya_yolu, varsayilan_kar_marji)
+        if meta['filigran'] is not None:
+            df = df[df['Tarih'] > pd.Timestamp(meta['filigran'])]
+    meta['dosyalar'][os.path.abspath(dosya_yolu)] = kayit
     return df
 
-def musteri_zaman_serisi_hazirla(df, musteri_id):
-    """Belirli bir müşterinin verisini aylık zaman serisi formatına dönüştürür."""
-    musteri_df = df[df['MusteriID'] == musteri_id].copy()
+def veriyi_artimli_ekle(kaynak, depo_dizini=DEPO_DIZINI, varsayilan_kar_marji=0.25):
+    """
+    Yeni kayıtları birikimli depoya ekler ve yalnızca eklenen satırları (delta) döndürür.
+
+    'kaynak' bir dosyaysa, depodaki filigrandan (en büyük Tarih) daha yeni kayıtlar alınır.
+    'kaynak' bir klasörse (bırakma klasörü), daha önce işlenmemiş dosyaların tamamı alınır.
+    Delta boşsa depoya yeni parça yazılmaz.
+    """
+    os.makedirs(depo_dizini, exist_ok=True)
+    meta = _depo_metasini_oku(depo_dizini)
+    if meta['kar_marji'] is not None and meta['kar_marji'] != varsayilan_kar_marji:
+        raise ValueError(
+            f"Depo %{meta['kar_marji']*100} kar marjı ile oluşturulmuş. "
+            "Farklı bir kar marjı için yeni bir depo klasörü kullanın."
+        )
+
+    if os.path.isdir(kaynak):
+        yeni_dosyalar = [
+            yol for yol in kaynak_dosyalarini_listele(kaynak)
+            if os.path.abspath(yol) not in meta['dosyalar']
+        ]
+        delta = _coklu_dosyayi_oku_ve_temizle(yeni_dosyalar, varsayilan_kar_marji) if yeni_dosyalar else None
+        for dosya_yolu in yeni_dosyalar:
+            boyut = os.path.getsize(dosya_yolu)
+            meta['dosyalar'][os.path.abspath(dosya_yolu)] = {'bayt': boyut, 'ozet': _onek_ozeti(dosya_yolu, boyut)}
+    else:
+        delta = _yeni_kayitlari_temizle(kaynak, meta, varsayilan_kar_marji)
+
+    if delta is None or delta.empty:
+        _depo_metasini_yaz(depo_dizini, meta)
+        print(f"✓ '{kaynak}' için depoya eklenecek yeni kayıt yok.")
+        return _bos_depo_tablosu(depo_dizini, meta)
+
+    parca_adi = f"parca-{len(meta['parcalar']) + 1:05d}.parquet"
+    _parcalari_depoya_yaz([delta.reset_index(drop=True)], os.path.join(depo_dizini, parca_adi))
+    yeni_filigran = delta['Tarih'].max()
+    if meta['filigran'] is not None:
+        yeni_filigran = max(yeni_filigran, pd.Timestamp(meta['filigran']))
+    meta['parcalar'].append({'dosya': parca_adi, 'satir': len(delta), 'filigran': yeni_filigran.isoformat()})
+    meta.update(filigran=yeni_filigran.isoformat(), kar_marji=varsayilan_kar_marji,
+                kolonlar=meta['kolonlar'] or list(delta.columns))
+    _depo_metasini_yaz(depo_dizini, meta)
+    print(f"✓ {len(delta)} yeni satır depoya eklendi. Yeni filigran: {yeni_filigran}")
+    return delta.reset_index(drop=True)
+
+def depoyu_yukle(depo_dizini=DEPO_DIZINI, yalnizca_son_delta=False):
+    """Birikimli depodaki tüm parçaları (veya yalnızca son eklenen deltayı) tek tabloda birleştirir."""
+    meta = _depo_metasini_oku(depo_dizini)
+    if not meta['parcalar']:
+        raise FileNotFoundError(f"'{depo_dizini}' klasöründe veri deposu bulunamadı.")
+    parcalar = meta['parcalar'][-1:] if yalnizca_son_delta else meta['parcalar']
+    tablo = pq.read_table([os.path.join(depo_dizini, p['dosya']) for p in parcalar])
+    return tablo.to_pandas()
+
+def artimli_depo_dizini(kaynak):
+    """Kaynağın analiz hattı tarafından beslenen birikimli deposunun klasörü."""
+    return os.path.join(DEPO_DIZINI, _kaynak_adi(kaynak))
+
+def _artimli_ipc_yolu(depo_dizini, meta):
+    anahtar_verisi = json.dumps({'parcalar': len(meta['parcalar']), 'filigran': meta['filigran'],
+                                 'kar_marji': meta['kar_marji'], 'surum': _ONBELLEK_SURUMU}, sort_keys=True)
+    anahtar = hashlib.blake2b(anahtar_verisi.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(depo_dizini, f"temiz-{anahtar}.arrow")
+
+def artimli_ipc_yolu(kaynak, depo_dizini=None):
+    """
+    Birikimli deponun müşteri sıralı Arrow IPC dosyasının yolu. Anahtar 'meta.json'daki parça
+    sayısı ve filigrandan türetilir; kaynak dosyanın içeriği özetlenmez.
+    """
+    depo_dizini = depo_dizini or artimli_depo_dizini(kaynak)
+    return _artimli_ipc_yolu(depo_dizini, _depo_metasini_oku(depo_dizini))
+
+def veriyi_artimli_yukle(kaynak, varsayilan_kar_marji=0.25, depo_dizini=None):
+    """
+    Analiz hattının artımlı 'temiz' kaynağı. Kaynaktaki yeni kayıtlar birikimli depoya eklenir
+    (bkz. veriyi_artimli_ekle); yalnızca bu delta okunup temizlenir. Depodaki parçalar müşteri
+    sıralı tek bir Arrow IPC dosyasına yazılır ve belleğe eşlenerek döndürülür
+    (bellek_eslemeli=True ile aynı düzen). Dosya yalnızca depoya yeni kayıt eklendiğinde
+    yeniden yazılır (bkz. artimli_ipc_yolu); aksi halde mevcut dosya eşlenir. Aynı deponun
+    birden fazla süreçten beslenip deltanın iki kez eklenmemesi için dosya kilidi alınır.
+    """
+    depo_dizini = depo_dizini or artimli_depo_dizini(kaynak)
+    with dosya_kilidi(os.path.join(depo_dizini, '.kilit')):
+        veriyi_artimli_ekle(kaynak, depo_dizini, varsayilan_kar_marji)
+        ipc_dosyasi = artimli_ipc_yolu(kaynak, depo_dizini)
+        if not os.path.exists(ipc_dosyasi):
+            ipc_deposuna_yaz(_musteriye_gore_sirala(depoyu_yukle(depo_dizini)), ipc_dosyasi)
+    print(f"✓ '{kaynak}' için birikimli depodaki temiz veri belleğe eşlendi.")
+    return ipc_deposunu_esle(ipc_dosyasi)
+
+def musteri_zaman_serisi_hazirla(df, musteri_id, ofset_indeksi=None):
+    """
+    Belirli bir müşterinin verisini aylık zaman serisi formatına dönüştürür. 'ofset_indeksi'
+    verilirse müşterinin satırları tablo taranmadan alınır.
+    """
+    if ofset_indeksi is not None:
+        musteri_df = musteri_dilimi(df, ofset_indeksi, musteri_id)
+    else:
+        musteri_df = df[df['MusteriID'] == musteri_id]
     aylik_satislar = musteri_df.set_index('Tarih').resample('ME').agg({'ToplamTutar': 'sum'}).reset_index()
     aylik_satislar.rename(columns={'Tarih': 'ds', 'ToplamTutar': 'y'}, inplace=True)
     return aylik_satislar
@@ -0,0 +1,145 @@
+# feature_store.py
+# SORUMLULUĞU: Müşteri bazlı analizlerin (RFM, davranışsal anomali, kohort, dönemsel
+# karşılaştırma, kategori geçişi, ürün benzerliği) ortak kullandığı müşteri özellik
+# tablosunu, işlem tablosu üzerinden tek bir sıralı geçişle oluşturmak.
+
+import numpy as np
+import pandas as pd
+
+# Son N günlük harcama, işlem ve ürün çeşidi özelliklerinin pencereleri (gün).
+PENCERELER = (30, 90, 180, 365)
+
+def pencere_kolonlari(pencereler=PENCERELER):
+    """Pencereli özelliklerin kolon adları, örn. 'Harcama_30G', 'Islem_30G', 'UrunCesidi_30G'."""
+    return [f"{ad}_{pencere}G" for pencere in pencereler for ad in ('Harcama', 'Islem', 'UrunCesidi')]
+
+OZELLIK_KOLONLARI = [
+    'IlkAlimTarihi', 'SonAlimTarihi', 'IslemSayisi', 'ToplamTutar', 'ToplamNetKar',
+    'OrtalamaAlimAraligi', 'AlimAraligiStd', 'SonAlimAraligi',
+    'IlkKategori', 'IkinciKategori', 'UrunSeti', 'AlimGunuSayisi', 'TekrarAlimTutari'
+] + pencere_kolonlari()
+
+def _grup_toplami(degerler, baslangiclar):
+    # groupby().sum() gibi eksik değerleri 0 sayar.
+    return np.add.reduceat(np.nan_to_num(degerler.astype(float)), baslangiclar)
+
+def _al(kolon, konumlar):
+    """Kolonun verilen satırlarını dtype'ını koruyarak alır; -1 konumlar boş kalır."""
+    return kolon.array.take(konumlar, allow_fill=True)
+
+def _son_ek_toplami(degerler, soller, bitisler):
+    """Her müşteri için degerler[sol:bitis] toplamı; boş aralıklar 0'dır."""
+    toplamlar = np.add.reduceat(np.r_[degerler, 0.0], np.column_stack([soller, bitisler]).ravel())[::2]
+    return np.where(bitisler > soller, toplamlar, 0.0)
+
+def _alim_gunu_ozellikleri(sirali, kodlar, baslangiclar, islem_sayisi):
+    """
+    Aynı gündeki satırlar tek alım sayılarak müşterinin farklı alım günü sayısı ve ilk alım
+    günü dışındaki (tekrar) alımların toplam tutarı. Olasılıksal CLV modelinin girdileridir.
+    """
+    gun = sirali['Tarih'].to_numpy('datetime64[D]')
+    yeni_gun = np.r_[True, (kodlar[1:] != kodlar[:-1]) | (gun[1:] != gun[:-1])]
+    ilk_gunde = gun == np.repeat(gun[baslangiclar], islem_sayisi)
+    tutar = np.nan_to_num(sirali['ToplamTutar'].to_numpy(np.float64))
+    return {
+        'AlimGunuSayisi': np.add.reduceat(yeni_gun.astype(np.int64), baslangiclar),
+        'TekrarAlimTutari': np.add.reduceat(np.where(ilk_gunde, 0.0, tutar), baslangiclar),
+    }
+
+def _pencere_ozellikleri(sirali, kodlar, baslangiclar, bitisler, pencereler):
+    """
+    Müşteri sıralı işlem tablosunda, her pencere için müşterinin son N günündeki (verideki son
+    gün dahil) harcama, işlem ve farklı ürün sayısını hesaplar. Pencereler verinin son gününde
+    bittiğinden her müşterinin sıralı bloğunun bir son ekidir: tüm müşterilerin pencere
+    başlangıçları tek bir searchsorted ile, toplamlar son ek toplamlarıyla bulunur.
+    """
+    gun = sirali['Tarih'].to_numpy('datetime64[D]').astype(np.int64)
+    ilk_gun, son_gun = gun.min(), gun.max()
+    # (müşteri kodu, gün) çifti, sıralı tabloda artan tek bir int64 anahtara indirgenir.
+    gun_araligi = son_gun - ilk_gun + 1
+    kodlar = kodlar.astype(np.int64)
+    anahtar = kodlar * gun_araligi + (gun - ilk_gun)
+    musteri_kodlari = np.arange(len(baslangiclar), dtype=np.int64)
+
+    tutar = np.nan_to_num(sirali['ToplamTutar'].to_numpy(np.float64))
+    # Her ürünün müşterideki son görünümü işaretlenir; bir son ekteki işaret sayısı,
+    # o son ekteki farklı ürün sayısına eşittir.
+    urun_kodlari = pd.factorize(sirali['UrunKodu'])[0].astype(np.int64)
+    musteri_urun = kodlar * (urun_kodlari.max() + 1) + urun_kodlari
+    _, tersten_ilk = np.unique(musteri_urun[::-1], return_index=True)
+    son_gorunum = np.zeros(len(musteri_urun), dtype=np.int64)
+    son_gorunum[len(musteri_urun) - 1 - tersten_ilk] = 1
+    cesit_kumulatif = np.r_[0, np.cumsum(son_gorunum)]
+
+    sutunlar = {}
+    for pencere in pencereler:
+        pencere_baslangici = max(son_gun - pencere + 1 - ilk_gun, 0)
+        soller = np.searchsorted(anahtar, musteri_kodlari * gun_araligi + pencere_baslangici, side='left')
+        sutunlar[f"Harcama_{pencere}G"] = _son_ek_toplami(tutar, soller, bitisler)
+        sutunlar[f"Islem_{pencere}G"] = bitisler - soller
+        sutunlar[f"UrunCesidi_{pencere}G"] = cesit_kumulatif[bitisler] - cesit_kumulatif[soller]
+    return sutunlar
+
+def musteri_ozelliklerini_hesapla(temiz_df):
+    """
+    İşlemleri (MusteriID, Tarih) sırasına bir kez dizer ve müşteri sınırları üzerinden
+    tüm özellikleri vektörel olarak hesaplar. İndeks, groupby('MusteriID', observed=True)
+    ile aynı sırada ve aynı tiptedir; alım aralıkları gün cinsindendir. Pencereli kolonlar
+    (bkz. PENCERELER) verideki son güne göre hesaplanır.
+    """
+    kolonlar = ['MusteriID', 'Tarih', 'ToplamTutar', 'NetKar', 'Kategori', 'UrunKodu']
+    sirali = temiz_df[[k for k in kolonlar if k in temiz_df.columns]].sort_values(['MusteriID', 'Tarih'], kind='stable')
+
+    # Sıralı veride factorize, kodları müşteri sırasıyla 0, 1, 2... olarak verir.
+    kodlar, musteriler = pd.factorize(sirali['MusteriID'])
+    satir_sayisi = len(kodlar)
+    if satir_sayisi == 0:
+        bos = pd.DataFrame(columns=OZELLIK_KOLONLARI, index=pd.Index(musteriler, name='MusteriID'))
+        return bos.astype({'IlkAlimTarihi': 'datetime64[ns]', 'SonAlimTarihi': 'datetime64[ns]', 'IslemSayisi': int,
+                           'AlimGunuSayisi': int, 'TekrarAlimTutari': float,
+                           **{kolon: float for kolon in pencere_kolonlari()}})
+    baslangiclar = np.flatnonzero(np.r_[True, kodlar[1:] != kodlar[:-1]])
+    bitisler = np.r_[baslangiclar[1:], satir_sayisi]
+    islem_sayisi = bitisler - baslangiclar
+    birden_fazla = islem_sayisi >= 2
+
+    # Alım aralıkları: müşterinin ilk satırında tanımsızdır.
+    tarih_ns = sirali['Tarih'].to_numpy('datetime64[ns]')
+    aralik = np.empty(satir_sayisi)
+    aralik[0] = np.nan
+    aralik[1:] = (tarih_ns[1:] - tarih_ns[:-1]).astype('timedelta64[D]').astype(float)
+    aralik[baslangiclar] = np.nan
+    aralik_sayisi = islem_sayisi - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ortalama = _grup_toplami(aralik, baslangiclar) / aralik_sayisi
+        sapma = np.repeat(ortalama, islem_sayisi) - aralik
+        std = np.sqrt(_grup_toplami(sapma * sapma, baslangiclar) / (aralik_sayisi - 1))
+    ortalama[~birden_fazla] = np.nan
+    std[aralik_sayisi < 2] = np.nan
+
+    ozellikler = pd.DataFrame({
+        'IlkAlimTarihi': _al(sirali['Tarih'], baslangiclar),
+        'SonAlimTarihi': _al(sirali['Tarih'], bitisler - 1),
+        'IslemSayisi': islem_sayisi,
+        'ToplamTutar': _grup_toplami(sirali['ToplamTutar'].to_numpy(), baslangiclar),
+        'ToplamNetKar': _grup_toplami(sirali['NetKar'].to_numpy(), baslangiclar),
+        'OrtalamaAlimAraligi': ortalama,
+        'AlimAraligiStd': std,
+        'SonAlimAraligi': aralik[bitisler - 1],
+    }, index=pd.Index(musteriler, name='MusteriID'))
+
+    if 'Kategori' in sirali.columns:
+        ozellikler['IlkKategori'] = _al(sirali['Kategori'], baslangiclar)
+        ozellikler['IkinciKategori'] = _al(sirali['Kategori'], np.where(birden_fazla, baslangiclar + 1, -1))
+
+    urunler = sirali['UrunKodu'].to_numpy()
+    ozellikler['UrunSeti'] = [frozenset(urunler[b:s]) for b, s in zip(baslangiclar, bitisler)]
+    for kolon, degerler in _alim_gunu_ozellikleri(sirali, kodlar, baslangiclar, islem_sayisi).items():
+        ozellikler[kolon] = degerler
+    for kolon, degerler in _pencere_ozellikleri(sirali, kodlar, baslangiclar, bitisler, PENCERELER).items():
+        ozellikler[kolon] = degerler
+    return ozellikler
+
+def musterilere_yay(ozellik, musteri_idler):
+    """Müşteri bazlı bir özelliği, verilen MusteriID dizisinin her satırına yayar."""
+    return ozellik.array.take(ozellik.index.get_indexer(musteri_idler), allow_fill=True)
@@ -1,97 +1,183 @@
 # main.py
-
-from data_handler import veriyi_yukle_ve_temizle, musteri_zaman_serisi_hazirla
-from analysis_engine import rfm_skorlarini_hesapla, musterileri_segmentle, satis_tahmini_yap, tahmin_grafigini_ciz
-from analysis_engine import (rfm_skorlarini_hesapla, 
-                           musterileri_segmentle, 
-                           satis_tahmini_yap, 
-                           tahmin_grafigini_ciz,
-                           churn_tahmin_modeli_olustur,
-                           clv_hesapla)
+# SORUMLULUĞU: Sayfaların ihtiyaç duyduğu ağır analiz sonuçlarını arayüz olmadan önceden
+# hesaplayıp sonuç önbelleğine yazmak. Gece çalıştırılır; gün içinde sayfalar yalnızca
+# hazır sonuçları okur.
+#
+# Kullanım:  python main.py [--kaynak satis_verileri_guncellenmis.json] [--musteri-tahmini-sayisi 20]
+#                           [--is-parcacigi-sayisi N]
+#            Churn modelini çapraz doğrulamalı model seçimiyle kurmak için (sayfalarla aynı ortamda):
+#            CHURN_MODEL_SECIMI=1 python main.py
+#            Günlük yenilemede yalnızca yeni kayıtları temizleyip birikimli depoya eklemek için:
+#            VERI_ARTIMLI_YUKLEME=1 python main.py
+#            Harici bir özellik tablosunu güncel churn modeliyle skorlamak için:
+#            python main.py --churn-skorla ozellikler.parquet skorlar.csv
 
 import os
-from data_handler import veriyi_yukle_ve_temizle, musteri_zaman_serisi_hazirla
+import sys
+import time
+import argparse
+import pandas as pd
+from pipeline import AnalizHatti
+from result_cache import SonucOnbellegi
+from model_registry import model_kaydi
+from data_handler import VERI_DOSYASI
 
-def main():
+TAHMIN_MODELLERI = ('Prophet', 'ARIMA', 'SARIMA', 'Random Forest')
+
+def on_hesaplama_asamalarini_olustur(musteri_tahmini_sayisi):
     """
-    Ana iş akışını yöneten fonksiyon.
+    (aşama adı, istekleri üreten fonksiyon) listesini döndürür. İstekler sayfaların varsayılan
+    ayarlarla açılışta istediği düğümlerdir; parametreleri sayfalardakiyle aynı olmalıdır ki
+    parmak izleri eşleşsin.
     """
-    print("Müşteri Analitik Projesi Başlatıldı...")
-    
-    # 1. Veri Yükleme ve Temizleme
-    temiz_df = veriyi_yukle_ve_temizle('satis_verileri.xlsx')
-    
-    # 2. RFM Analizi ve Segmentasyon
-    rfm_sonuclari = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_sonuclar = musterileri_segmentle(rfm_sonuclari)
-    
-    print("\n" + "="*50)
-    print("  MÜŞTERİ SEGMENTASYON SONUÇLARI")
-    print("="*50)
-    print(segmentli_sonuclar.head(10))
-    
-    # 3. Müşteri Bazlı Satış Tahminlemesi (Çoklu Müşteri İçin)
-    print("\n" + "="*50)
-    print("  MÜŞTERİ BAZLI SATIŞ TAHMİNLEMESİ")
-    print("="*50)
+    def genel_tahminler(hat):
+        istekler = []
+        for model in TAHMIN_MODELLERI:
+            # Gelişmiş Tahminleme: geri test (son 6 ay), manuel karşılaştırma (6 ay),
+            # otomatik tahmin ve senaryo karşılaştırması (12 ay).
+            istekler.append(f"satis_tahmini(model='{model}', tahmin_periyodu=6, test_ay_sayisi=6)")
+            istekler.append(f"satis_tahmini(model='{model}', tahmin_periyodu=6)")
+            istekler.append(f"satis_tahmini(model='{model}', tahmin_periyodu=12)")
+        return istekler
 
-    # Ayarlar
-    tahmin_yapilacak_musteri_sayisi = 3 # En iyi kaç şampiyon müşteri için tahmin yapılsın?
-    tahmin_periyodu_ay = 6             # Kaç aylık tahmin yapılsın?
+    def musteri_tahminleri(hat):
+        # Müşteri Detayı sayfasındaki liste CLV'ye göre sıralıdır; en üstteki müşteriler hazırlanır.
+        musteri_idler = hat.sonuc('clv').index[:musteri_tahmini_sayisi]
+        return [f"musteri_tahmini(musteri_id={str(musteri_id)!r}, ay_sayisi=6)" for musteri_id in musteri_idler]
 
-    # Tahmin yapmak için "Şampiyonlar" segmentindeki en iyi müşterileri seçelim
-    sampiyonlar = segmentli_sonuclar[segmentli_sonuclar['Segment'] == 'Şampiyonlar']
-    hedef_musteriler = sampiyonlar.head(tahmin_yapilacak_musteri_sayisi).index
+    return [
+        ("Segmentler ve churn skorları", lambda hat: ['clv']),
+        ("Churn modeli ve SHAP değerleri", lambda hat: ['churn', 'shap_degerleri', 'churn_skorlayici']),
+        ("Anomaliler", lambda hat: ['profil_anomalileri', 'davranissal_anomaliler']),
+        ("Birliktelik kuralları", lambda hat: ['market_basket']),
+        ("Kohortlar", lambda hat: [f"kohort(metric='{metrik}', period='{periyot}')"
+                                   for metrik in ('retention', 'avg_spend') for periyot in ('M', 'Q')]),
+        ("Müşteri yolculukları", lambda hat: ['musteri_yolculugu']),
+        ("Benzerlik ve kategori geçişleri", lambda hat: ['musteri_benzerligi', 'kategori_migrasyonu']),
+        ("Genel satış tahminleri", genel_tahminler),
+        ("Müşteri bazlı tahminler", musteri_tahminleri),
+    ]
 
-    print(f"En iyi {len(hedef_musteriler)} şampiyon müşteri için {tahmin_periyodu_ay} aylık tahmin yapılacak...")
-
-    # Seçilen her bir müşteri için döngü başlat
-    for musteri_id in hedef_musteriler:
-        print(f"\n--- Tahmin Başlatıldı: Müşteri ID -> {musteri_id} ---")
-        
-        # Seçilen müşteri için zaman serisi verisini hazırlayalım
-        musteri_ts = musteri_zaman_serisi_hazirla(temiz_df, musteri_id)
-        
-        # Tahmin yapabilmek için yeterli veri olup olmadığını kontrol edelim (en az 1 yıl)
-        if len(musteri_ts) >= 12:
-            # Modeli çalıştırıp tahmin yapalım
-            model, tahmin = satis_tahmini_yap(musteri_ts, ay_sayisi=tahmin_periyodu_ay)
-            
-            # Tahmin sonuçlarının son birkaç satırını (geleceği) gösterelim
-            print(f"\n'{musteri_id}' için Tahmin Sonuçları (Gelecek {tahmin_periyodu_ay} Ay):")
-            print(tahmin[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(tahmin_periyodu_ay))
-            
-            # Sonucu grafiğe dökelim (artık dosyaya kaydedecek)
-            tahmin_grafigini_ciz(model, tahmin, musteri_id=musteri_id)
-        else:
-            print(f"'{musteri_id}' için yeterli geçmiş veri bulunamadı (en az 12 ay gerekli). Tahmin yapılamadı.")
+def asamalari_calistir(hat, asamalar, is_parcacigi_sayisi=None):
+    """
+    Aşamaları sırayla çalıştırır ve her biri için (ad, süre, hesaplanan, önbellekten, hatalar)
+    özeti döndürür. Bir aşamanın bağımsız düğümleri eş zamanlı hesaplanır; bir istekteki
+    hata diğer istekleri ve aşamaları durdurmaz.
+    """
+    ozetler = []
+    for asama_adi, istek_uretici in asamalar:
+        print("\n" + "="*50)
+        print(f"  {asama_adi.upper()}")
+        print("="*50)
+        hat.olcumler.clear()
+        baslangic = time.perf_counter()
+        hatalar = []
+        try:
+            istekler = istek_uretici(hat)
+        except Exception as e:
+            istekler = []
+            hatalar.append(f"istekler oluşturulamadı: {e}")
+        if istekler:
+            try:
+                rapor = hat.paralel_hesapla(istekler, is_parcacigi_sayisi, hatalari_topla=True)
+                hatalar.extend(f"{etiket}: {hata}" for etiket, hata in rapor.hatalar.items())
+            except Exception as e:
+                hatalar.append(f"aşama çalıştırılamadı: {e}")
+                print(f"UYARI: '{asama_adi}' aşaması çalıştırılamadı: {e}")
+        sure = time.perf_counter() - baslangic
+        # Düğüm süreleri hat tarafından ayrıca yazdırılır; burada yalnızca sayılar tutulur.
+        hesaplanan = sum(1 for _, kaynak, _ in hat.olcumler if kaynak == 'hesaplandı')
+        ozetler.append((asama_adi, sure, hesaplanan, len(hat.olcumler) - hesaplanan, hatalar))
+    return ozetler
 
-    # 4. Müşteri Kaybı (Churn) Tahmini
+def ozeti_yazdir(ozetler, toplam_sure):
     print("\n" + "="*50)
-    print("  MÜŞTERİ KAYBI (CHURN) TAHMİNİ")
+    print("  ÖN HESAPLAMA ÖZETİ")
     print("="*50)
-    
-    churn_sonuclari, model_dogrulugu = churn_tahmin_modeli_olustur(segmentli_sonuclar)
-    
-    if model_dogrulugu > 0:
-        print("En Yüksek Churn Riski Taşıyan 15 Müşteri:")
-        # Sadece ilgili kolonları ve en riskli müşterileri gösterelim
-        print(churn_sonuclari[['Recency', 'Frequency', 'Segment', 'Churn_Olasiligi']].head(15))
+    print(f"{'Aşama':<34}{'Süre (sn)':>10}{'Hesap':>7}{'Hazır':>7}{'Hata':>6}")
+    for asama_adi, sure, hesaplanan, onbellekten, hatalar in ozetler:
+        print(f"{asama_adi:<34}{sure:>10.2f}{hesaplanan:>7}{onbellekten:>7}{len(hatalar):>6}")
+    print(f"{'Toplam':<34}{toplam_sure:>10.2f}")
 
-    
-    # 5. Müşteri Yaşam Boyu Değeri (CLV) Hesaplama
+def modelleri_yazdir():
+    """Model kaydındaki her türün en son eğitilen modelini ve metriklerini yazdırır."""
+    kayitlar = model_kaydi().kayitlari_listele()
+    if kayitlar.empty:
+        return
     print("\n" + "="*50)
-    print("  MÜŞTERİ YAŞAM BOYU DEĞERİ (CLV) HESAPLAMA")
+    print("  KAYITLI MODELLER (son eğitilenler)")
     print("="*50)
+    for _, kayit in kayitlar.groupby('tur').tail(1).iterrows():
+        # Aday sonuç tablosu gibi liste değerli metrikler özete yazılmaz.
+        metrikler = ", ".join(f"{ad}={deger:.3f}" if isinstance(deger, float) else f"{ad}={deger}"
+                              for ad, deger in kayit['metrikler'].items() if not isinstance(deger, list))
+        print(f"{kayit['tur']:<20} v{kayit['surum']:<4} {kayit['olusturma_zamani']}  {metrikler}")
+
+def churn_skorlarini_yaz(hat, girdi_yolu, cikti_yolu):
+    """
+    MusteriID indeksli (veya MusteriID kolonlu) bir özellik tablosunu (Parquet/CSV) düz ağaç
+    skorlayıcısıyla skorlar ve 'Churn_Olasiligi' kolonuyla CSV olarak yazar. Tabloda modelin
+    tüm özellikleri bulunmalıdır.
+    """
+    skorlayici = hat.sonuc('churn_skorlayici')
+    if skorlayici is None:
+        raise ValueError("Güncel churn modeli için düz ağaç skorlayıcısı yok (model eğitilemedi veya ağaç modeli değil).")
+    tablo = pd.read_parquet(girdi_yolu) if girdi_yolu.endswith('.parquet') else pd.read_csv(girdi_yolu)
+    if 'MusteriID' in tablo.columns:
+        tablo = tablo.set_index('MusteriID')
+    eksikler = [kolon for kolon in skorlayici.ozellik_adlari if kolon not in tablo.columns]
+    if eksikler:
+        raise ValueError(f"Özellik tablosunda eksik kolonlar: {', '.join(eksikler)}")
+    baslangic = time.perf_counter()
+    skorlar = skorlayici.skorla(tablo[list(skorlayici.ozellik_adlari)].to_numpy())
+    sure = time.perf_counter() - baslangic
+    pd.DataFrame({'Churn_Olasiligi': skorlar}, index=tablo.index).to_csv(cikti_yolu)
+    print(f"✓ {len(tablo)} müşteri {sure:.2f} sn'de skorlandı "
+          f"(müşteri başına {sure / max(len(tablo), 1) * 1e6:.1f} µs): {cikti_yolu}")
+
+def main():
+    """
+    Ön hesaplama komutu. Herhangi bir aşamada hata olursa çıkış kodu 1 olur, böylece
+    zamanlayıcı (cron vb.) başarısız çalışmayı fark edebilir.
+    """
+    ayristirici = argparse.ArgumentParser(description="Analiz sonuçlarını önceden hesaplayıp sonuç önbelleğine yazar.")
+    ayristirici.add_argument('--kaynak', default=VERI_DOSYASI,
+                             help="Satış verisi dosyası, klasörü veya glob deseni (varsayılan: %(default)s)")
+    ayristirici.add_argument('--musteri-tahmini-sayisi', type=int, default=20,
+                             help="Satış tahmini hazırlanacak en değerli müşteri sayısı (varsayılan: %(default)s)")
+    ayristirici.add_argument('--is-parcacigi-sayisi', type=int, default=None,
+                             help="Eş zamanlı çalışacak süreç sayısı (varsayılan: işlemci sayısı)")
+    ayristirici.add_argument('--churn-skorla', nargs=2, metavar=('GIRDI', 'CIKTI'), default=None,
+                             help="Ön hesaplama yerine, verilen özellik tablosunu churn modeliyle skorlayıp CSV yazar")
+    argumanlar = ayristirici.parse_args()
+
+    if argumanlar.churn_skorla:
+        hat = AnalizHatti(argumanlar.kaynak, sonuc_onbellegi=SonucOnbellegi())
+        girdi_yolu, cikti_yolu = argumanlar.churn_skorla
+        if not os.path.exists(girdi_yolu):
+            print(f"UYARI: Özellik tablosu bulunamadı: {girdi_yolu}")
+            return 1
+        try:
+            churn_skorlarini_yaz(hat, girdi_yolu, cikti_yolu)
+        except Exception as e:
+            print(f"UYARI: Churn skorlaması yapılamadı: {e}")
+            return 1
+        return 0
 
-    # Churn sonuçlarını içeren en güncel dataframe'i kullanarak CLV'yi hesapla
-    clv_sonuclari = clv_hesapla(churn_sonuclari, kar_marji=0.25)
-    
-    print("\nYaşam Boyu Değeri En Yüksek 15 Müşteri:")
-    # İlgili CLV kolonlarını ve en değerli müşterileri gösterelim
-    print(clv_sonuclari[['Segment', 'MPS', 'CLV_Net_Kar', 'Churn_Olasiligi']].head(15))
+    print("Müşteri Analitik Ön Hesaplama Başlatıldı...")
+    hat = AnalizHatti(argumanlar.kaynak, sonuc_onbellegi=SonucOnbellegi())
+    baslangic = time.perf_counter()
+    ozetler = asamalari_calistir(hat, on_hesaplama_asamalarini_olustur(argumanlar.musteri_tahmini_sayisi),
+                                 argumanlar.is_parcacigi_sayisi)
+    ozeti_yazdir(ozetler, time.perf_counter() - baslangic)
+    modelleri_yazdir()
 
-    print("\nProje başarıyla tamamlandı.")
+    hatalar = [hata for *_, asama_hatalari in ozetler for hata in asama_hatalari]
+    if hatalar:
+        print(f"\nUYARI: {len(hatalar)} istek hesaplanamadı.")
+        return 1
+    print("\nÖn hesaplama başarıyla tamamlandı.")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# model_registry.py
+# SORUMLULUĞU: Eğitilmiş modelleri (churn, anomali, kümeleme, tahmin) eğitim verisinin parmak
+# izi, hiperparametreleri ve metrikleriyle birlikte diskte sürümlü olarak saklamak. Aynı veri
+# ve ayarlarla yeniden eğitim yapılmaz; model kayıttan yüklenir.
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import functools
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from data_handler import dosya_kilidi
+
+MODEL_KAYIT_DIZINI = os.environ.get('MODEL_KAYIT_DIZINI', '.model_kayitlari')
+# Her model kimliği (tür + eğitim verisi izi + hiperparametreler) için tutulan en fazla sürüm
+# sayısı; aynı kimlik yeniden eğitildiğinde eski sürümler silinir.
+AZAMI_SURUM_SAYISI = int(os.environ.get('MODEL_KAYDI_AZAMI_SURUM', '5'))
+# Bu kadar gündür ne eğitilen ne de yüklenen model kimlikleri diskten silinir. Müşteri başına
+# Prophet veya farklı k'lı KMeans modelleri gibi çok sayıda kimlik diski böylece doldurmaz.
+AZAMI_YAS_GUN = float(os.environ.get('MODEL_KAYDI_AZAMI_YAS_GUN', '30'))
+
+# Eğitim kodu veya kayıt biçimi değiştiğinde artırılır; eski kayıtlar eşleşmez ve yeniden eğitilir.
+# Kütüphane sürümü de anahtara girer, çünkü pickle'lanmış modeller sürümler arasında taşınamaz.
+_MODEL_KAYDI_SURUMU = 2
+
+def veri_izi(*parcalar):
+    """
+    Eğitim verisinin (DataFrame, Series, dizi veya basit değerler) parmak izi. Değerler,
+    indeks, kolon adları ve tipler ize girer; aynı içerikli veri aynı izi verir.
+    """
+    ozet = hashlib.blake2b(digest_size=16)
+    for parca in parcalar:
+        if isinstance(parca, (pd.DataFrame, pd.Series)):
+            ozet.update(repr(list(parca.columns) if isinstance(parca, pd.DataFrame) else parca.name).encode('utf-8'))
+            ozet.update(repr(parca.dtypes.to_dict() if isinstance(parca, pd.DataFrame) else parca.dtype).encode('utf-8'))
+            ozet.update(pd.util.hash_pandas_object(parca, index=True).to_numpy().tobytes())
+        elif isinstance(parca, np.ndarray):
+            ozet.update(repr((parca.dtype.str, parca.shape)).encode('utf-8'))
+            ozet.update(np.ascontiguousarray(parca).tobytes())
+        else:
+            ozet.update(repr(parca).encode('utf-8'))
+    return ozet.hexdigest()
+
+class ModelKaydi:
+    """
+    Dizin yapısı: <dizin>/<tur>/<anahtar>/<surum>/{model.joblib, bilgi.json}. Anahtar (model
+    kimliği); model türü, eğitim verisinin izi, hiperparametreler ve kütüphane sürümünden
+    türetilir ve her kimliğin kendi sürüm geçmişi vardır. bilgi.json en son yazılır; yalnızca
+    bilgi dosyası olan sürümler geçerlidir. Sürüm numarası ayırma, yazma ve silme tür başına
+    bir dosya kilidiyle yapılır; paralel süreçler aynı numarayı alamaz. Yüklenen modeller süreç
+    içinde de tutulur, böylece aynı modeli isteyen sayfalar diski tekrar okumaz.
+    """
+
+    def __init__(self, dizin=MODEL_KAYIT_DIZINI, azami_surum_sayisi=AZAMI_SURUM_SAYISI, azami_yas_gun=AZAMI_YAS_GUN):
+        self.dizin = dizin
+        self.azami_surum_sayisi = azami_surum_sayisi
+        self.azami_yas_gun = azami_yas_gun
+        self._bellek = {}
+
+    @staticmethod
+    def anahtar(tur, egitim_izi, hiperparametreler):
+        icerik = json.dumps([_MODEL_KAYDI_SURUMU, sklearn.__version__, tur, egitim_izi, hiperparametreler],
+                            sort_keys=True, default=str)
+        return hashlib.blake2b(icerik.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _kimlik_dizini(self, tur, anahtar):
+        return os.path.join(self.dizin, tur, anahtar)
+
+    def _kilit(self, tur):
+        return dosya_kilidi(os.path.join(self.dizin, tur, '.kilit'))
+
+    def getir(self, tur, egitim_izi, hiperparametreler):
+        """Kimliğin en son sürümünü (model, bilgi) olarak döndürür; kayıt yoksa veya okunamıyorsa (None, None)."""
+        anahtar = self.anahtar(tur, egitim_izi, hiperparametreler)
+        if anahtar in self._bellek:
+            return self._bellek[anahtar]
+        surumler = self._surumler(tur, anahtar)
+        if not surumler:
+            return None, None
+        surum_dizini, bilgi = surumler[-1]
+        try:
+            model = joblib.load(os.path.join(surum_dizini, 'model.joblib'))
+            # Son kullanım zamanı; yaşlı kimlikler buna göre silinir.
+            os.utime(os.path.join(surum_dizini, 'bilgi.json'))
+        except Exception as e:
+            print(f"UYARI: '{tur}' model kaydı okunamadı, yeniden eğitilecek ({surum_dizini}): {e}")
+            return None, None
+        self._bellek[anahtar] = (model, bilgi)
+        return model, bilgi
+
+    def kaydet(self, tur, egitim_izi, hiperparametreler, model, metrikler=None, egitim_suresi=None):
+        """Modeli kimliğinin bir sonraki sürümü olarak yazar ve bilgi sözlüğünü döndürür."""
+        anahtar = self.anahtar(tur, egitim_izi, hiperparametreler)
+        kimlik_dizini = self._kimlik_dizini(tur, anahtar)
+        with self._kilit(tur):
+            # Yarım kalmış yazımların klasörleri de sayılır; numara bir kez verilir.
+            mevcut = [int(ad) for ad in os.listdir(kimlik_dizini) if ad.isdigit()] if os.path.isdir(kimlik_dizini) else []
+            surum = max(mevcut, default=0) + 1
+            surum_dizini = os.path.join(kimlik_dizini, f"{surum:04d}")
+            os.makedirs(surum_dizini)
+            bilgi = {
+                'tur': tur,
+                'anahtar': anahtar,
+                'surum': surum,
+                'egitim_izi': egitim_izi,
+                'hiperparametreler': hiperparametreler,
+                'metrikler': metrikler or {},
+                'egitim_suresi': egitim_suresi,
+                'olusturma_zamani': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'sklearn_surumu': sklearn.__version__,
+            }
+            self._atomik_yaz(os.path.join(surum_dizini, 'model.joblib'), lambda yol: joblib.dump(model, yol))
+            self._atomik_yaz(os.path.join(surum_dizini, 'bilgi.json'), lambda yol: self._json_yaz(yol, bilgi))
+            self._bellek[anahtar] = (model, bilgi)
+            self._eski_surumleri_sil(tur, anahtar)
+            self._yasli_kimlikleri_sil(tur)
+        return bilgi
+
+    def egit_veya_yukle(self, tur, egitim_izi, hiperparametreler, egitici):
+        """
+        Kayıtlı model varsa onu, yoksa egitici()'nin döndürdüğü (model, metrikler) ikilisini
+        kaydedip döndürür. Sonuç (model, bilgi) ikilisidir; metrikler bilgi['metrikler']'dedir.
+        """
+        model, bilgi = self.getir(tur, egitim_izi, hiperparametreler)
+        if bilgi is not None:
+            return model, bilgi
+        baslangic = time.perf_counter()
+        model, metrikler = egitici()
+        sure = time.perf_counter() - baslangic
+        try:
+            bilgi = self.kaydet(tur, egitim_izi, hiperparametreler, model, metrikler, egitim_suresi=round(sure, 3))
+            print(f"✓ '{tur}' modeli {sure:.2f} sn'de eğitildi ve kaydedildi (sürüm {bilgi['surum']}).")
+        except Exception as e:
+            # Kayıt yazılamasa da eğitilen model kullanılır.
+            print(f"UYARI: '{tur}' modeli kaydedilemedi: {e}")
+            bilgi = {'tur': tur, 'surum': None, 'egitim_izi': egitim_izi,
+                     'hiperparametreler': hiperparametreler, 'metrikler': metrikler or {}}
+        return model, bilgi
+
+    def kayitlari_listele(self, tur=None):
+        """Kayıtlı modellerin bilgilerini (tür, anahtar, sürüm, metrikler...) tablo olarak döndürür."""
+        turler = [tur] if tur else (sorted(os.listdir(self.dizin)) if os.path.isdir(self.dizin) else [])
+        satirlar = [bilgi for t in turler for anahtar in self._kimlikler(t) for _, bilgi in self._surumler(t, anahtar)]
+        return pd.DataFrame(satirlar).sort_values(['tur', 'olusturma_zamani', 'surum']) if satirlar else pd.DataFrame()
+
+    def _kimlikler(self, tur):
+        tur_dizini = os.path.join(self.dizin, tur)
+        if not os.path.isdir(tur_dizini):
+            return []
+        return [ad for ad in os.listdir(tur_dizini) if os.path.isdir(os.path.join(tur_dizini, ad))]
+
+    def _surumler(self, tur, anahtar):
+        """Kimliğin geçerli sürümlerini (surum_dizini, bilgi) olarak sürüm sırasıyla döndürür."""
+        kimlik_dizini = self._kimlik_dizini(tur, anahtar)
+        if not os.path.isdir(kimlik_dizini):
+            return []
+        surumler = []
+        for ad in sorted(ad for ad in os.listdir(kimlik_dizini) if ad.isdigit()):
+            surum_dizini = os.path.join(kimlik_dizini, ad)
+            try:
+                with open(os.path.join(surum_dizini, 'bilgi.json'), encoding='utf-8') as f:
+                    surumler.append((surum_dizini, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return surumler
+
+    def _eski_surumleri_sil(self, tur, anahtar):
+        # Yalnızca aynı kimliğin eski sürümleri silinir; en son sürüm bellekte olandır.
+        for surum_dizini, _ in self._surumler(tur, anahtar)[:-self.azami_surum_sayisi]:
+            self._dizini_sil(surum_dizini)
+
+    def _yasli_kimlikleri_sil(self, tur):
+        """'azami_yas_gun' gündür ne yazılan ne de yüklenen kimlikleri (eski kayıt biçimleri dahil) siler."""
+        sinir = time.time() - self.azami_yas_gun * 86400
+        for anahtar in self._kimlikler(tur):
+            kimlik_dizini = self._kimlik_dizini(tur, anahtar)
+            zamanlar = [os.path.getmtime(os.path.join(d, 'bilgi.json')) for d, _ in self._surumler(tur, anahtar)]
+            if max(zamanlar, default=os.path.getmtime(kimlik_dizini)) < sinir:
+                self._dizini_sil(kimlik_dizini)
+
+    @staticmethod
+    def _dizini_sil(dizin):
+        # Önce bilgi dosyası silinir ki yarım kalan silme geçersiz kayıt bıraksın.
+        try:
+            os.remove(os.path.join(dizin, 'bilgi.json'))
+        except OSError:
+            pass
+        shutil.rmtree(dizin, ignore_errors=True)
+
+    @staticmethod
+    def _json_yaz(yol, bilgi):
+        with open(yol, 'w', encoding='utf-8') as f:
+            json.dump(bilgi, f, ensure_ascii=False, indent=2, default=str)
+
+    @staticmethod
+    def _atomik_yaz(yol, yazici):
+        gecici_yol = f"{yol}.{os.getpid()}.tmp"
+        try:
+            yazici(gecici_yol)
+            os.replace(gecici_yol, yol)
+        finally:
+            try:
+                os.remove(gecici_yol)
+            except OSError:
+                pass
+
+@functools.lru_cache(maxsize=None)
+def model_kaydi(dizin=MODEL_KAYIT_DIZINI):
+    """Süreç başına tek bir kayıt nesnesi; analiz fonksiyonları modellerini buradan alır."""
+    return ModelKaydi(dizin)
+
+def egit_veya_yukle(tur, egitim_verisi, hiperparametreler, egitici):
+    """
+    Varsayılan kayıt üzerinden model_kaydi().egit_veya_yukle kısayolu. 'egitim_verisi' tek
+    bir tablo veya tablo demetidir; parmak izi bundan hesaplanır.
+    """
+    if not isinstance(egitim_verisi, tuple):
+        egitim_verisi = (egitim_verisi,)
+    return model_kaydi().egit_veya_yukle(tur, veri_izi(*egitim_verisi), hiperparametreler, egitici)
@@ -4,29 +4,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           kmeans_kumeleme_yap, hiyerarsik_kumeleme_yap, 
+from analysis_engine import (kmeans_kumeleme_yap, hiyerarsik_kumeleme_yap, 
                            pca_ile_boyut_indirge, en_iyi_kume_sayisini_bul,
                            dinamik_kume_etiketle) # Eski fonksiyonu silip yenisini import ediyoruz
+from shared_data import veri_setini_getir
 
 st.set_page_config(page_title="Segmentasyon Laboratuvarı", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    sonuclar_df = clv_df.copy()
-    if 'MusteriAdi' not in sonuclar_df.columns:
-        sonuclar_df['MusteriAdi'] = sonuclar_df.index
-    return sonuclar_df
-
-sonuclar_df = veriyi_getir_ve_isle()
+sonuclar_df = veri_setini_getir().sonuclar_df
+
 
 st.title("🔬 Segmentasyon Laboratuvarı")
 st.markdown("Farklı kümeleme algoritmalarını, parametreleri ve özellikleri deneyerek veri setiniz için en anlamlı segment yapısını bulun.")
@@ -7,27 +7,14 @@ from sklearn.preprocessing import MinMaxScaler
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 # Gerekli fonksiyonları merkezi modüllerden import edelim
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           donemsel_analiz_yap, benchmark_profili_hesapla, deger_gocu_analizi_yap)
+from analysis_engine import (donemsel_analiz_yap, benchmark_profili_hesapla, deger_gocu_analizi_yap)
+from shared_data import veri_setini_getir, donem_verisini_getir, analiz_sonucu
 
 st.set_page_config(page_title="Karşılaştırma Araçları", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    sonuclar_df = clv_df.copy()
-    if 'MusteriAdi' not in sonuclar_df.columns:
-        sonuclar_df['MusteriAdi'] = sonuclar_df.index
-    return temiz_df, sonuclar_df
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
 
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
 st.title("📊 Karşılaştırma Araçları")
 st.markdown("Bu modül, müşterileri, segmentleri ve farklı zaman periyotlarını çeşitli metrikler üzerinden birbirleriyle ve benchmark profilleriyle karşılaştırmanızı sağlar.")
@@ -209,8 +196,11 @@ with tab3:
         
     if st.button("Dönemleri Karşılaştır", type="primary"):
         with st.spinner("İki dönem için metrikler hesaplanıyor..."):
-            donemsel_sonuclar = donemsel_analiz_yap(temiz_df, baslangic1, bitis1, baslangic2, bitis2)
-            deger_gocu_verisi = deger_gocu_analizi_yap(temiz_df, sonuclar_df, baslangic1, bitis1, baslangic2, bitis2)
+            donem_df = donem_verisini_getir((baslangic1, bitis1), (baslangic2, bitis2))
+            # Yeni müşteri tespiti için ilk alım tarihleri tüm geçmişten alınır.
+            donemsel_sonuclar = donemsel_analiz_yap(donem_df, baslangic1, bitis1, baslangic2, bitis2,
+                                                    ozellikler=analiz_sonucu('musteri_ozellikleri'))
+            deger_gocu_verisi = deger_gocu_analizi_yap(donem_df, sonuclar_df.copy(), baslangic1, bitis1, baslangic2, bitis2)
         
         st.session_state.donemsel_sonuclar = donemsel_sonuclar
         st.session_state.deger_gocu_verisi = deger_gocu_verisi
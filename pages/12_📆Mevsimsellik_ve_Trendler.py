@@ -6,25 +6,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from data_handler import veriyi_yukle_ve_temizle, genel_satis_trendi_hazirla
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           zaman_serisi_ayristirma_yap, gelecek_tahmini_yap, trend_analizi_yap,
+from data_handler import genel_satis_trendi_hazirla
+from analysis_engine import (zaman_serisi_ayristirma_yap, gelecek_tahmini_yap, trend_analizi_yap,
                            mevsimsellik_analizi_yap)
+from shared_data import veri_setini_getir
 
 st.set_page_config(page_title="Mevsimsellik ve Trend Analizi", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    return temiz_df, clv_df
-
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
 
 
 st.title("📈 Mevsimsellik ve Trend Analizi")
@@ -5,29 +5,18 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import networkx as nx
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           kategori_migrasyon_analizi_yap, kategori_performans_analizi_yap, 
+from analysis_engine import (kategori_performans_analizi_yap, 
                            kategori_kannibalizasyon_analizi, otomatik_kannibalizasyon_bul,
                            kategori_yasam_dongusu_analizi_yap, kategori_musteri_profili_analizi_yap,
                            kategori_sepet_birlikteligi_yap,
                            sonraki_kategori_onerisi)
+from shared_data import veri_setini_getir, analiz_sonucu
 
 st.set_page_config(page_title="Çapraz Kategori Analizi", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    sonuclar_df = clv_df 
-    return temiz_df, sonuclar_df
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
 
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
 st.title("🔀 Çapraz Kategori Analizi")
 st.markdown("Bu sayfa, müşterilerinizin ürün kategorileri arasındaki satın alma yolculuğunu ve kategorilerin kendi performanslarını analiz eder.")
@@ -51,7 +40,7 @@ with tab1:
     else:
         with st.spinner("Kategori performansları hesaplanıyor..."):
             # Analizi doğrudan bu sayfada yapabiliriz, çünkü analysis_engine'e taşımaya gerek yok
-            performans_df = temiz_df.groupby('Kategori').agg(
+            performans_df = temiz_df.groupby('Kategori', observed=True).agg(
                 Toplam_Ciro=('ToplamTutar', 'sum'),
                 Toplam_Net_Kar=('NetKar', 'sum'),
                 Benzersiz_Musteri_Sayisi=('MusteriID', 'nunique'),
@@ -59,7 +48,7 @@ with tab1:
             ).reset_index()
             performans_df['Kar_Marji'] = (performans_df['Toplam_Net_Kar'] / performans_df['Toplam_Ciro']) * 100
             performans_df['Musteri_Basina_Ciro'] = performans_df['Toplam_Ciro'] / performans_df['Benzersiz_Musteri_Sayisi']
-            performans_df.fillna(0, inplace=True)
+            performans_df.fillna({'Kar_Marji': 0, 'Musteri_Basina_Ciro': 0}, inplace=True)
             performans_df = performans_df.sort_values('Toplam_Ciro', ascending=False)
         
         if performans_df.empty:
@@ -80,7 +69,7 @@ with tab2:
     else:
         if st.button("Migrasyon Analizini Çalıştır", type="primary"):
             with st.spinner("Kategori geçişleri analiz ediliyor..."):
-                migrasyon_matrisi = kategori_migrasyon_analizi_yap(temiz_df)
+                migrasyon_matrisi = analiz_sonucu('kategori_migrasyonu')
             
             st.success("Analiz tamamlandı!")
             
@@ -319,12 +308,7 @@ with tab7:
     st.markdown("Müşterilerin ilk alışveriş verilerine dayanarak, onlara tanıtılması en mantıklı olan **ikinci kategoriyi** keşfedin.")
     st.info("Bu araç, `Kategori Migrasyon Analizi` verilerini kullanarak, bir başlangıç kategorisinden diğerlerine olan doğal müşteri akışını analiz eder.")
 
-    # Migrasyon matrisini bu sekmeye özel olarak, cache'leyerek hesapla
-    @st.cache_data
-    def migrasyon_getir(_df):
-        return kategori_migrasyon_analizi_yap(_df)
-
-    migrasyon_matrisi = migrasyon_getir(temiz_df)
+    migrasyon_matrisi = analiz_sonucu('kategori_migrasyonu')
     
     if migrasyon_matrisi.empty:
         st.warning("Öneri üretmek için yeterli kategori geçiş verisi bulunamadı.")
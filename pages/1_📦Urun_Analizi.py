@@ -7,33 +7,19 @@ import plotly.express as px
 import networkx as nx # Yeni eklenen kütüphane
 
 # Gerekli fonksiyonları merkezi modüllerden import edelim
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           market_basket_analizi_yap, 
-                           urun_performans_analizi_yap,
+from analysis_engine import (urun_performans_analizi_yap,
                            urun_icin_segment_profili, segment_icin_urun_profili, sayfa_raporu_olustur)
+from shared_data import veri_setini_getir, donem_verisini_getir, analiz_sonucu
 
 st.set_page_config(page_title="Ürün Analizi", layout="wide")
 
-# Her sayfanın kendi veri getirme fonksiyonunu tanımlaması en sağlam yöntemdir.
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json'
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    
-    return temiz_df, clv_df
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
 
 # --- ANA SAYFA ---
 st.title("📈 Ürün Analizi")
 st.markdown("Bu modül, ürünlerinizin bireysel performanslarını, sepet birlikteliklerini ve müşteri segmentleriyle olan ilişkilerini analiz eder.")
 
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
 tab1, tab2, tab3 = st.tabs(["Ürün Performans Panosu", "Pazar Sepeti Analizi (Birliktelik)", "Ürün-Segment Profili"])
 
@@ -57,7 +43,8 @@ with tab1:
     st.markdown("---")
 
     with st.spinner(f"{secilen_baslangic_tarihi} ve {secilen_bitis_tarihi} arası için ürün performansları hesaplanıyor..."):
-        performans_df = urun_performans_analizi_yap(temiz_df, secilen_baslangic_tarihi, secilen_bitis_tarihi)
+        donem_df = donem_verisini_getir((secilen_baslangic_tarihi, secilen_bitis_tarihi))
+        performans_df = urun_performans_analizi_yap(donem_df, secilen_baslangic_tarihi, secilen_bitis_tarihi)
     
     if performans_df.empty:
         st.warning("Seçilen dönem için performans analizi yapılacak yeterli ürün verisi bulunamadı.")
@@ -167,7 +154,7 @@ with tab2:
 
     if st.button("Birliktelik Analizini Çalıştır", type="primary"):
         with st.spinner('Birliktelik kuralları hesaplanıyor...'):
-            kurallar_df = market_basket_analizi_yap(temiz_df, min_support=min_support_degeri, max_urun_sayisi=max_urun_sayisi)
+            kurallar_df = analiz_sonucu('market_basket', min_support=min_support_degeri, max_urun_sayisi=max_urun_sayisi)
         st.session_state['birliktelik_kurallari'] = kurallar_df
 
     if 'birliktelik_kurallari' in st.session_state:
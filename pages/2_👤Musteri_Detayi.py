@@ -3,30 +3,17 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from data_handler import veriyi_yukle_ve_temizle, musteri_zaman_serisi_hazirla
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla, 
-                           market_basket_analizi_yap, satis_tahmini_yap, 
-                           tahmin_grafigini_ciz, urun_tavsiyesi_uret,
-                           pdf_raporu_olustur, musteri_yolculugu_analizi_yap) 
+from analysis_engine import tahmin_grafigini_ciz, urun_tavsiyesi_uret, pdf_raporu_olustur
+from data_handler import musteri_dilimi
+from feature_store import PENCERELER
+from shared_data import veri_setini_getir, analiz_sonucu, analiz_sonuclari, clv_ufku_etiketi
 
 st.set_page_config(page_title="Müşteri Detayı", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    
-    birliktelik_kurallari = market_basket_analizi_yap(temiz_df)
-    yolculuk_pivot, _, _, _ = musteri_yolculugu_analizi_yap(temiz_df, clv_df)
-    
-    return temiz_df, clv_df, birliktelik_kurallari, yolculuk_pivot
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
+birliktelik_kurallari, yolculuk_pivot = analiz_sonuclari('market_basket', 'musteri_yolculugu')
 
-temiz_df, sonuclar_df, birliktelik_kurallari, yolculuk_pivot = veriyi_getir_ve_isle()
 
 st.title("👤 Müşteri Detay Analizi ve Satış Tahmini")
 
@@ -34,21 +21,28 @@ musteri_listesi = sonuclar_df.index.tolist()
 secilen_musteri = st.selectbox("Analiz Yapmak İçin Müşteri Seçin", musteri_listesi)
 
 if secilen_musteri:
-    if secilen_musteri in st.session_state.get('profil_anomalileri', []):
+    if secilen_musteri in veri.profil_anomalileri:
         st.warning(f"**Profil Anomalisi:** Bu müşteri, genel müşteri profillerine göre aykırı bir RFM skoruna sahiptir.")
-    if secilen_musteri in st.session_state.get('davranissal_anomaliler', []):
+    if secilen_musteri in veri.davranissal_anomaliler:
         st.error(f"**Davranışsal Anomali Uyarısı:** Bu müşteri, kendi normal satın alma ritmini bozmuştur. Churn riski artmış olabilir!")    
     
     st.markdown("---")
     
     musteri_verisi = sonuclar_df.loc[secilen_musteri]
-    musteri_satis_verisi = temiz_df[temiz_df['MusteriID'] == secilen_musteri]
+    # Temiz tablo müşteri sıralıdır; müşterinin geçmişi tablo taranmadan dilim olarak alınır.
+    musteri_satis_verisi = musteri_dilimi(temiz_df, analiz_sonucu('musteri_ofsetleri'), secilen_musteri)
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Segment", musteri_verisi['Segment'])
     col2.metric("Performans Skoru (MPS)", f"{musteri_verisi['MPS']:.0f}")
     col3.metric("Churn Olasılığı", f"%{musteri_verisi['Churn_Olasiligi']*100:.1f}")
     col4.metric("Yaşam Boyu Değeri (CLV)", f"{musteri_verisi['CLV_Net_Kar']:,.0f} €")
+    if pd.notna(musteri_verisi.get('CLV_Olasiliksal')):
+        col5, col6, col7 = st.columns(3)
+        ufuk = clv_ufku_etiketi()
+        col5.metric(f"Olasılıksal CLV ({ufuk})", f"{musteri_verisi['CLV_Olasiliksal']:,.0f} €")
+        col6.metric(f"Beklenen Alım Sayısı ({ufuk})", f"{musteri_verisi['Beklenen_Alim_Sayisi']:.1f}")
+        col7.metric("Aktif Olma Olasılığı", f"%{musteri_verisi['Aktif_Olasiligi']*100:.1f}")
     st.markdown("---")
 
     st.subheader("📋 Geçmiş Davranış Özeti")
@@ -77,6 +71,24 @@ if secilen_musteri:
         )
     st.markdown("---")
 
+    st.subheader("🕒 Son Dönem Aktivitesi")
+    musteri_ozellikleri = analiz_sonucu('musteri_ozellikleri')
+    segment_ozellikleri = musteri_ozellikleri.loc[musteri_ozellikleri.index.isin(sonuclar_df.index[sonuclar_df['Segment'] == musteri_verisi['Segment']])]
+    pencere_ozeti = pd.DataFrame([
+        {
+            'Dönem': f"Son {pencere} gün",
+            'Harcama (€)': musteri_ozellikleri.at[secilen_musteri, f'Harcama_{pencere}G'],
+            'İşlem Sayısı': musteri_ozellikleri.at[secilen_musteri, f'Islem_{pencere}G'],
+            'Ürün Çeşidi': musteri_ozellikleri.at[secilen_musteri, f'UrunCesidi_{pencere}G'],
+            'Segment Ort. Harcama (€)': segment_ozellikleri[f'Harcama_{pencere}G'].mean()
+        }
+        for pencere in PENCERELER
+    ]).set_index('Dönem')
+    st.dataframe(pencere_ozeti.style.format({
+        'Harcama (€)': '{:,.2f}', 'Segment Ort. Harcama (€)': '{:,.2f}'
+    }), use_container_width=True)
+    st.markdown("---")
+
     st.subheader("📊 Müşterinin Kendi Segmentine Göre Konumu")
     musteri_segmenti = musteri_verisi['Segment']
     segment_verisi = sonuclar_df[sonuclar_df['Segment'] == musteri_segmenti]
@@ -115,9 +127,9 @@ if secilen_musteri:
     st.markdown("---")
     st.subheader(f"📈 {secilen_musteri} için Satış Tahmini (Gelecek 6 Ay)")
     fig_tahmin = None
-    musteri_ts = musteri_zaman_serisi_hazirla(temiz_df, secilen_musteri)
-    if len(musteri_ts) >= 12:
-        model, tahmin = satis_tahmini_yap(musteri_ts, ay_sayisi=6)
+    musteri_tahmini = analiz_sonucu('musteri_tahmini', musteri_id=secilen_musteri, ay_sayisi=6)
+    if musteri_tahmini is not None:
+        model, tahmin = musteri_tahmini
         fig_tahmin = tahmin_grafigini_ciz(model, tahmin, musteri_id=secilen_musteri, return_fig=True)
         st.pyplot(fig_tahmin)
     else:
@@ -126,7 +138,7 @@ if secilen_musteri:
     st.markdown("---")
     st.subheader(f"🎁 {secilen_musteri} için Ürün Önerileri (Next Best Offer)")
     
-    musteri_urunleri = temiz_df[temiz_df['MusteriID'] == secilen_musteri]['UrunKodu'].unique()
+    musteri_urunleri = musteri_satis_verisi['UrunKodu'].unique()
     tavsiyeler_df = urun_tavsiyesi_uret(birliktelik_kurallari, musteri_urunleri)
     
     if tavsiyeler_df.empty:
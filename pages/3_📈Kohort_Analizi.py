@@ -3,20 +3,15 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd 
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import kohort_analizi_yap
+from shared_data import temiz_veriyi_getir, analiz_sonucu
 
 st.set_page_config(page_title="Kohort Analizi", layout="wide")
 
-@st.cache_data
-def veriyi_getir():
-    dosya_adi = 'satis_verileri_guncellenmis.json'
-    return veriyi_yukle_ve_temizle(dosya_adi)
+temiz_df = temiz_veriyi_getir()
 
 st.title("📈 Kohort Analizi")
 st.markdown("Bu analiz, müşterilerinizi başlangıç tarihlerine (kohortlarına) göre gruplar ve zaman içindeki davranışlarını farklı metriklere göre gösterir.")
 
-temiz_df = veriyi_getir()
 
 st.markdown("---")
 st.subheader("Analiz Parametreleri")
@@ -40,7 +35,7 @@ with col2:
 st.markdown("---")
 
 with st.spinner(f"'{secilen_metrik_adi}' için kohort analizi yapılıyor..."):
-    heatmap_matrix = kohort_analizi_yap(temiz_df, metric=secilen_metrik_kodu, period=secilen_periyot_kodu)
+    heatmap_matrix = analiz_sonucu('kohort', metric=secilen_metrik_kodu, period=secilen_periyot_kodu)
 
 st.success("Analiz tamamlandı!")
 
@@ -4,32 +4,20 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import musteri_yolculugu_analizi_yap, rfm_skorlarini_hesapla, musterileri_segmentle, clv_hesapla, churn_tahmin_modeli_olustur
+from analysis_engine import segment_gecislerini_hesapla
+from shared_data import analiz_sonucu
 
 st.set_page_config(page_title="Müşteri Yolculuğu", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    return temiz_df, clv_df
-
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
 st.title("🗺️ Müşteri Yaşam Döngüsü Analizi")
 st.markdown("""
 Bu sayfa, müşterilerinizin **kazanım, segmentler arası geçiş ve kayıp (churn)** süreçlerini içeren tam yaşam döngüsünü görselleştirir.
 """)
 
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
-with st.spinner('Müşteri yolculukları hesaplanıyor... Bu işlem birkaç dakika sürebilir.'):
-    yolculuk_pivot, _, _, _ = musteri_yolculugu_analizi_yap(temiz_df, sonuclar_df)
+with st.spinner('Müşteri yolculukları hesaplanıyor...'):
+    yolculuk_pivot = analiz_sonucu('musteri_yolculugu')
 
 st.success("Analiz tamamlandı!")
 
@@ -56,37 +44,18 @@ else:
 
     if secilen_onceki_donem and secilen_son_donem and secilen_onceki_donem != secilen_son_donem:
         
-        df_donemler = yolculuk_pivot[[secilen_onceki_donem, secilen_son_donem, 'CLV_Net_Kar']].copy()
-        
-        mevcut_musteriler = df_donemler.dropna(subset=[secilen_onceki_donem, secilen_son_donem]).copy()
-        mevcut_musteriler.rename(columns={secilen_onceki_donem: 'Onceki_Segment', secilen_son_donem: 'Simdiki_Segment'}, inplace=True)
-
-        yeni_musteriler = df_donemler[df_donemler[secilen_onceki_donem].isna() & df_donemler[secilen_son_donem].notna()].copy()
-        yeni_musteriler['Onceki_Segment'] = 'Yeni Müşteri'
-        yeni_musteriler.rename(columns={secilen_son_donem: 'Simdiki_Segment'}, inplace=True)
-
-        kayip_musteriler = df_donemler[df_donemler[secilen_onceki_donem].notna() & df_donemler[secilen_son_donem].isna()].copy()
-        kayip_musteriler['Simdiki_Segment'] = 'Pasif / Churn'
-        kayip_musteriler.rename(columns={secilen_onceki_donem: 'Onceki_Segment'}, inplace=True)
-        
-        gecis_df_tam = pd.concat([
-            mevcut_musteriler[['Onceki_Segment', 'Simdiki_Segment', 'CLV_Net_Kar']],
-            yeni_musteriler[['Onceki_Segment', 'Simdiki_Segment', 'CLV_Net_Kar']],
-            kayip_musteriler[['Onceki_Segment', 'Simdiki_Segment', 'CLV_Net_Kar']]
-        ])
-        
         onceki_donem_str = str(secilen_onceki_donem)
         son_donem_str = str(secilen_son_donem)
         
         st.header(f"Yaşam Döngüsü Akışı ({onceki_donem_str} -> {son_donem_str})")
         
         if analiz_tipi == "Müşteri Sayısı":
-            gecis_df_sankey = gecis_df_tam.groupby(['Onceki_Segment', 'Simdiki_Segment']).size().reset_index(name='deger')
+            gecis_df_sankey = segment_gecislerini_hesapla(yolculuk_pivot, secilen_onceki_donem, secilen_son_donem)
             deger_formati_metin = "müşteri"
             deger_formati_gorsel = ".0f"
             title_text = f"{onceki_donem_str} ile {son_donem_str} Arası Müşteri Sayısı Akışı"
         else:
-            gecis_df_sankey = gecis_df_tam.groupby(['Onceki_Segment', 'Simdiki_Segment'])['CLV_Net_Kar'].sum().reset_index(name='deger')
+            gecis_df_sankey = segment_gecislerini_hesapla(yolculuk_pivot, secilen_onceki_donem, secilen_son_donem, clv_agirlikli=True)
             deger_formati_metin = "€ CLV"
             deger_formati_gorsel = ",.0f €"
             title_text = f"{onceki_donem_str} ile {son_donem_str} Arası Toplam CLV Akışı (€)"
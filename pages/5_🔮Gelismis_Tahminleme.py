@@ -4,20 +4,17 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-from data_handler import veriyi_yukle_ve_temizle, genel_satis_trendi_hazirla
-from analysis_engine import prophet_tahmin, arima_tahmin, sarima_tahmin, random_forest_tahmin, ensemble_tahmin, what_if_analizi
+from data_handler import genel_satis_trendi_hazirla
+from analysis_engine import prophet_tahmin, ensemble_tahmin, what_if_analizi
+from shared_data import temiz_veriyi_getir, analiz_sonucu
 
 st.set_page_config(page_title="Gelişmiş Tahminleme", layout="wide")
 
-@st.cache_data
-def veriyi_getir():
-    dosya_adi = 'satis_verileri_guncellenmis.json'
-    return veriyi_yukle_ve_temizle(dosya_adi)
+temiz_df = temiz_veriyi_getir()
 
 st.title("🔮 Gelişmiş Tahminleme ve Senaryolar")
 st.markdown("Bu sayfada farklı tahminleme modelleri kullanarak genel satış projeksiyonları yapabilir ve çeşitli iş senaryolarının potansiyel etkilerini test edebilirsiniz.")
 
-temiz_df = veriyi_getir()
 
 aylik_satislar = genel_satis_trendi_hazirla(temiz_df)
 
@@ -38,14 +35,14 @@ with tab1:
                 train_size = len(aylik_satislar) - 6
                 train, test = aylik_satislar[:train_size], aylik_satislar[train_size:]
                 
-                _, forecast_p = prophet_tahmin(train.copy(), 6)
+                forecast_p = analiz_sonucu('satis_tahmini', model='Prophet', tahmin_periyodu=6, test_ay_sayisi=6)
                 metrikler['Prophet'] = np.sqrt(mean_squared_error(test['y'], forecast_p['yhat'].tail(6)))
-                _, forecast_a, _ = arima_tahmin(train.copy(), 6)
+                forecast_a = analiz_sonucu('satis_tahmini', model='ARIMA', tahmin_periyodu=6, test_ay_sayisi=6)
                 metrikler['ARIMA'] = np.sqrt(mean_squared_error(test['y'], forecast_a['tahmin']))
-                _, forecast_s = sarima_tahmin(train.copy(), 6)
+                forecast_s = analiz_sonucu('satis_tahmini', model='SARIMA', tahmin_periyodu=6, test_ay_sayisi=6)
                 if forecast_s is not None:
                     metrikler['SARIMA'] = np.sqrt(mean_squared_error(test['y'], forecast_s['tahmin']))
-                _, forecast_rf = random_forest_tahmin(train.copy(), 6)
+                forecast_rf = analiz_sonucu('satis_tahmini', model='Random Forest', tahmin_periyodu=6, test_ay_sayisi=6)
                 if forecast_rf is not None:
                     metrikler['Random Forest'] = np.sqrt(mean_squared_error(test['y'], forecast_rf['tahmin']))
                 
@@ -53,14 +50,7 @@ with tab1:
                 st.session_state.en_iyi_model = en_iyi_model_adi
                 st.session_state.metrikler = metrikler
 
-                if en_iyi_model_adi == 'Prophet':
-                    _, forecast = prophet_tahmin(aylik_satislar.copy(), tahmin_periyodu_oto)
-                elif en_iyi_model_adi == 'ARIMA':
-                    _, forecast, _ = arima_tahmin(aylik_satislar.copy(), tahmin_periyodu_oto)
-                elif en_iyi_model_adi == 'SARIMA':
-                    _, forecast = sarima_tahmin(aylik_satislar.copy(), tahmin_periyodu_oto)
-                elif en_iyi_model_adi == 'Random Forest':
-                    _, forecast = random_forest_tahmin(aylik_satislar.copy(), tahmin_periyodu_oto)
+                forecast = analiz_sonucu('satis_tahmini', model=en_iyi_model_adi, tahmin_periyodu=tahmin_periyodu_oto)
                 
                 st.session_state.oto_tahmin_sonucu = forecast
                     
@@ -108,18 +98,11 @@ with tab1:
         if st.button("Seçili Modelleri Karşılaştır", key="model_calistir_manual"):
             with st.spinner("Seçili modeller eğitiliyor..."):
                 sonuclar = {}
-                if use_prophet:
-                    _, forecast = prophet_tahmin(aylik_satislar.copy(), tahmin_periyodu_manual)
-                    sonuclar['Prophet'] = forecast
-                if use_arima:
-                    _, forecast, _ = arima_tahmin(aylik_satislar.copy(), tahmin_periyodu_manual)
-                    sonuclar['ARIMA'] = forecast
-                if use_sarima:
-                    _, forecast = sarima_tahmin(aylik_satislar.copy(), tahmin_periyodu_manual)
-                    if forecast is not None: sonuclar['SARIMA'] = forecast
-                if use_rf:
-                    _, forecast = random_forest_tahmin(aylik_satislar.copy(), tahmin_periyodu_manual)
-                    if forecast is not None: sonuclar['Random Forest'] = forecast
+                secili_modeller = {'Prophet': use_prophet, 'ARIMA': use_arima, 'SARIMA': use_sarima, 'Random Forest': use_rf}
+                for model_adi, secili in secili_modeller.items():
+                    if secili:
+                        forecast = analiz_sonucu('satis_tahmini', model=model_adi, tahmin_periyodu=tahmin_periyodu_manual)
+                        if forecast is not None: sonuclar[model_adi] = forecast
                 st.session_state['tahmin_sonuclari_manual'] = sonuclar
 
         if 'tahmin_sonuclari_manual' in st.session_state:
@@ -196,7 +179,7 @@ with tab3:
     if st.button("Senaryoyu Simüle Et", type="primary", use_container_width=True):
         with st.spinner("Senaryo analizi yapılıyor..."):
             # 1. Baseline Tahmin (varsayımlar olmadan, sadece geçmiş ortalamalarla)
-            _, baseline_tahmin = prophet_tahmin(aylik_satislar.copy(), senaryo_periyodu, gelecek_regresorler=None)
+            baseline_tahmin = analiz_sonucu('satis_tahmini', model='Prophet', tahmin_periyodu=senaryo_periyodu)
 
             # 2. Senaryo Tahmini (kullanıcı girdileriyle)
             senaryo_varsayimlari = {
@@ -5,27 +5,23 @@ import pandas as pd
 import shap
 import matplotlib.pyplot as plt
 
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           bireysel_churn_etkenlerini_hesapla)
+from shared_data import veri_setini_getir, churn_modelini_getir, analiz_sonucu
+from analysis_engine import bireysel_churn_etkenlerini_hesapla, churn_modeli_adi
 
 st.set_page_config(page_title="Churn Neden Analizi", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, model, explainer, X, X_train, dogruluk = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    return clv_df, model, explainer, X, X_train
-sonuclar_df, model, explainer, X, X_train = veriyi_getir_ve_isle()
+sonuclar_df = veri_setini_getir().sonuclar_df
+model, _, X, X_train, _ = churn_modelini_getir()
+# Tüm müşterilerin SHAP değerleri model başına bir kez hesaplanıp depolanır; segment ve
+# müşteri seçimleri deponun satırlarını okur.
+shap_deposu = analiz_sonucu('shap_degerleri')
 
-st.title("🔍 Churn Neden Analizi (Random Forest + SHAP)")
-st.markdown("""
-Bu sayfa, müşterilerin neden churn ettiğini (kaybedildiğini) anlamak için daha gelişmiş bir makine öğrenmesi modelinin (`Random Forest`) içine **SHAP** kütüphanesi ile bakar. 
+
+# Model seçimi açıksa churn modeli Random Forest dışında bir aday da olabilir; ad modelden alınır.
+model_adi = churn_modeli_adi(model) if model is not None else 'makine öğrenmesi'
+st.title(f"🔍 Churn Neden Analizi ({model_adi} + SHAP)")
+st.markdown(f"""
+Bu sayfa, müşterilerin neden churn ettiğini (kaybedildiğini) anlamak için daha gelişmiş bir makine öğrenmesi modelinin (`{model_adi}`) içine **SHAP** kütüphanesi ile bakar. 
 Bu yöntem, özelliklerin birbirleriyle olan karmaşık etkileşimlerini de dikkate alarak daha doğru ve güvenilir sonuçlar üretir.
 """)
 
@@ -55,12 +51,10 @@ else:
     if X_train_filtrelenmis.empty:
         st.warning(f"'{secilen_segment}' segmenti için eğitim verisinde yeterli örnek bulunamadı.")
     else:
-        with st.spinner(f"'{secilen_segment}' segmenti için genel SHAP değerleri hesaplanıyor..."):
-            if explainer:
-                explanation = explainer(X_train_filtrelenmis)
-                shap_values_for_churn = explanation[:,:,1]
-            else:
-                shap_values_for_churn = None
+        if shap_deposu is not None:
+            shap_values_for_churn = shap_deposu.aciklama(X_train_filtrelenmis.index)
+        else:
+            shap_values_for_churn = None
 
         if shap_values_for_churn is None:
             st.warning("SHAP değerleri hesaplanamadı.")
@@ -88,16 +82,13 @@ else:
         secilen_musteri = st.selectbox("Analiz edilecek yüksek riskli bir müşteri seçin:", riskli_musteriler_listesi)
 
         if secilen_musteri:
-            musteri_verisi_X = X.loc[[secilen_musteri]]
-            
-            with st.spinner(f"'{secilen_musteri}' için SHAP dökümü hesaplanıyor..."):
-                explanation_bireysel = bireysel_churn_etkenlerini_hesapla(explainer, musteri_verisi_X)
+            explanation_bireysel = bireysel_churn_etkenlerini_hesapla(shap_deposu, secilen_musteri)
 
             st.subheader(f"'{secilen_musteri}' için Risk Dökümü (SHAP Waterfall)")
             
             if explanation_bireysel is not None:
                 fig_waterfall, ax_waterfall = plt.subplots()
-                shap.plots.waterfall(explanation_bireysel[0, :, 1], show=False)
+                shap.plots.waterfall(explanation_bireysel, show=False)
                 plt.tight_layout()
                 st.pyplot(fig_waterfall)
             
@@ -113,7 +104,7 @@ else:
                 st.subheader("💡 Aksiyon Önerisi")
 
                 # Müşterinin churn skorunu en çok artıran faktörü bul
-                shap_values = explanation_bireysel[0, :, 1].values
+                shap_values = explanation_bireysel.values
                 feature_names = explanation_bireysel.feature_names
                 
                 # Sadece pozitif (churn'ü artıran) SHAP değerlerini dikkate al
@@ -134,3 +125,9 @@ else:
                     elif en_buyuk_risk_faktoru == 'Monetary':
                         st.warning(f"**En Büyük Risk Faktörü: Monetary (Harcama Tutarı)**")
                         st.info(f"**Öneri:** Müşterinin ortalama harcama tutarı düşük. Değerini artırmak için **üst satış (up-sell)** veya **tamamlayıcı ürünlerle çapraz satış (cross-sell)** fırsatları sunabilirsiniz.")
+                    elif en_buyuk_risk_faktoru.endswith('G') and '_' in en_buyuk_risk_faktoru:
+                        # Pencereli özellikler: Harcama_90G, Islem_30G, UrunCesidi_180G ...
+                        ozellik_turu, pencere = en_buyuk_risk_faktoru.rsplit('_', 1)
+                        ozellik_adlari = {'Harcama': 'Harcama', 'Islem': 'İşlem Sayısı', 'UrunCesidi': 'Ürün Çeşitliliği'}
+                        st.warning(f"**En Büyük Risk Faktörü: Son {pencere[:-1]} Gündeki {ozellik_adlari.get(ozellik_turu, ozellik_turu)}**")
+                        st.info(f"**Öneri:** Müşterinin son dönemdeki aktivitesi geçmişine göre zayıflamış. Son aldığı ürünlerle ilgili **hatırlatma kampanyası** veya **süreli bir teklif** ile ilgisini yeniden canlandırmayı deneyebilirsiniz.")
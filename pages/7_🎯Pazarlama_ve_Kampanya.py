@@ -5,25 +5,16 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, churn_tahmin_modeli_olustur, 
-                           clv_hesapla, kampanya_onerileri_uret, kampanya_roi_simulasyonu_yap,
+from analysis_engine import (kampanya_onerileri_uret, kampanya_roi_simulasyonu_yap,
                            optimal_indirim_hesapla,
                            roi_simulasyon_raporu_pdf_olustur, optimal_indirim_raporu_pdf_olustur)
+from shared_data import veri_setini_getir
 
 st.set_page_config(page_title="Pazarlama Modülü", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    return temiz_df, clv_df
-
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
+
 
 st.title("🎯 Pazarlama ve Kampanya Modülü")
 
@@ -2,27 +2,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, clv_hesapla,
-                           anomali_tespiti_yap, anomali_tespiti_dbscan, 
-                           davranissal_anomali_tespiti_yap, anomali_gruplama_yap, 
+from analysis_engine import (anomali_tespiti_dbscan, anomali_gruplama_yap, 
                            islem_bazli_anomali_tespiti_yap, 
                            anomali_nedenlerini_acikla)
+from shared_data import veri_setini_getir, analiz_sonucu
 
 st.set_page_config(page_title="Anomali Tespiti", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    return temiz_df, clv_df
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
 
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
 st.title("⚠️ Anomali (Aykırı Değer) Tespiti")
 
@@ -44,7 +33,7 @@ with tab1:
         kontaminasyon = st.slider("Tahmini Anomali Oranı (%)", 1, 20, 5, 1, help="Veri setinizde ne kadar oranda (% olarak) anomali beklediğinizi belirtir.", key="slider_profil_iso") / 100.0
         if st.button("Isolation Forest ile Anomalileri Tespit Et", type="primary"):
             with st.spinner("Anomali tespiti yapılıyor..."):
-                anomali_sonuclari_df = anomali_tespiti_yap(sonuclar_df.copy(), kontaminasyon_orani=kontaminasyon)
+                anomali_sonuclari_df = analiz_sonucu('profil_anomalileri', kontaminasyon_orani=kontaminasyon)
                 st.session_state.anomali_sonuclari_df = anomali_sonuclari_df
     
     # DBSCAN algoritması seçildiğinde...
@@ -139,7 +128,7 @@ with tab2:
 
     if st.button("Davranışsal Anomalileri Tespit Et", type="primary"):
         with st.spinner("Müşterilerin alışkanlıkları analiz ediliyor..."):
-            davranissal_anomaliler_df = davranissal_anomali_tespiti_yap(temiz_df, hassasiyet=hassasiyet)
+            davranissal_anomaliler_df = analiz_sonucu('davranissal_anomaliler', hassasiyet=hassasiyet)
             st.session_state.davranissal_anomaliler_df = davranissal_anomaliler_df
             
     if 'davranissal_anomaliler_df' in st.session_state:
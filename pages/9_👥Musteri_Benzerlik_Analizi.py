@@ -4,29 +4,16 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from sklearn.preprocessing import MinMaxScaler
-from data_handler import veriyi_yukle_ve_temizle
-from analysis_engine import (rfm_skorlarini_hesapla, 
-                           musterileri_segmentle, 
-                           churn_tahmin_modeli_olustur, 
-                           clv_hesapla,
-                           musteri_benzerlik_hesapla,
-                           benzer_musteri_urun_onerileri,
+from analysis_engine import (benzer_musteri_urun_onerileri,
                            segmente_benzer_musteri_bul,
                            urun_benzerligi_hesapla)
+from shared_data import veri_setini_getir, analiz_sonucu
 
 st.set_page_config(page_title="Müşteri Benzerlik Analizi", layout="wide")
 
-@st.cache_data
-def veriyi_getir_ve_isle():
-    dosya_adi = 'satis_verileri_guncellenmis.json' 
-    temiz_df = veriyi_yukle_ve_temizle(dosya_adi)
-    rfm_df = rfm_skorlarini_hesapla(temiz_df)
-    segmentli_df = musterileri_segmentle(rfm_df)
-    churn_df, _, _, _, _, _ = churn_tahmin_modeli_olustur(segmentli_df)
-    clv_df = clv_hesapla(churn_df)
-    return temiz_df, clv_df
+veri = veri_setini_getir()
+temiz_df, sonuclar_df = veri.temiz_df, veri.sonuclar_df
 
-temiz_df, sonuclar_df = veriyi_getir_ve_isle()
 
 st.title("👥 Müşteri Benzerlik Analizi (Look-alike)")
 st.markdown("""
@@ -44,11 +31,7 @@ analiz_tipi = st.radio(
 st.markdown("---")
 
 if analiz_tipi == "Tek Bir Müşteriye Göre":
-    @st.cache_data
-    def benzerlik_matrisini_getir(_sonuclar_df):
-        return musteri_benzerlik_hesapla(_sonuclar_df)
-
-    similarity_df = benzerlik_matrisini_getir(sonuclar_df)
+    similarity_df = analiz_sonucu('musteri_benzerligi')
 
     st.header("Benzer Müşterileri Bul")
     
@@ -72,7 +55,7 @@ if analiz_tipi == "Tek Bir Müşteriye Göre":
         
         if use_product_similarity:
             with st.spinner("Ürün zevki benzerlikleri hesaplanıyor..."):
-                urun_benzerlik_skorlari = urun_benzerligi_hesapla(temiz_df, secilen_musteri)
+                urun_benzerlik_skorlari = urun_benzerligi_hesapla(temiz_df, secilen_musteri, analiz_sonucu('musteri_ozellikleri'))
             
             birlesik_skor_df = pd.DataFrame({'RFM_Skor': rfm_benzerlik_skorlari, 'Urun_Skor': urun_benzerlik_skorlari}).dropna()
             
@@ -127,7 +110,8 @@ if analiz_tipi == "Tek Bir Müşteriye Göre":
             st.markdown("---")
             st.subheader(f"'{secilen_musteri}' İçin Ürün Önerileri")
             with st.spinner("Benzer müşterilerin sepetleri analiz ediliyor..."):
-                urun_onerileri_df = benzer_musteri_urun_onerileri(temiz_df, secilen_musteri, look_alike_musteriler.index.tolist())
+                urun_onerileri_df = benzer_musteri_urun_onerileri(temiz_df, secilen_musteri, look_alike_musteriler.index.tolist(),
+                                                                 ofset_indeksi=analiz_sonucu('musteri_ofsetleri'))
             if urun_onerileri_df.empty:
                 st.info("Bu müşteri profiline uygun yeni bir ürün önerisi bulunamadı.")
             else:
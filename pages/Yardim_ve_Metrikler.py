@@ -2,14 +2,11 @@
 # SORUMLULUĞU: Uygulamadaki analizleri ve metrikleri açıklayan bir rehber sunmak.
 
 import streamlit as st
-from data_handler import veriyi_yukle_ve_temizle
+from shared_data import temiz_veriyi_getir, clv_ufku_etiketi
 
 st.set_page_config(page_title="Yardım ve Metrikler", layout="wide")
 
-@st.cache_data
-def veriyi_getir():
-    dosya_adi = 'satis_verileri_guncellenmis.json'
-    return veriyi_yukle_ve_temizle(dosya_adi)
+temiz_df = temiz_veriyi_getir()
 
 st.title("ℹ️ Yardım ve Metrik Tanımları")
 
@@ -18,7 +15,6 @@ Bu sayfa, dashboard'da kullanılan analizlerin ve metriklerin ne anlama geldiği
 Amacı, teknik bilgisi olmayan kullanıcıların da dashboard'dan en yüksek verimi almasını sağlamaktır.
 """)
 
-temiz_df = veriyi_getir()
 son_guncelleme = temiz_df['Tarih'].max().strftime('%d-%m-%Y')
 st.info(f"Kullanılan verinin son kayıt tarihi: **{son_guncelleme}**")
 
@@ -49,13 +45,15 @@ with st.expander("Müşteri Segmentleri"):
     """)
 
 with st.expander("Müşteri Yaşam Boyu Değeri (CLV - Customer Lifetime Value)"):
-    st.markdown("""
+    st.markdown(f"""
     CLV, bir müşterinin şirketinizle olan ilişkisi boyunca size getireceği **tahmini net karı** ifade eder. Geçmiş harcamaları, satın alma sıklığı ve genel churn (kayıp) oranı gibi faktörlere dayanarak hesaplanır. Pazarlama bütçenizi en değerli müşterilere yönlendirmenize yardımcı olan en stratejik metriklerden biridir.
+
+    **Olasılıksal CLV**, her müşterinin alım sıklığı, son alımından bu yana geçen süre ve ortalama sepet tutarı üzerinden BG/NBD ve Gamma-Gamma modelleriyle hesaplanır: önümüzdeki {clv_ufku_etiketi().lower()} içinde beklenen alım sayısı, beklenen ortalama tutar ve müşterinin kâr marjı çarpılır. **Aktif Olma Olasılığı**, müşterinin bugün hâlâ alışveriş yapmaya devam eden bir müşteri olma olasılığıdır.
     """)
 
 with st.expander("Churn (Müşteri Kaybı) ve SHAP Analizi"):
     st.markdown("""
-    **Churn Olasılığı:** Gelişmiş bir makine öğrenmesi modeli (`Random Forest`) tarafından, her bir müşterinin RFM değerlerine bakılarak hesaplanan bir olasılık skorudur. Bu skor, müşterinin yakın gelecekte sizi terk etme riskini yüzde olarak ifade eder.
+    **Churn Olasılığı:** Gelişmiş bir makine öğrenmesi modeli (varsayılan olarak `Random Forest`; model seçimi açıksa çapraz doğrulamayla en iyi bulunan model) tarafından, her bir müşterinin RFM değerlerine bakılarak hesaplanan bir olasılık skorudur. Bu skor, müşterinin yakın gelecekte sizi terk etme riskini yüzde olarak ifade eder.
     **SHAP Değeri Nedir?** Churn Neden Analizi sayfasında kullanılan SHAP, bir modelin kararını açıklamak için kullanılan en modern yöntemlerden biridir. Bir müşterinin churn olasılığının neden yüksek (veya düşük) olduğunu, her bir faktörün (Recency, Frequency, Monetary) bu karara ne kadar etki ettiğini **sayısal olarak** gösterir. Bu, modelin "içini görmemizi" sağlar.
     """)
 
@@ -99,7 +97,7 @@ with col1:
     st.write("Farklı modellerle (Prophet, ARIMA, Random Forest vb.) şirket geneli için satış tahmini yapar. 'Otomatik En İyi Model' seçeneği, güven aralıkları ve interaktif 'Senaryo Planlama' aracı içerir.")
 
     st.subheader("📉 Churn Neden Analizi")
-    st.write("Daha güçlü bir model (Random Forest) ve daha güvenilir bir açıklama yöntemi (SHAP) kullanarak müşteri kaybının arkasındaki nedenleri inceler. Analizi segmente özel yapma imkanı sunar.")
+    st.write("Daha güçlü bir model (Random Forest veya model seçimiyle bulunan en iyi model) ve daha güvenilir bir açıklama yöntemi (SHAP) kullanarak müşteri kaybının arkasındaki nedenleri inceler. Analizi segmente özel yapma imkanı sunar.")
 
 with col2:
     st.subheader("🎯 Pazarlama ve Kampanya")
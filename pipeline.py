@@ -0,0 +1,645 @@
+# pipeline.py
+# SORUMLULUĞU: Analiz aşamalarını girdileri ve parametreleri açıkça belirtilmiş, adlandırılmış
+# DAG düğümleri olarak tanımlamak ve her düğümü veri sürümü başına yalnızca bir kez hesaplamak.
+
+import os
+import ast
+import json
+import time
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from data_handler import (veriyi_yukle_ve_temizle, kaynak_dosyalarini_listele,
+                          ipc_yolu, ipc_deposuna_yaz, ipc_deposunu_esle,
+                          genel_satis_trendi_hazirla, musteri_zaman_serisi_hazirla,
+                          musteri_ofset_indeksi_olustur, veriyi_artimli_yukle, artimli_ipc_yolu,
+                          artimli_depo_dizini, SurecHavuzu)
+from feature_store import musteri_ozelliklerini_hesapla, pencere_kolonlari
+from shap_store import shap_deposu_olustur
+from tree_scorer import agac_modelini_disa_aktar
+from probabilistic_clv import olasiliksal_clv_hesapla
+from analysis_engine import (rfm_skorlarini_hesapla,
+                             musterileri_segmentle,
+                             churn_tahmin_modeli_olustur,
+                             clv_hesapla,
+                             anomali_tespiti_yap,
+                             davranissal_anomali_tespiti_yap,
+                             market_basket_analizi_yap,
+                             musteri_yolculugu_analizi_yap,
+                             kohort_analizi_yap,
+                             musteri_benzerlik_hesapla,
+                             kategori_migrasyon_analizi_yap,
+                             prophet_tahmin,
+                             arima_tahmin,
+                             sarima_tahmin,
+                             random_forest_tahmin,
+                             satis_tahmini_yap)
+
+# Kaynak dosyayı temsil eden sözde düğüm. Parmak izi dosya imzasıdır, değeri dosya yoludur.
+KAYNAK = 'kaynak'
+
+# Hattın sakladığı en fazla düğüm çalışma kaydı (bkz. AnalizHatti.olcumler).
+AZAMI_OLCUM_SAYISI = 512
+
+# Aynı veri sürümünde bellekte tutulacak en fazla düğüm sonucu (farklı parametrelerle
+# istenen düğümler ayrı sonuç sayılır). Sınır aşılınca en uzun süredir kullanılmayan atılır.
+AZAMI_SONUC_SAYISI = 64
+
+# Açıksa churn modeli sabit Random Forest yerine çapraz doğrulamalı model seçimiyle kurulur
+# (bkz. analysis_engine.churn_modeli_sec). Parametre varsayılanı olduğundan parmak izine girer;
+# sayfalar ve ön hesaplama aynı ayarla çalışmalıdır.
+CHURN_MODEL_SECIMI = os.environ.get('CHURN_MODEL_SECIMI', '0') == '1'
+
+# Açıksa 'temiz' tablosu kaynağın tamamı yeniden temizlenmek yerine birikimli depodan kurulur;
+# günlük yenilemede yalnızca yeni kayıtlar okunup temizlenir (bkz. data_handler.veriyi_artimli_yukle).
+ARTIMLI_YUKLEME = os.environ.get('VERI_ARTIMLI_YUKLEME', '0') == '1'
+
+@dataclass(frozen=True)
+class Dugum:
+    """
+    Bir analiz aşaması: 'girdiler' sırasıyla fonksiyonun ilk argümanlarına verilir,
+    kalan anahtar kelime argümanları düğümün parametreleridir. 'esle' açıksa DataFrame
+    sonucu Arrow IPC dosyasına yazılır ve diğer süreçler yeniden hesaplamak yerine onu eşler.
+    'kalici' kapalı düğümler sonuç önbelleğine yazılmaz (kendi önbelleği olan aşamalar için).
+    """
+    ad: str
+    fonksiyon: object
+    girdiler: tuple
+    varsayilanlar: dict = field(default_factory=dict)
+    esle: bool = False
+    kalici: bool = True
+
+DUGUMLER = {}
+
+def dugum(ad, girdiler=(), esle=False, kalici=True):
+    """Fonksiyonu 'ad' adıyla DAG'a kaydeden dekoratör. Parametre varsayılanları imzadan alınır."""
+    def kaydet(fonksiyon):
+        imza = inspect.signature(fonksiyon)
+        varsayilanlar = {
+            p.name: p.default for p in list(imza.parameters.values())[len(girdiler):]
+            if p.default is not inspect.Parameter.empty
+        }
+        DUGUMLER[ad] = Dugum(ad, fonksiyon, tuple(girdiler), varsayilanlar, esle, kalici)
+        return fonksiyon
+    return kaydet
+
+# --- Düğüm Tanımları ---
+# Düğüm sonuçları tüm sayfalar ve oturumlar arasında paylaşılır; girdisini değiştiren
+# analiz fonksiyonlarına her zaman kopya verilir.
+
+# Temiz tablo data_handler'ın Parquet/IPC önbelleğinde zaten saklanır.
+@dugum('temiz', girdiler=(KAYNAK,), kalici=False)
+def _temiz(dosya_yolu, artimli=ARTIMLI_YUKLEME):
+    if artimli:
+        return veriyi_artimli_yukle(dosya_yolu)
+    return veriyi_yukle_ve_temizle(dosya_yolu, bellek_eslemeli=True)
+
+@dugum('musteri_ozellikleri', girdiler=('temiz',))
+def _musteri_ozellikleri(temiz_df):
+    """Müşteri bazlı düğümlerin ortak özellik tablosu; işlem tablosu bir kez taranır."""
+    return musteri_ozelliklerini_hesapla(temiz_df)
+
+@dugum('rfm', girdiler=('temiz', 'musteri_ozellikleri'))
+def _rfm(temiz_df, ozellikler):
+    return rfm_skorlarini_hesapla(temiz_df, ozellikler)
+
+@dugum('segment', girdiler=('rfm',))
+def _segment(rfm_df):
+    return musterileri_segmentle(rfm_df.copy())
+
+@dugum('churn', girdiler=('segment', 'musteri_ozellikleri'))
+def _churn(segmentli_df, ozellikler, churn_limiti_gun=180, model_secimi=CHURN_MODEL_SECIMI):
+    """
+    (churn_df, model, explainer, X, X_train, dogruluk) döndürür. Model RFM'e ek olarak son
+    30/90/180/365 günlük pencereli özellikleri de kullanır.
+    """
+    return churn_tahmin_modeli_olustur(segmentli_df.copy(), churn_limiti_gun=churn_limiti_gun,
+                                       ek_ozellikler=ozellikler[pencere_kolonlari()], model_secimi=model_secimi)
+
+@dugum('shap_degerleri', girdiler=('churn',))
+def _shap_degerleri(churn_ciktilari):
+    """
+    Tüm müşterilerin (X) churn sınıfı SHAP değerleri (bkz. shap_store.ShapDeposu). Segment
+    özetleri ve bireysel şelale grafikleri depodan okunur; model yoksa None döner.
+    """
+    _, model, _, X, X_train, _ = churn_ciktilari
+    return shap_deposu_olustur(model, X, arka_plan=X_train)
+
+@dugum('churn_skorlayici', girdiler=('churn',))
+def _churn_skorlayici(churn_ciktilari):
+    """
+    Churn modelinin sklearn'süz düz ağaç skorlayıcısı (bkz. tree_scorer.DuzAgacModeli).
+    Model yoksa veya ağaç topluluğu değilse (örn. lojistik regresyon seçildiyse) None döner.
+    """
+    model = churn_ciktilari[1]
+    if model is None:
+        return None
+    try:
+        return agac_modelini_disa_aktar(model)
+    except ValueError as e:
+        print(f"UYARI: {e}")
+        return None
+
+@dugum('clv', girdiler=('churn', 'musteri_ozellikleri'), esle=True)
+def _clv(churn_ciktilari, ozellikler, clv_ufku_gun=365):
+    """CLV_Net_Kar'ın yanına BG/NBD + Gamma-Gamma ile 'clv_ufku_gun' günlük olasılıksal CLV kolonlarını ekler."""
+    sonuclar_df = clv_hesapla(churn_ciktilari[0].copy())
+    try:
+        olasiliksal = olasiliksal_clv_hesapla(ozellikler.loc[ozellikler.index.isin(sonuclar_df.index)], ufuk_gun=clv_ufku_gun)
+        sonuclar_df = sonuclar_df.join(olasiliksal)
+    except ValueError as e:
+        print(f"UYARI: Olasılıksal CLV hesaplanamadı: {e}")
+    if 'MusteriAdi' not in sonuclar_df.columns:
+        sonuclar_df['MusteriAdi'] = sonuclar_df.index
+    return sonuclar_df
+
+@dugum('profil_anomalileri', girdiler=('clv',))
+def _profil_anomalileri(sonuclar_df, kontaminasyon_orani=0.05):
+    return anomali_tespiti_yap(sonuclar_df.copy(), kontaminasyon_orani=kontaminasyon_orani)
+
+@dugum('davranissal_anomaliler', girdiler=('temiz', 'musteri_ozellikleri'))
+def _davranissal_anomaliler(temiz_df, ozellikler, hassasiyet=2.5):
+    return davranissal_anomali_tespiti_yap(temiz_df, hassasiyet=hassasiyet, ozellikler=ozellikler)
+
+@dugum('market_basket', girdiler=('temiz',))
+def _market_basket(temiz_df, min_support=0.05, max_urun_sayisi=300):
+    return market_basket_analizi_yap(temiz_df, min_support=min_support, max_urun_sayisi=max_urun_sayisi)
+
+@dugum('musteri_yolculugu', girdiler=('temiz', 'clv'))
+def _musteri_yolculugu(temiz_df, sonuclar_df, periyot='Q'):
+    """Yalnızca yolculuk pivotunu döndürür."""
+    yolculuk_pivot, _, _, _ = musteri_yolculugu_analizi_yap(temiz_df, sonuclar_df, periyot=periyot)
+    return yolculuk_pivot
+
+@dugum('kohort', girdiler=('temiz', 'musteri_ozellikleri'))
+def _kohort(temiz_df, ozellikler, metric='retention', period='M'):
+    return kohort_analizi_yap(temiz_df, metric=metric, period=period, ozellikler=ozellikler)
+
+@dugum('musteri_benzerligi', girdiler=('clv',))
+def _musteri_benzerligi(sonuclar_df):
+    return musteri_benzerlik_hesapla(sonuclar_df)
+
+@dugum('kategori_migrasyonu', girdiler=('temiz', 'musteri_ozellikleri'))
+def _kategori_migrasyonu(temiz_df, ozellikler):
+    return kategori_migrasyon_analizi_yap(temiz_df, ozellikler=ozellikler)
+
+TAHMIN_FONKSIYONLARI = {
+    'Prophet': prophet_tahmin,
+    'ARIMA': arima_tahmin,
+    'SARIMA': sarima_tahmin,
+    'Random Forest': random_forest_tahmin,
+}
+
+@dugum('aylik_satislar', girdiler=('temiz',))
+def _aylik_satislar(temiz_df):
+    return genel_satis_trendi_hazirla(temiz_df)
+
+@dugum('satis_tahmini', girdiler=('aylik_satislar',))
+def _satis_tahmini(aylik_satislar, model='Prophet', tahmin_periyodu=6, test_ay_sayisi=0):
+    """
+    Seçilen modelin tahmin tablosunu döndürür (model nesnesi saklanmaz). 'test_ay_sayisi'
+    verilirse son aylar eğitimden çıkarılır; model karşılaştırmasındaki geri test içindir.
+    """
+    if model not in TAHMIN_FONKSIYONLARI:
+        raise ValueError(f"Bilinmeyen tahmin modeli: '{model}'. Seçenekler: {', '.join(TAHMIN_FONKSIYONLARI)}")
+    egitim = aylik_satislar.iloc[:len(aylik_satislar) - test_ay_sayisi]
+    return TAHMIN_FONKSIYONLARI[model](egitim.copy(), tahmin_periyodu)[1]
+
+@dugum('musteri_ofsetleri', girdiler=('temiz',))
+def _musteri_ofsetleri(temiz_df):
+    """Müşteri sıralı temiz tabloda her müşterinin satır aralığı (bkz. musteri_dilimi)."""
+    return musteri_ofset_indeksi_olustur(temiz_df)
+
+@dugum('musteri_tahmini', girdiler=('temiz', 'musteri_ofsetleri'))
+def _musteri_tahmini(temiz_df, ofset_indeksi, musteri_id=None, ay_sayisi=6):
+    """
+    Tek müşterinin Prophet modeli ve tahmini: (model, forecast). En az 12 aylık geçmişi
+    olmayan müşteriler için None döner.
+    """
+    if musteri_id is None:
+        raise ValueError("'musteri_tahmini' düğümü için 'musteri_id' parametresi gereklidir.")
+    musteri_ts = musteri_zaman_serisi_hazirla(temiz_df, musteri_id, ofset_indeksi)
+    if len(musteri_ts) < 12:
+        return None
+    return satis_tahmini_yap(musteri_ts, ay_sayisi=ay_sayisi)
+
+# --- Çözümleme ve Parmak İzi ---
+
+def istegi_coz(istek, **parametreler):
+    """
+    'clv' veya 'market_basket(min_support=0.05)' biçimindeki isteği (ad, parametreler)
+    ikilisine çevirir. Verilmeyen parametreler düğümün varsayılanlarıyla doldurulur; böylece
+    'market_basket' ile 'market_basket(min_support=0.05)' aynı sonucu paylaşır.
+    """
+    try:
+        ifade = ast.parse(istek.strip(), mode='eval').body
+        if isinstance(ifade, ast.Name):
+            ad, istek_parametreleri = ifade.id, {}
+        elif isinstance(ifade, ast.Call) and isinstance(ifade.func, ast.Name) and not ifade.args:
+            ad = ifade.func.id
+            istek_parametreleri = {k.arg: ast.literal_eval(k.value) for k in ifade.keywords}
+        else:
+            raise ValueError
+    except (SyntaxError, ValueError):
+        raise ValueError(f"Geçersiz düğüm isteği: '{istek}'. Örnek: 'market_basket(min_support=0.05)'")
+
+    if ad not in DUGUMLER:
+        raise ValueError(f"Bilinmeyen düğüm: '{ad}'. Tanımlı düğümler: {', '.join(sorted(DUGUMLER))}")
+    dugum_tanimi = DUGUMLER[ad]
+    istek_parametreleri.update(parametreler)
+    bilinmeyenler = set(istek_parametreleri) - set(dugum_tanimi.varsayilanlar)
+    if bilinmeyenler:
+        raise ValueError(f"'{ad}' düğümü şu parametreleri tanımıyor: {', '.join(sorted(bilinmeyenler))}")
+    return ad, {**dugum_tanimi.varsayilanlar, **istek_parametreleri}
+
+def kaynak_imzasi(dosya_yolu):
+    """
+    Her yeniden çalıştırmada ucuza hesaplanabilen kaynak imzası (yol, boyut, değişiklik zamanı).
+    Klasör veya glob kaynaklarında her dosyanın imzası ayrı ayrı alınır.
+    """
+    imzalar = []
+    for yol in kaynak_dosyalarini_listele(dosya_yolu):
+        durum = os.stat(yol)
+        imzalar.append((os.path.abspath(yol), durum.st_size, durum.st_mtime_ns))
+    return tuple(imzalar)
+
+def _iz(*parcalar):
+    return hashlib.blake2b(json.dumps(parcalar, sort_keys=True, default=str).encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+def dugum_parmak_izi(ad, parametreler, kaynak_izi):
+    """
+    Düğümün parmak izi: adı, parametreleri ve tüm girdilerinin parmak izleri. Herhangi bir
+    üst aşamanın parametresi veya kaynak verisi değişirse alt düğümlerin izi de değişir.
+    """
+    girdi_izleri = [
+        kaynak_izi if girdi == KAYNAK else dugum_parmak_izi(*istegi_coz(girdi), kaynak_izi)
+        for girdi in DUGUMLER[ad].girdiler
+    ]
+    return _iz(ad, parametreler, girdi_izleri)
+
+def dugum_etiketi(ad, parametreler):
+    """Yalnızca varsayılandan farklı parametreleri gösteren kısa ad, örn. 'kohort(period='Q')'."""
+    farkli = {k: v for k, v in parametreler.items() if DUGUMLER[ad].varsayilanlar.get(k) != v}
+    if not farkli:
+        return ad
+    return f"{ad}({', '.join(f'{k}={v!r}' for k, v in farkli.items())})"
+
+@dataclass(frozen=True)
+class _EslemeReferansi:
+    """Süreç havuzundaki işe tablonun kendisi yerine gönderilen IPC dosyası yolu."""
+    yol: str
+
+def _dugum_isi(ad, parametreler, girdiler):
+    """
+    Süreç havuzunda çalışan iş. IPC dosyasıyla gelen girdiler kopyalanmadan belleğe eşlenir;
+    (sonuç, hesaplama süresi) döndürülür.
+    """
+    girdiler = [ipc_deposunu_esle(g.yol) if isinstance(g, _EslemeReferansi) else g for g in girdiler]
+    baslangic = time.perf_counter()
+    deger = DUGUMLER[ad].fonksiyon(*girdiler, **parametreler)
+    return deger, time.perf_counter() - baslangic
+
+@dataclass
+class CalismaRaporu:
+    """
+    AnalizHatti.paralel_hesapla özeti. 'sureler' yalnızca bu çalışmada hesaplanan düğümleri
+    içerir; 'kritik_yol', süreleri toplamı en uzun olan bağımlılık zinciridir ve paralel
+    çalışmada ulaşılabilecek en kısa süreyi belirler.
+    """
+    sureler: dict
+    kritik_yol: list
+    kritik_sure: float
+    duvar_suresi: float
+    hatalar: dict
+
+    @property
+    def toplam_sure(self):
+        """Düğümler sırayla çalışsaydı geçecek süre."""
+        return sum(self.sureler.values())
+
+class AnalizHatti:
+    """
+    Bir kaynak dosya için DAG düğümlerini tembel biçimde hesaplayıp sonuçlarını parmak izine
+    göre saklar. Aynı düğüm aynı anda birden fazla oturumdan istense bile bir kez hesaplanır.
+    'sonuc_onbellegi' verilirse (bkz. result_cache.SonucOnbellegi) sonuçlar diske de yazılır
+    ve sonraki süreçler hesaplamak yerine oradan okur.
+    """
+
+    def __init__(self, dosya_yolu, azami_sonuc_sayisi=AZAMI_SONUC_SAYISI, sonuc_onbellegi=None):
+        self.dosya_yolu = dosya_yolu
+        self.azami_sonuc_sayisi = azami_sonuc_sayisi
+        self.sonuc_onbellegi = sonuc_onbellegi
+        # Her düğüm çalışması için (ad, kaynak, süre) kaydı; kaynak 'hesaplandı',
+        # 'önbellek' veya 'eşleme' olur. Bellek sonucundan dönen istekler kaydedilmez.
+        self.olcumler = deque(maxlen=AZAMI_OLCUM_SAYISI)
+        self._sonuclar = OrderedDict()
+        self._kilitler = {}
+        self._kilit = threading.Lock()
+        self._kaynak_izi = None
+        self._esleme_yollari = {}
+
+    def surum(self):
+        """Kaynak verinin güncel sürümü. Değiştiğinde eski sürümün tüm sonuçları atılır."""
+        kaynak_izi = _iz(kaynak_imzasi(self.dosya_yolu))
+        with self._kilit:
+            if kaynak_izi != self._kaynak_izi:
+                self._sonuclar.clear()
+                self._esleme_yollari.clear()
+                self._kaynak_izi = kaynak_izi
+        return kaynak_izi
+
+    def parmak_izi(self, istek, **parametreler):
+        """İstenen düğümün, güncel veri sürümündeki parmak izini döndürür."""
+        return dugum_parmak_izi(*istegi_coz(istek, **parametreler), self.surum())
+
+    def sonuc(self, istek, **parametreler):
+        """
+        İstenen düğümün sonucunu döndürür; gerekirse önce eksik üst düğümleri hesaplar.
+        Dönen nesneler paylaşımlıdır, değiştirilecekse önce kopyası alınmalıdır.
+        """
+        ad, parametreler = istegi_coz(istek, **parametreler)
+        return self._hesapla(ad, parametreler, self.surum())
+
+    def _bellekten_al(self, iz):
+        with self._kilit:
+            if iz in self._sonuclar:
+                self._sonuclar.move_to_end(iz)
+                return True, self._sonuclar[iz]
+            return False, None
+
+    def _bellege_yaz(self, iz, deger):
+        with self._kilit:
+            self._sonuclar[iz] = deger
+            while len(self._sonuclar) > self.azami_sonuc_sayisi:
+                self._sonuclar.popitem(last=False)
+
+    def _hesapla(self, ad, parametreler, kaynak_izi):
+        iz = dugum_parmak_izi(ad, parametreler, kaynak_izi)
+        bulundu, deger = self._bellekten_al(iz)
+        if bulundu:
+            return deger
+
+        with self._kilit:
+            kilit = self._kilitler.setdefault(iz, threading.Lock())
+        try:
+            with kilit:
+                # Kilidi beklerken başka bir oturum aynı düğümü hesaplamış olabilir.
+                bulundu, deger = self._bellekten_al(iz)
+                if not bulundu:
+                    deger = self._dugumu_calistir(DUGUMLER[ad], parametreler, kaynak_izi, iz)
+                    self._bellege_yaz(iz, deger)
+        finally:
+            with self._kilit:
+                self._kilitler.pop(iz, None)
+        return deger
+
+    def _esleme_yolu(self, dugum_tanimi, parametreler):
+        """
+        Sonucu Arrow IPC dosyasında tutulan düğümlerin dosya yolu, diğerleri için None.
+        'temiz' tablosunu data_handler kendi IPC dosyasına yazar (bellek_eslemeli=True veya artımlı depo).
+        Artımlı yüklemede kaynak içeriği özetlenmez: dosyalar birikimli deponun klasöründe
+        tutulur ve düğüm sonuçları kaynak imzasıyla (boyut, değişiklik zamanı) anahtarlanır.
+        """
+        if dugum_tanimi.ad == 'temiz' and parametreler.get('artimli'):
+            # Anahtar depo meta bilgisindedir ve yalnızca depoya yeni kayıt eklenince değişir.
+            return artimli_ipc_yolu(self.dosya_yolu)
+        if dugum_tanimi.ad == 'temiz':
+            ad = 'temiz'
+        elif dugum_tanimi.esle:
+            # Dosya adı veri sürümünden bağımsız yapısal izi taşır; veri sürümü zaten
+            # ipc_yolu'nun anahtarındadır ve eski sürüm dosyaları orada temizlenir.
+            ad = f"{dugum_tanimi.ad}-{dugum_parmak_izi(dugum_tanimi.ad, parametreler, '')[:12]}"
+        else:
+            return None
+        # ipc_yolu kaynak dosyanın içerik özetini hesaplar; veri sürümü başına bir kez çağrılır.
+        if ad not in self._esleme_yollari:
+            if ad != 'temiz' and DUGUMLER['temiz'].varsayilanlar.get('artimli'):
+                depo_dizini = artimli_depo_dizini(self.dosya_yolu)
+                self._esleme_yollari[ad] = os.path.join(depo_dizini, f"{ad}-{self._kaynak_izi[:16]}.arrow")
+            else:
+                self._esleme_yollari[ad] = ipc_yolu(self.dosya_yolu, ad)
+        return self._esleme_yollari[ad]
+
+    def _kalici_sonucu_al(self, dugum_tanimi, parametreler, iz):
+        """Düğümün IPC dosyası veya sonuç önbelleğinde hazır sonucu varsa (True, deger) döndürür."""
+        esleme_yolu = self._esleme_yolu(dugum_tanimi, parametreler) if dugum_tanimi.esle else None
+        baslangic = time.perf_counter()
+        if esleme_yolu is not None:
+            if os.path.exists(esleme_yolu):
+                deger = ipc_deposunu_esle(esleme_yolu)
+                self.olcumler.append((dugum_tanimi.ad, 'eşleme', time.perf_counter() - baslangic))
+                return True, deger
+        elif self.sonuc_onbellegi is not None and dugum_tanimi.kalici:
+            bulundu, deger = self.sonuc_onbellegi.oku(iz)
+            if bulundu:
+                self.olcumler.append((dugum_tanimi.ad, 'önbellek', time.perf_counter() - baslangic))
+                print(f"✓ '{dugum_tanimi.ad}' düğümü sonuç önbelleğinden okundu.")
+                return True, deger
+        return False, None
+
+    def _sonucu_kaydet(self, dugum_tanimi, parametreler, iz, deger, sure):
+        """Hesaplanan sonucu IPC dosyasına veya sonuç önbelleğine yazar; saklanacak değeri döndürür."""
+        self.olcumler.append((dugum_tanimi.ad, 'hesaplandı', sure))
+        print(f"✓ '{dugum_tanimi.ad}' düğümü {sure:.2f} sn'de hesaplandı.")
+        esleme_yolu = self._esleme_yolu(dugum_tanimi, parametreler) if dugum_tanimi.esle else None
+        if esleme_yolu is not None:
+            ipc_deposuna_yaz(deger, esleme_yolu)
+            return ipc_deposunu_esle(esleme_yolu)
+        if self.sonuc_onbellegi is not None and dugum_tanimi.kalici:
+            try:
+                self.sonuc_onbellegi.yaz(iz, deger)
+            except Exception as e:
+                print(f"UYARI: '{dugum_tanimi.ad}' sonucu önbelleğe yazılamadı: {e}")
+        return deger
+
+    def _dugumu_calistir(self, dugum_tanimi, parametreler, kaynak_izi, iz):
+        bulundu, deger = self._kalici_sonucu_al(dugum_tanimi, parametreler, iz)
+        if bulundu:
+            return deger
+        girdiler = [
+            self.dosya_yolu if girdi == KAYNAK else self._hesapla(*istegi_coz(girdi), kaynak_izi)
+            for girdi in dugum_tanimi.girdiler
+        ]
+        baslangic = time.perf_counter()
+        deger = dugum_tanimi.fonksiyon(*girdiler, **parametreler)
+        return self._sonucu_kaydet(dugum_tanimi, parametreler, iz, deger, time.perf_counter() - baslangic)
+
+    # --- Eş Zamanlı Çalıştırma ---
+
+    def _plan_olustur(self, istekler, kaynak_izi):
+        """
+        İstekler için hesaplanması gereken düğümleri bağımlılık sırasıyla
+        {iz: (ad, parametreler, girdi_izleri)}, bellekte veya diskte hazır olanları
+        {iz: (ad, parametreler, deger)} olarak döndürür. Hazır düğümlerin üst düğümleri plana girmez.
+        """
+        plan, hazir = {}, {}
+
+        def planla(ad, parametreler):
+            iz = dugum_parmak_izi(ad, parametreler, kaynak_izi)
+            if iz in plan or iz in hazir:
+                return iz
+            bulundu, deger = self._bellekten_al(iz)
+            if not bulundu:
+                bulundu, deger = self._kalici_sonucu_al(DUGUMLER[ad], parametreler, iz)
+                if bulundu:
+                    self._bellege_yaz(iz, deger)
+            if bulundu:
+                hazir[iz] = (ad, parametreler, deger)
+                return iz
+            girdi_izleri = [KAYNAK if girdi == KAYNAK else planla(*istegi_coz(girdi))
+                            for girdi in DUGUMLER[ad].girdiler]
+            plan[iz] = (ad, parametreler, girdi_izleri)
+            return iz
+
+        for istek in istekler:
+            planla(*istegi_coz(istek))
+        return plan, hazir
+
+    def _ise_gonderilecek_girdi(self, ad, parametreler, deger):
+        """IPC dosyası olan tablolar işe yol olarak gönderilir; diğer değerler pickle ile kopyalanır."""
+        esleme_yolu = self._esleme_yolu(DUGUMLER[ad], parametreler)
+        if esleme_yolu is not None and os.path.exists(esleme_yolu):
+            return _EslemeReferansi(esleme_yolu)
+        return deger
+
+    def paralel_hesapla(self, istekler, is_parcacigi_sayisi=None, hatalari_topla=False):
+        """
+        İstenen düğümleri ve eksik üst düğümlerini, girdileri hazır oldukça bir süreç havuzunda
+        eş zamanlı hesaplar. Birbirine bağlı olmayan aşamalar (örn. market_basket ile
+        musteri_yolculugu) aynı anda çalıştığından toplam süre, tüm aşamaların toplamına değil
+        en uzun bağımlılık zincirine (kritik yol) yaklaşır. Sonuçlar sonuc() ile aynı belleğe
+        ve önbelleğe yazılır; bir CalismaRaporu döndürülür.
+
+        Bir düğüm hata verirse ona bağlı düğümler atlanır. 'hatalari_topla' kapalıysa çalışma
+        bittikten sonra ilk hata ValueError olarak yükseltilir, açıksa raporda döndürülür.
+        """
+        kaynak_izi = self.surum()
+        baslangic = time.perf_counter()
+        plan, hazir = self._plan_olustur(istekler, kaynak_izi)
+        is_parcacigi_sayisi = is_parcacigi_sayisi or os.cpu_count() or 1
+
+        sureler, hatalar = {}, {}
+        bekleyen, calisan, kilitler, basarisiz = dict(plan), {}, {}, set()
+        # Tek işçide süreç başlatmak ve sonuçları pickle ile taşımak kazanç sağlamaz. Hat Streamlit
+        # sunucusunun içinde de çalıştığından işçiler 'fork' ile başlatılmaz (bkz. SurecHavuzu).
+        if is_parcacigi_sayisi == 1:
+            havuz = ThreadPoolExecutor(max_workers=1)
+        else:
+            havuz = SurecHavuzu(max_workers=is_parcacigi_sayisi)
+        try:
+            with havuz:
+                while bekleyen or calisan:
+                    ilerleme = False
+                    for iz, (ad, parametreler, girdi_izleri) in list(bekleyen.items()):
+                        if any(g in basarisiz for g in girdi_izleri):
+                            del bekleyen[iz]
+                            basarisiz.add(iz)
+                            hatalar[dugum_etiketi(ad, parametreler)] = "üst düğüm hesaplanamadı"
+                            ilerleme = True
+                            continue
+                        if not all(g == KAYNAK or g in hazir for g in girdi_izleri):
+                            continue
+
+                        bulundu, deger = self._bellekten_al(iz)
+                        if not bulundu and KAYNAK in girdi_izleri:
+                            # Kaynağı okuyan düğüm (temiz) bu süreçte çalışır: çok dosyalı
+                            # kaynakları zaten kendi süreç havuzunda okur ve sonucu IPC'ye eşler.
+                            del bekleyen[iz]
+                            ilerleme = True
+                            dugum_baslangici = time.perf_counter()
+                            try:
+                                deger = self._hesapla(ad, parametreler, kaynak_izi)
+                            except Exception as e:
+                                basarisiz.add(iz)
+                                hatalar[dugum_etiketi(ad, parametreler)] = str(e)
+                                print(f"UYARI: '{dugum_etiketi(ad, parametreler)}' düğümü hesaplanamadı: {e}")
+                                continue
+                            sureler[iz] = time.perf_counter() - dugum_baslangici
+                            hazir[iz] = (ad, parametreler, deger)
+                            continue
+                        if not bulundu:
+                            # Aynı düğümü başka bir oturum hesaplıyorsa kilit boşalana kadar beklenir;
+                            # burada bloklanmak, o oturumun beklediği bir kilidi tutarken kilitlenmeye yol açabilir.
+                            with self._kilit:
+                                kilit = self._kilitler.setdefault(iz, threading.Lock())
+                            if not kilit.acquire(blocking=False):
+                                continue
+                            bulundu, deger = self._bellekten_al(iz)
+                            if bulundu:
+                                self._kilidi_birak(iz, kilit)
+                        del bekleyen[iz]
+                        ilerleme = True
+                        if bulundu:
+                            hazir[iz] = (ad, parametreler, deger)
+                            continue
+                        kilitler[iz] = kilit
+                        girdiler = [self._ise_gonderilecek_girdi(*hazir[g]) for g in girdi_izleri]
+                        calisan[havuz.submit(_dugum_isi, ad, parametreler, girdiler)] = iz
+
+                    if not calisan:
+                        if bekleyen and not ilerleme:
+                            time.sleep(0.05)
+                        continue
+                    tamamlananlar, _ = wait(calisan, timeout=0.05 if bekleyen else None,
+                                            return_when=FIRST_COMPLETED)
+                    for is_ in tamamlananlar:
+                        iz = calisan.pop(is_)
+                        ad, parametreler, _ = plan[iz]
+                        try:
+                            deger, sure = is_.result()
+                            deger = self._sonucu_kaydet(DUGUMLER[ad], parametreler, iz, deger, sure)
+                        except Exception as e:
+                            basarisiz.add(iz)
+                            hatalar[dugum_etiketi(ad, parametreler)] = str(e)
+                            print(f"UYARI: '{dugum_etiketi(ad, parametreler)}' düğümü hesaplanamadı: {e}")
+                        else:
+                            self._bellege_yaz(iz, deger)
+                            sureler[iz] = sure
+                            hazir[iz] = (ad, parametreler, deger)
+                        finally:
+                            self._kilidi_birak(iz, kilitler.pop(iz))
+        finally:
+            for iz, kilit in kilitler.items():
+                self._kilidi_birak(iz, kilit)
+
+        rapor = self._rapor_olustur(plan, sureler, hatalar, time.perf_counter() - baslangic)
+        if rapor.sureler:
+            print(f"✓ {len(rapor.sureler)} düğüm {rapor.duvar_suresi:.2f} sn'de hesaplandı "
+                  f"(sırayla: {rapor.toplam_sure:.2f} sn). Kritik yol: {' → '.join(rapor.kritik_yol)} "
+                  f"({rapor.kritik_sure:.2f} sn)")
+        if hatalar and not hatalari_topla:
+            etiket, mesaj = next(iter(hatalar.items()))
+            raise ValueError(f"'{etiket}' düğümü hesaplanamadı. Orijinal Hata: {mesaj}")
+        return rapor
+
+    def _kilidi_birak(self, iz, kilit):
+        kilit.release()
+        with self._kilit:
+            self._kilitler.pop(iz, None)
+
+    @staticmethod
+    def _rapor_olustur(plan, sureler, hatalar, duvar_suresi):
+        # Plan bağımlılık sırasında olduğundan her düğümün en uzun zinciri tek geçişte bulunur.
+        en_uzun = {}
+        for iz, (_, _, girdi_izleri) in plan.items():
+            if iz not in sureler:
+                continue
+            onceki = max((g for g in girdi_izleri if g in en_uzun), key=lambda g: en_uzun[g][0], default=None)
+            en_uzun[iz] = (sureler[iz] + (en_uzun[onceki][0] if onceki else 0.0), onceki)
+
+        kritik_yol, iz = [], max(en_uzun, key=lambda k: en_uzun[k][0], default=None)
+        kritik_sure = en_uzun[iz][0] if iz else 0.0
+        while iz:
+            kritik_yol.append(dugum_etiketi(*plan[iz][:2]))
+            iz = en_uzun[iz][1]
+        return CalismaRaporu(
+            sureler={dugum_etiketi(*plan[iz][:2]): sure for iz, sure in sureler.items()},
+            kritik_yol=kritik_yol[::-1],
+            kritik_sure=kritik_sure,
+            duvar_suresi=duvar_suresi,
+            hatalar=hatalar
+        )
@@ -0,0 +1,176 @@
+# probabilistic_clv.py
+# SORUMLULUĞU: Müşteri başına alım sıklığı/yakınlık/yaş/ortalama tutar özetleri üzerinde
+# BG/NBD (gelecekteki alım sayısı ve aktif olma olasılığı) ve Gamma-Gamma (alım başına
+# ortalama tutar) modellerini vektörel olabilirliklerle kurmak ve olasılıksal CLV hesaplamak.
+# Modeller işlem tablosuna değil müşteri özetlerine kurulduğundan maliyet müşteri sayısıyla
+# ölçeklenir.
+
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import gammaln, digamma, hyp2f1
+from model_registry import egit_veya_yukle
+
+# BG/NBD'nin koşullu beklenen alım formülü a > 1 gerektirir; kestirim bu sınırla yapılır.
+_A_ALT_SINIRI = 1.0 + 1e-6
+
+def clv_ozetlerini_hazirla(ozellikler, analiz_tarihi=None):
+    """
+    Müşteri özellik tablosundan (bkz. feature_store) model girdilerini oluşturur. Süreler gün
+    cinsindendir ve aynı gündeki işlemler tek alım sayılır:
+    frekans (tekrar alım günü sayısı), yakinlik (ilk ve son alım arası), T (ilk alımdan analiz
+    tarihine), ortalama_tutar (tekrar alımların alım başına ortalama tutarı; frekans 0 ise 0).
+    Analiz tarihi verilmezse RFM'deki gibi son alım gününün ertesi günüdür.
+    """
+    ilk_gun = ozellikler['IlkAlimTarihi'].to_numpy('datetime64[D]')
+    son_gun = ozellikler['SonAlimTarihi'].to_numpy('datetime64[D]')
+    if analiz_tarihi is None:
+        analiz_gunu = son_gun.max() + np.timedelta64(1, 'D') if len(son_gun) else np.datetime64('today', 'D')
+    else:
+        analiz_gunu = np.datetime64(pd.Timestamp(analiz_tarihi), 'D')
+    frekans = ozellikler['AlimGunuSayisi'].to_numpy(np.float64) - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ortalama_tutar = np.where(frekans > 0, ozellikler['TekrarAlimTutari'].to_numpy(np.float64) / frekans, 0.0)
+    return pd.DataFrame({
+        'frekans': frekans,
+        'yakinlik': (son_gun - ilk_gun).astype(np.float64),
+        'T': (analiz_gunu - ilk_gun).astype(np.float64),
+        'ortalama_tutar': ortalama_tutar,
+    }, index=ozellikler.index)
+
+@dataclass(frozen=True)
+class BGNBDModeli:
+    """BG/NBD parametreleri: alım hızı Gamma(r, alpha), bırakma olasılığı Beta(a, b); süreler gün cinsinden."""
+    r: float
+    alpha: float
+    a: float
+    b: float
+
+    def _canlilik_orani(self, x, t, T):
+        # P(aktif) = 1 / (1 + oran); oran log uzayında hesaplanır ve taşmada sonsuza gider.
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            log_oran = (np.log(self.a) - np.log(np.where(x > 0, self.b + x - 1, 1.0))
+                        + (self.r + x) * (np.log(self.alpha + T) - np.log(self.alpha + t)))
+            return np.where(x > 0, np.exp(log_oran), 0.0)
+
+    def aktif_olasiligi(self, ozet):
+        """Müşterinin analiz tarihinde hâlâ aktif (bırakmamış) olma olasılığı."""
+        x, t, T = (ozet[k].to_numpy(np.float64) for k in ('frekans', 'yakinlik', 'T'))
+        return 1.0 / (1.0 + self._canlilik_orani(x, t, T))
+
+    def beklenen_alim_sayisi(self, ozet, ufuk_gun):
+        """Önümüzdeki 'ufuk_gun' gün içinde beklenen alım (alım günü) sayısı."""
+        x, t, T = (ozet[k].to_numpy(np.float64) for k in ('frekans', 'yakinlik', 'T'))
+        r, alpha, a, b = self.r, self.alpha, self.a, self.b
+        z = ufuk_gun / (alpha + T + ufuk_gun)
+        with np.errstate(over='ignore', invalid='ignore'):
+            kalan = 1.0 - np.exp((r + x) * np.log((alpha + T) / (alpha + T + ufuk_gun))) * hyp2f1(r + x, b + x, a + b + x - 1, z)
+            beklenen = (a + b + x - 1) / (a - 1) * kalan / (1.0 + self._canlilik_orani(x, t, T))
+        return np.nan_to_num(np.maximum(beklenen, 0.0))
+
+@dataclass(frozen=True)
+class GammaGammaModeli:
+    """Gamma-Gamma parametreleri: alım tutarı Gamma(p, nu), nu ~ Gamma(q, v)."""
+    p: float
+    q: float
+    v: float
+
+    def beklenen_ortalama_tutar(self, ozet):
+        """Müşterinin gelecekteki alım başına beklenen ortalama tutarı (tekrar alımı yoksa genel ortalama)."""
+        x, m = ozet['frekans'].to_numpy(np.float64), ozet['ortalama_tutar'].to_numpy(np.float64)
+        return self.p * (self.v + x * m) / (self.p * x + self.q - 1)
+
+def _bgnbd_negatif_olabilirlik(log_parametreler, x, t, T, x_tekil, x_ters):
+    """Ortalama negatif log-olabilirlik ve log-parametrelere göre analitik gradyanı."""
+    r, alpha, a, b = np.exp(log_parametreler)
+    tekrar = x > 0
+    A = (gammaln(r + x_tekil) - gammaln(r) + gammaln(a + b) + gammaln(b + x_tekil)
+         - gammaln(b) - gammaln(a + b + x_tekil))[x_ters]
+    psi_r = (digamma(r + x_tekil) - digamma(r))[x_ters]
+    psi_ab = (digamma(a + b) - digamma(a + b + x_tekil))[x_ters]
+    psi_b = (digamma(b + x_tekil) - digamma(b))[x_ters]
+
+    log_alpha_T, log_alpha_t = np.log(alpha + T), np.log(alpha + t)
+    bx1 = np.where(tekrar, b + x - 1, 1.0)
+    L3 = -(r + x) * log_alpha_T
+    with np.errstate(divide='ignore'):
+        L4 = np.where(tekrar, np.log(a) - np.log(bx1) - (r + x) * log_alpha_t, -np.inf)
+    toplam = np.logaddexp(L3, L4)
+    s = np.exp(L4 - toplam)  # L4 teriminin payı; tekrar alımı olmayanlarda 0
+    log_olabilirlik = A + r * np.log(alpha) + toplam
+
+    d_r = psi_r + np.log(alpha) - (1 - s) * log_alpha_T - s * log_alpha_t
+    d_alpha = r / alpha - (r + x) * ((1 - s) / (alpha + T) + s / (alpha + t))
+    d_a = psi_ab + s / a
+    d_b = psi_ab + psi_b - s / bx1
+    gradyan = np.array([d_r.mean() * r, d_alpha.mean() * alpha, d_a.mean() * a, d_b.mean() * b])
+    return -log_olabilirlik.mean(), -gradyan
+
+def _gamma_gamma_negatif_olabilirlik(log_parametreler, x, m):
+    p, q, v = np.exp(log_parametreler)
+    px = p * x
+    log_xm_v = np.log(x * m + v)
+    log_olabilirlik = (gammaln(px + q) - gammaln(px) - gammaln(q) + q * np.log(v)
+                       + (px - 1) * np.log(m) + px * np.log(x) - (px + q) * log_xm_v)
+    d_p = x * (digamma(px + q) - digamma(px) + np.log(m) + np.log(x) - log_xm_v)
+    d_q = digamma(px + q) - digamma(q) + np.log(v) - log_xm_v
+    d_v = q / v - (px + q) / (x * m + v)
+    gradyan = np.array([d_p.mean() * p, d_q.mean() * q, d_v.mean() * v])
+    return -log_olabilirlik.mean(), -gradyan
+
+def bgnbd_uydur(ozet):
+    """BG/NBD parametrelerini en çok olabilirlikle kestirir; (model, metrikler) döndürür."""
+    x, t, T = (ozet[k].to_numpy(np.float64) for k in ('frekans', 'yakinlik', 'T'))
+    # Frekansa bağlı gamma/digamma terimleri her tekil frekans için bir kez hesaplanır.
+    x_tekil, x_ters = np.unique(x, return_inverse=True)
+    baslangic = np.log([1.0, max(T.mean(), 1.0), 2.0, 2.0])
+    sinirlar = [(None, None), (None, None), (np.log(_A_ALT_SINIRI), None), (None, None)]
+    sonuc = minimize(_bgnbd_negatif_olabilirlik, baslangic, args=(x, t, T, x_tekil, x_ters),
+                     jac=True, method='L-BFGS-B', bounds=sinirlar)
+    r, alpha, a, b = np.exp(sonuc.x)
+    metrikler = {'log_olabilirlik': float(-sonuc.fun * len(x)), 'musteri_sayisi': len(x),
+                 'yakinsadi': bool(sonuc.success), 'iterasyon': int(sonuc.nit)}
+    return BGNBDModeli(float(r), float(alpha), float(a), float(b)), metrikler
+
+def gamma_gamma_uydur(ozet):
+    """
+    Gamma-Gamma parametrelerini tekrar alımı ve pozitif ortalama tutarı olan müşterilerle
+    kestirir; (model, metrikler) döndürür. Beklenen tutarın tanımlı olması için q > 1 olmalıdır.
+    """
+    uygun = (ozet['frekans'] > 0) & (ozet['ortalama_tutar'] > 0)
+    x, m = ozet.loc[uygun, 'frekans'].to_numpy(np.float64), ozet.loc[uygun, 'ortalama_tutar'].to_numpy(np.float64)
+    if len(x) < 2:
+        raise ValueError("Gamma-Gamma modeli için tekrar alımı olan en az iki müşteri gereklidir.")
+    baslangic = np.log([1.0, 2.0, max(m.mean(), 1.0)])
+    sinirlar = [(None, None), (np.log(_A_ALT_SINIRI), None), (None, None)]
+    sonuc = minimize(_gamma_gamma_negatif_olabilirlik, baslangic, args=(x, m),
+                     jac=True, method='L-BFGS-B', bounds=sinirlar)
+    p, q, v = np.exp(sonuc.x)
+    metrikler = {'log_olabilirlik': float(-sonuc.fun * len(x)), 'musteri_sayisi': len(x),
+                 'yakinsadi': bool(sonuc.success), 'iterasyon': int(sonuc.nit)}
+    return GammaGammaModeli(float(p), float(q), float(v)), metrikler
+
+def olasiliksal_clv_hesapla(ozellikler, ufuk_gun=365, analiz_tarihi=None):
+    """
+    Müşteri özellik tablosu üzerinde BG/NBD ve Gamma-Gamma modellerini kurar (aynı özetlerle
+    kurulmuşsa model kaydından yükler) ve müşteri indeksli şu kolonları döndürür:
+    Aktif_Olasiligi, Beklenen_Alim_Sayisi ve Beklenen_Ortalama_Tutar ('ufuk_gun' için) ve
+    CLV_Olasiliksal (beklenen ciro x müşterinin net kar marjı; CLV_Net_Kar ile aynı birimde).
+    """
+    ozet = clv_ozetlerini_hazirla(ozellikler, analiz_tarihi)
+    bgnbd, _ = egit_veya_yukle('bgnbd', ozet[['frekans', 'yakinlik', 'T']], {'zaman_birimi': 'gun'},
+                               lambda: bgnbd_uydur(ozet))
+    gamma_gamma, _ = egit_veya_yukle('gamma_gamma', ozet[['frekans', 'ortalama_tutar']], {},
+                                     lambda: gamma_gamma_uydur(ozet))
+
+    toplam_tutar = ozellikler['ToplamTutar'].to_numpy(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kar_marji = np.where(toplam_tutar > 0, ozellikler['ToplamNetKar'].to_numpy(np.float64) / toplam_tutar, 0.0)
+    sonuc = pd.DataFrame({
+        'Aktif_Olasiligi': bgnbd.aktif_olasiligi(ozet),
+        'Beklenen_Alim_Sayisi': bgnbd.beklenen_alim_sayisi(ozet, ufuk_gun),
+        'Beklenen_Ortalama_Tutar': gamma_gamma.beklenen_ortalama_tutar(ozet),
+    }, index=ozellikler.index)
+    sonuc['CLV_Olasiliksal'] = sonuc['Beklenen_Alim_Sayisi'] * sonuc['Beklenen_Ortalama_Tutar'] * kar_marji
+    return sonuc
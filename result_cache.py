@@ -0,0 +1,110 @@
+# result_cache.py
+# SORUMLULUĞU: Analiz düğümlerinin sonuçlarını diskte saklamak; böylece sunucu yeniden
+# başladığında veya yeni sürüm yayınlandığında pahalı analizler baştan hesaplanmaz.
+
+import os
+import json
+import hashlib
+import joblib
+import pandas as pd
+import pyarrow as pa
+
+SONUC_ONBELLEGI_DIZINI = os.environ.get('SONUC_ONBELLEGI_DIZINI', '.sonuc_onbellegi')
+SONUC_ONBELLEGI_LIMITI_MB = int(os.environ.get('SONUC_ONBELLEGI_LIMITI_MB', '1024'))
+
+# Analiz fonksiyonlarının çıktı biçimi değiştiğinde artırılır; eski dosyalar kullanılmaz
+# ve zamanla boyut sınırı nedeniyle silinir.
+_SONUC_ONBELLEGI_SURUMU = 4
+
+class SonucOnbellegi:
+    """
+    Parmak izi anahtarlı, boyutu sınırlı disk önbelleği. DataFrame'ler Parquet, diğer
+    nesneler (modeller, demetler, Parquet'e sığmayan tablolar) joblib ile yazılır.
+    Sınır aşıldığında en uzun süredir okunmayan dosyalar silinir (LRU).
+    """
+
+    def __init__(self, dizin=SONUC_ONBELLEGI_DIZINI, limit_mb=SONUC_ONBELLEGI_LIMITI_MB):
+        self.dizin = dizin
+        self.limit_bayt = limit_mb * 1024 * 1024
+
+    def _dosya_koku(self, anahtar):
+        ozet = hashlib.blake2b(json.dumps([_SONUC_ONBELLEGI_SURUMU, anahtar]).encode('utf-8'),
+                               digest_size=16).hexdigest()
+        return os.path.join(self.dizin, ozet)
+
+    def oku(self, anahtar):
+        """(bulundu, deger) döndürür. Okunamayan (bozuk) dosyalar silinir ve yok sayılır."""
+        kok = self._dosya_koku(anahtar)
+        for yol, okuyucu in ((f"{kok}.parquet", pd.read_parquet), (f"{kok}.joblib", joblib.load)):
+            if not os.path.exists(yol):
+                continue
+            try:
+                deger = okuyucu(yol)
+            except Exception as e:
+                print(f"UYARI: Sonuç önbelleği dosyası okunamadı, siliniyor ({yol}): {e}")
+                self._sil(yol)
+                continue
+            try:
+                # Son kullanım zamanı LRU sıralaması için değişiklik zamanında tutulur.
+                os.utime(yol)
+            except OSError:
+                pass
+            return True, deger
+        return False, None
+
+    def yaz(self, anahtar, deger):
+        """Değeri atomik biçimde yazar ve gerekirse eski dosyaları silerek sınırın altına iner."""
+        os.makedirs(self.dizin, exist_ok=True)
+        kok = self._dosya_koku(anahtar)
+        if not (isinstance(deger, pd.DataFrame) and self._parquet_ile_yaz(f"{kok}.parquet", deger)):
+            self._atomik_yaz(f"{kok}.joblib", lambda yol: joblib.dump(deger, yol))
+        self._sinira_in()
+
+    def _parquet_ile_yaz(self, yol, df):
+        """
+        Tabloyu Parquet olarak yazar ve geri okuyup aynı olduğunu doğrular. Parquet'in
+        kayıpsız taşıyamadığı tablolar (metin olmayan kolon adları, kategorik kolon indeksi,
+        indeks frekansı, küme içeren kolonlar vb.) için False döner ve dosya bırakılmaz.
+        """
+        if not all(isinstance(kolon, str) for kolon in df.columns):
+            return False
+        try:
+            self._atomik_yaz(yol, lambda hedef: df.to_parquet(hedef, engine='pyarrow'))
+            pd.testing.assert_frame_equal(pd.read_parquet(yol), df)
+            return True
+        except (AssertionError, ValueError, TypeError, pa.ArrowException):
+            self._sil(yol)
+            return False
+
+    def _atomik_yaz(self, yol, yazici):
+        gecici_yol = f"{yol}.{os.getpid()}.tmp"
+        try:
+            yazici(gecici_yol)
+            os.replace(gecici_yol, yol)
+        finally:
+            self._sil(gecici_yol)
+
+    def _sinira_in(self):
+        dosyalar = []
+        for ad in os.listdir(self.dizin):
+            if ad.endswith('.tmp'):
+                continue
+            try:
+                durum = os.stat(os.path.join(self.dizin, ad))
+            except OSError:
+                continue
+            dosyalar.append((durum.st_mtime_ns, durum.st_size, ad))
+        toplam = sum(boyut for _, boyut, _ in dosyalar)
+        # En yeni dosya, tek başına sınırı aşsa bile tutulur.
+        for _, boyut, ad in sorted(dosyalar)[:-1]:
+            if toplam <= self.limit_bayt:
+                break
+            self._sil(os.path.join(self.dizin, ad))
+            toplam -= boyut
+
+    @staticmethod
+    def _sil(yol):
+        try:
+            os.remove(yol)
+        except OSError:
+            pass
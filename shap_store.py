@@ -0,0 +1,121 @@
+# shap_store.py
+# SORUMLULUĞU: Churn modelinin tüm müşteriler için SHAP değerlerini model başına bir kez,
+# parçalara bölerek bir süreç havuzunda hesaplamak ve müşteri koduyla erişilen sıkıştırılmış
+# (float32) bir depoda tutmak. Sayfalardaki özet grafik, segment filtresi ve bireysel
+# şelale grafikleri bu deponun satırlarından oluşturulur; SHAP yeniden çalıştırılmaz.
+
+import os
+import time
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import shap
+from sklearn.pipeline import Pipeline
+from data_handler import SurecHavuzu
+
+# Bir iş parçasına verilen müşteri sayısı. TreeExplainer satır başına hızlıdır; parçalar,
+# süreçlere model gönderme maliyetini karşılayacak kadar büyük tutulur.
+PARCA_BOYUTU = 20_000
+
+@dataclass(frozen=True)
+class ShapDeposu:
+    """
+    Churn sınıfının (1) SHAP değerleri. 'degerler' ve 'veriler' (n_musteri, n_ozellik)
+    boyutlu float32 dizilerdir; i. satır musteriler[i] müşterisine aittir.
+    """
+    musteriler: pd.Index
+    ozellik_adlari: tuple
+    degerler: np.ndarray
+    veriler: np.ndarray
+    taban_degeri: float
+
+    def satirlar(self, musteri_idler):
+        """Verilen müşterilerin depo satırları; depoda olmayanlar atlanır."""
+        konumlar = self.musteriler.get_indexer(pd.Index(musteri_idler))
+        return konumlar[konumlar >= 0]
+
+    def aciklama(self, musteri_idler=None):
+        """
+        Müşterilerin (verilmezse tümünün) açıklamasını shap.Explanation olarak döndürür;
+        shap.plots.bar ve shap.plots.waterfall doğrudan kullanabilir.
+        """
+        konumlar = slice(None) if musteri_idler is None else self.satirlar(musteri_idler)
+        degerler = self.degerler[konumlar]
+        return shap.Explanation(values=degerler, base_values=np.full(len(degerler), self.taban_degeri),
+                                data=self.veriler[konumlar], feature_names=list(self.ozellik_adlari))
+
+    def musteri_aciklamasi(self, musteri_id):
+        """Tek müşterinin açıklaması (şelale grafiği için); depoda yoksa None."""
+        konumlar = self.satirlar([musteri_id])
+        return self.aciklama([musteri_id])[0] if len(konumlar) else None
+
+class _OnislemeliAciklayici:
+    """Ölçekleyici + doğrusal model hattını, dönüştürülmüş veri üzerinde LinearExplainer ile açıklar."""
+
+    def __init__(self, hat, arka_plan):
+        self.onisleme = hat[:-1]
+        self.aciklayici = shap.LinearExplainer(hat[-1], self.onisleme.transform(arka_plan))
+
+    def __call__(self, veri):
+        return self.aciklayici(self.onisleme.transform(veri))
+
+def aciklayici_olustur(model, arka_plan=None):
+    """
+    Modelin SHAP açıklayıcısı: ağaç modelleri için TreeExplainer, ölçekleyicili doğrusal
+    modeller (Pipeline) için arka plan verisiyle LinearExplainer.
+    """
+    if isinstance(model, Pipeline):
+        return _OnislemeliAciklayici(model, arka_plan)
+    return shap.TreeExplainer(model)
+
+_isci_aciklayicisi = None
+
+def _isciyi_hazirla(model, arka_plan):
+    # Model her sürece bir kez gönderilir; parçalar yalnızca veri taşır.
+    global _isci_aciklayicisi
+    _isci_aciklayicisi = aciklayici_olustur(model, arka_plan)
+
+def _parca_shap_degerleri(parca):
+    return _churn_sinifi_degerleri(_isci_aciklayicisi, parca)
+
+def _churn_sinifi_degerleri(aciklayici, parca):
+    # Random Forest her iki sınıf için olasılık katkısı verir (son eksen); gradient boosting ve
+    # lojistik regresyon yalnızca churn sınıfının log-odds katkısını verir.
+    aciklama = aciklayici(parca)
+    degerler, taban = aciklama.values, np.asarray(aciklama.base_values)
+    if degerler.ndim == 3:
+        degerler, taban = degerler[..., 1], taban[..., 1]
+    return degerler.astype(np.float32), float(np.ravel(taban)[0])
+
+def shap_deposu_olustur(model, X, arka_plan=None, is_parcacigi_sayisi=None, parca_boyutu=PARCA_BOYUTU):
+    """
+    X'teki tüm müşterilerin SHAP değerlerini hesaplar. Birden fazla parça ve süreç varsa
+    parçalar 'is_parcacigi_sayisi' (varsayılan: çekirdek sayısı) süreçte paralel işlenir.
+    'arka_plan' (eğitim verisi) doğrusal modellerin açıklaması için gereklidir. Model
+    yoksa None döner.
+    """
+    if model is None or X is None:
+        return None
+    baslangic = time.perf_counter()
+    is_parcacigi_sayisi = is_parcacigi_sayisi or os.cpu_count() or 1
+    parcalar = [X.iloc[i:i + parca_boyutu] for i in range(0, len(X), parca_boyutu)] or [X]
+
+    if len(parcalar) == 1 or is_parcacigi_sayisi == 1:
+        aciklayici = aciklayici_olustur(model, arka_plan)
+        sonuclar = [_churn_sinifi_degerleri(aciklayici, parca) for parca in parcalar]
+    else:
+        # Bu fonksiyon hattın bir işçisinde de çalışabilir; işçiler 'fork' ile başlatılmaz.
+        with SurecHavuzu(max_workers=min(is_parcacigi_sayisi, len(parcalar)),
+                         initializer=_isciyi_hazirla, initargs=(model, arka_plan)) as havuz:
+            sonuclar = list(havuz.map(_parca_shap_degerleri, parcalar))
+
+    depo = ShapDeposu(
+        musteriler=X.index,
+        ozellik_adlari=tuple(X.columns),
+        degerler=np.concatenate([degerler for degerler, _ in sonuclar]),
+        veriler=X.to_numpy(np.float32),
+        taban_degeri=sonuclar[0][1],
+    )
+    print(f"✓ {len(X)} müşterinin SHAP değerleri {len(parcalar)} parçada "
+          f"{time.perf_counter() - baslangic:.2f} sn'de hesaplandı.")
+    return depo
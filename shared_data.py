@@ -0,0 +1,108 @@
+# shared_data.py
+# SORUMLULUĞU: Tüm sayfaların kullandığı veri setini ve analiz sonuçlarını süreç başına bir kez
+# oluşturmak ve sayfalar arasında kopyalamadan paylaştırmak.
+
+import os
+from dataclasses import dataclass
+import pandas as pd
+import streamlit as st
+from data_handler import VERI_DOSYASI, bolumlu_depo_yolu, bolumlu_depoya_yaz, tarih_araliklarini_oku
+from pipeline import AnalizHatti, istegi_coz
+from result_cache import SonucOnbellegi
+
+@dataclass(frozen=True)
+class VeriSeti:
+    """
+    Temiz işlem tablosu ve müşteri bazlı sonuçlardan oluşan ortak veri seti.
+    Aynı nesne tüm sayfalara ve oturumlara kopyalanmadan verilir. Tablolar Arrow IPC
+    dosyalarından belleğe eşlenmiştir ve salt okunurdur; değişiklik gereken yerde önce
+    .copy() alınmalıdır.
+    """
+    temiz_df: pd.DataFrame
+    sonuclar_df: pd.DataFrame
+    profil_anomalileri: tuple
+    davranissal_anomaliler: tuple
+    surum: str
+
+# st.cache_resource, st.cache_data'nın aksine sonucu her çağrıda kopyalamaz (pickle'dan
+# açmaz); tüm oturumlar aynı nesneyi görür. Hat, veri sürümü değiştiğinde kendi
+# sonuçlarını kendisi temizler; sonuçlar diske de yazıldığından yeniden başlatmada kaybolmaz.
+@st.cache_resource
+def _analiz_hattini_getir(dosya_yolu):
+    return AnalizHatti(dosya_yolu, sonuc_onbellegi=SonucOnbellegi())
+
+@st.cache_resource(max_entries=1, show_spinner="Müşteri analizleri hazırlanıyor...")
+def _veri_setini_olustur(dosya_yolu, surum):
+    hat = _analiz_hattini_getir(dosya_yolu)
+    # Müşteri tablosu ve iki anomali analizi birbirinden bağımsızdır; eş zamanlı hesaplanır.
+    hat.paralel_hesapla(['clv', 'profil_anomalileri', 'davranissal_anomaliler'])
+    profil_anomalileri_df = hat.sonuc('profil_anomalileri')
+    davranissal_anomaliler_df = hat.sonuc('davranissal_anomaliler')
+    return VeriSeti(
+        temiz_df=hat.sonuc('temiz'),
+        sonuclar_df=hat.sonuc('clv'),
+        profil_anomalileri=tuple(profil_anomalileri_df[profil_anomalileri_df['Anomali_Etiketi'] == -1].index),
+        davranissal_anomaliler=tuple(davranissal_anomaliler_df['MusteriID']) if not davranissal_anomaliler_df.empty else (),
+        surum=surum
+    )
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _bolumlu_depoyu_hazirla(dosya_yolu, surum):
+    depo_dizini = bolumlu_depo_yolu(dosya_yolu)
+    if not os.path.isdir(depo_dizini):
+        bolumlu_depoya_yaz(analiz_sonucu('temiz', dosya_yolu=dosya_yolu), depo_dizini)
+    return depo_dizini
+
+def analiz_sonucu(istek, dosya_yolu=VERI_DOSYASI, **parametreler):
+    """
+    Adı verilen analiz düğümünün sonucunu döndürür, örn. analiz_sonucu('clv') veya
+    analiz_sonucu('market_basket(min_support=0.05)'). Parametreler anahtar kelime olarak
+    da verilebilir. Her düğüm veri sürümü başına bir kez hesaplanır.
+    """
+    with st.spinner("Analiz hazırlanıyor..."):
+        return _analiz_hattini_getir(dosya_yolu).sonuc(istek, **parametreler)
+
+def analiz_sonuclari(*istekler, dosya_yolu=VERI_DOSYASI):
+    """
+    Birden fazla düğümün sonucunu istek sırasıyla döndürür. Birbirine bağlı olmayan düğümler
+    ayrı süreçlerde eş zamanlı hesaplanır, örn. analiz_sonuclari('market_basket', 'musteri_yolculugu').
+    """
+    hat = _analiz_hattini_getir(dosya_yolu)
+    with st.spinner("Analizler hazırlanıyor..."):
+        hat.paralel_hesapla(istekler)
+        return tuple(hat.sonuc(istek) for istek in istekler)
+
+def temiz_veriyi_getir(dosya_yolu=VERI_DOSYASI):
+    """Yalnızca işlem tablosuna ihtiyaç duyan sayfalar için ortak temiz tabloyu döndürür."""
+    return analiz_sonucu('temiz', dosya_yolu=dosya_yolu)
+
+def veri_setini_getir(dosya_yolu=VERI_DOSYASI):
+    """
+    Ortak veri setini döndürür. Kaynak dosya değişmediği sürece tüm sayfalar aynı nesneyi
+    alır; dosya değiştiğinde veri seti bir kez yeniden oluşturulur.
+    """
+    return _veri_setini_olustur(dosya_yolu, _analiz_hattini_getir(dosya_yolu).surum())
+
+def churn_modelini_getir(dosya_yolu=VERI_DOSYASI):
+    """
+    Churn modelini ve SHAP için gereken girdileri (model, explainer, X, X_train, dogruluk)
+    döndürür. Model yalnızca ona ihtiyaç duyan sayfada istenir ve model kaydından
+    (bkz. model_registry) yüklenir; eğitim yalnızca veri veya model ayarları değiştiğinde yapılır.
+    """
+    return analiz_sonucu('churn', dosya_yolu=dosya_yolu)[1:]
+
+def clv_ufku_etiketi():
+    """
+    Olasılıksal CLV kolonlarının hesaplandığı ufuk ('clv' düğümünün 'clv_ufku_gun' parametresi),
+    yıl katlarında ay, diğerlerinde gün olarak: '12 Ay', '180 Gün'.
+    """
+    ufuk_gun = istegi_coz('clv')[1]['clv_ufku_gun']
+    return f"{ufuk_gun // 365 * 12} Ay" if ufuk_gun % 365 == 0 else f"{ufuk_gun} Gün"
+
+def donem_verisini_getir(*araliklar, dosya_yolu=VERI_DOSYASI):
+    """
+    İşlem tablosunun yalnızca verilen (baslangic, bitis) aralıklarına düşen satırlarını,
+    Yil/Ay bölümlü depodan sadece ilgili ay dosyalarını okuyarak döndürür.
+    """
+    depo_dizini = _bolumlu_depoyu_hazirla(dosya_yolu, _analiz_hattini_getir(dosya_yolu).surum())
+    return tarih_araliklarini_oku(depo_dizini, araliklar)
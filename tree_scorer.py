@@ -0,0 +1,145 @@
+# tree_scorer.py
+# SORUMLULUĞU: Eğitilmiş churn ağaç topluluğunu (Random Forest veya gradient boosting) düz
+# NumPy dizilerine (özellik, eşik, çocuklar, değerler) aktarmak ve müşterileri sklearn'e
+# ve DataFrame oluşturmaya gerek kalmadan, tek satırdan milyonlarca satıra kadar vektörel
+# olarak skorlamak. Düz model küçük ve bağımsızdır; ön hesaplama komutu gibi arayüzsüz
+# işlerde de kullanılabilir.
+
+from dataclasses import dataclass
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+
+# Bu sayıdan az satır, tüm ağaçlarda birlikte (satır x ağaç çiftleriyle) skorlanır; tek müşteri
+# gibi küçük isteklerde Python döngüsü derinlik kadar döner. Daha büyük tablolar ağaç ağaç,
+# tüm satırlar birlikte skorlanır; ara diziler satır sayısı kadardır.
+KUCUK_PARTI_SATIR_SAYISI = 1024
+
+@dataclass(frozen=True)
+class DuzAgacModeli:
+    """
+    Tüm ağaçların düğümleri tek dizilerde art arda tutulur; kokler[t], t. ağacın kök
+    düğümüdür. Satırlar her adımda bir seviye iner; yaprağa ulaşanlar zamanla işten
+    çıkarıldığından derin ve dengesiz ağaçlarda da iş, yol uzunluklarıyla orantılı kalır. Skor,
+    'lojit' kapalıyken yaprak değerlerinin ortalaması (Random Forest olasılığı), açıkken
+    sigmoid(baslangic + toplam) (gradient boosting) olur.
+    """
+    ozellik: np.ndarray
+    esik: np.ndarray
+    sol: np.ndarray
+    sag: np.ndarray
+    eksik_sola: np.ndarray
+    yaprak: np.ndarray
+    deger: np.ndarray
+    kokler: np.ndarray
+    baslangic: float
+    lojit: bool
+    ozellik_adlari: tuple
+
+    def _yapraga_indir(self, dugum, X_duz, taban, adim, eksik_var):
+        """
+        Düğümleri yerinde yaprağa indirir; i. elemanın f. özelliği X_duz[taban[i] + f * adim]
+        konumundadır. Yapraklar kendine döndüğünden yaprağa ulaşanlar işlemeye devam edebilir;
+        elemanların yarısından fazlası yaprağa ulaşınca kalanlar ayrı bir diziye alınır.
+        """
+        aktif = None
+        while True:
+            d = dugum if aktif is None else dugum[aktif]
+            konum = taban if aktif is None else taban[aktif]
+            x = X_duz[konum + self.ozellik[d] * adim]
+            sola = x <= self.esik[d]
+            if eksik_var:
+                sola |= np.isnan(x) & self.eksik_sola[d]
+            d = np.where(sola, self.sol[d], self.sag[d])
+            if aktif is None:
+                dugum[:] = d
+            else:
+                dugum[aktif] = d
+            devam = ~self.yaprak[d]
+            kalan = np.count_nonzero(devam)
+            if kalan == 0:
+                return
+            if kalan <= len(d) // 2:
+                aktif = np.flatnonzero(devam) if aktif is None else aktif[devam]
+
+    def _kucuk_parti_toplami(self, X, eksik_var):
+        # Tüm (satır, ağaç) çiftleri birlikte iner; X satır sıralı okunur.
+        dugum = np.tile(self.kokler, len(X))
+        taban = np.repeat(np.arange(len(X)) * X.shape[1], len(self.kokler))
+        self._yapraga_indir(dugum, X.ravel(), taban, 1, eksik_var)
+        return self.deger[dugum].reshape(len(X), len(self.kokler)).sum(axis=1)
+
+    def _agac_agac_toplam(self, X, eksik_var):
+        # Özellik kolonları bitişik olsun diye tablo bir kez kolon sıralı kopyalanır.
+        X_kolonlar = np.ascontiguousarray(X.T).ravel()
+        satirlar = np.arange(len(X))
+        toplam = np.zeros(len(X))
+        for kok in self.kokler:
+            dugum = np.full(len(X), kok)
+            self._yapraga_indir(dugum, X_kolonlar, satirlar, len(X), eksik_var)
+            toplam += self.deger[dugum]
+        return toplam
+
+    def skorla(self, X):
+        """
+        Churn olasılıklarını döndürür. X (n, n_ozellik) dizisi, tek satır veya DataFrame
+        olabilir; kolonlar 'ozellik_adlari' sırasında olmalıdır. Değerler sklearn ağaçları gibi
+        float32'ye çevrilerek eşiklerle karşılaştırılır.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != len(self.ozellik_adlari):
+            raise ValueError(f"Skorlama için {len(self.ozellik_adlari)} özellik bekleniyordu, {X.shape[1]} verildi.")
+        eksik_var = bool(np.isnan(X).any())
+        if len(X) < KUCUK_PARTI_SATIR_SAYISI:
+            skorlar = self._kucuk_parti_toplami(X, eksik_var)
+        else:
+            skorlar = self._agac_agac_toplam(X, eksik_var)
+        if self.lojit:
+            return 1.0 / (1.0 + np.exp(-(self.baslangic + skorlar)))
+        return skorlar / len(self.kokler)
+
+def agac_modelini_disa_aktar(model, ozellik_adlari=None):
+    """
+    İki sınıflı RandomForestClassifier veya GradientBoostingClassifier modelini DuzAgacModeli'ne
+    çevirir. Diğer modeller (örn. lojistik regresyon hattı) için ValueError verilir.
+    """
+    if ozellik_adlari is None:
+        ozellik_adlari = getattr(model, 'feature_names_in_', range(model.n_features_in_))
+    if isinstance(model, RandomForestClassifier) and len(model.classes_) == 2:
+        agaclar = [tahminci.tree_ for tahminci in model.estimators_]
+        # Yaprak değeri churn (1) sınıfının ağırlıklı oranıdır; predict_proba ile aynı.
+        degerler = [agac.value[:, 0, 1] / agac.value[:, 0, :].sum(axis=1) for agac in agaclar]
+        baslangic, lojit = 0.0, False
+    elif isinstance(model, GradientBoostingClassifier) and model.estimators_.shape[1] == 1:
+        agaclar = [tahminci.tree_ for tahminci in model.estimators_[:, 0]]
+        degerler = [model.learning_rate * agac.value[:, 0, 0] for agac in agaclar]
+        # Başlangıç tahmini, önsel churn oranının log-odds değeridir.
+        onsel = model.init_.predict_proba(np.zeros((1, model.n_features_in_)))[0, 1]
+        baslangic, lojit = float(np.log(onsel / (1.0 - onsel))), True
+    else:
+        raise ValueError(f"'{type(model).__name__}' modeli düz ağaç modeline aktarılamaz; "
+                         "yalnızca iki sınıflı Random Forest ve gradient boosting desteklenir.")
+
+    dugum_sayilari = np.array([agac.node_count for agac in agaclar])
+    ofsetler = np.r_[0, np.cumsum(dugum_sayilari)[:-1]]
+    # Yaprakların çocukları kendisi olarak yazılır; dizilerde -1 kalmaz.
+    sol, sag = [], []
+    for agac, ofset in zip(agaclar, ofsetler):
+        kendisi = np.arange(agac.node_count) + ofset
+        yaprak = agac.children_left == -1
+        sol.append(np.where(yaprak, kendisi, agac.children_left + ofset))
+        sag.append(np.where(yaprak, kendisi, agac.children_right + ofset))
+    return DuzAgacModeli(
+        ozellik=np.concatenate([np.maximum(agac.feature, 0) for agac in agaclar]).astype(np.intp),
+        esik=np.concatenate([agac.threshold for agac in agaclar]),
+        sol=np.concatenate(sol).astype(np.intp),
+        sag=np.concatenate(sag).astype(np.intp),
+        eksik_sola=np.concatenate([agac.missing_go_to_left.astype(bool) for agac in agaclar]),
+        yaprak=np.concatenate([agac.children_left == -1 for agac in agaclar]),
+        deger=np.concatenate(degerler),
+        kokler=ofsetler.astype(np.intp),
+        baslangic=baslangic,
+        lojit=lojit,
+        ozellik_adlari=tuple(ozellik_adlari),
+    )